@@ -0,0 +1,202 @@
+"""
+EYAVAP: Columnar Agent Roster
+Ajan kadrosunu satır dict'leri yerine sütun dizileri (numpy) olarak tutar:
+id, merit, trust, askı/veto bayrakları, tamsayı kodlu specialization/ethnicity.
+
+- eligible_mask(): _is_agent_allowed kuralının vektörel hali
+- sample_ids() / choice(): (merit ağırlıklı) örnekleme
+- group_by_specialization() / counts_by_specialization(): seçim ve hücre görünümleri
+
+999+ ajanda filtre/örnekleme tek numpy işlemiyle yapılır. Satır dict'leri
+tutulmaz; tam satır sadece gerçekten gereken ajan için (row/rows) row_source'tan
+(RosterCache.get_many) kopya olarak alınır.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_MIN_TRUST = 40
+ZERO_ID = "00000000-0000-0000-0000-000000001000"
+DEFAULT_MERIT = 50.0
+
+
+def _encode(values: Sequence[Any]) -> tuple[np.ndarray, List[str]]:
+    """Kategorik sütunu (int16 kod, etiket listesi) olarak kodlar. None -> ''."""
+    labels: List[str] = []
+    lookup: Dict[str, int] = {}
+    codes = np.empty(len(values), dtype=np.int16)
+    for i, v in enumerate(values):
+        key = v or ""
+        code = lookup.get(key)
+        if code is None:
+            code = lookup[key] = len(labels)
+            labels.append(key)
+        codes[i] = code
+    return codes, labels
+
+
+def _num(value: Any, default: float) -> float:
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _default_rng() -> np.random.Generator:
+    # random.seed(...) ile tohumlanan çağıranlar için deterministik kalır
+    return np.random.default_rng(random.getrandbits(64))
+
+
+class AgentRoster:
+    """Sütun bazlı, salt okunur ajan kadrosu."""
+
+    def __init__(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        row_source: Callable[[List[str]], List[Dict[str, Any]]] | None = None,
+    ):
+        """
+        row_source: id listesi -> satır kopyaları (RosterCache.get_many).
+        Verilmezse satırlar kurulumda kopyalanır (sonraki dış değişiklikler sütunları bozmaz).
+        """
+        rows = list(rows)
+        n = len(rows)
+        self.ids = np.array([r.get("id") for r in rows], dtype=object)
+        self.merit = np.fromiter((_num(r.get("merit_score"), DEFAULT_MERIT) for r in rows), dtype=np.float32, count=n)
+        # trust None -> NaN (NaN < eşik False olduğundan "kural yok" gibi davranır)
+        self.trust = np.fromiter((_num(r.get("trust_score"), np.nan) for r in rows), dtype=np.float32, count=n)
+        self.active = np.fromiter((r.get("is_active") is not False for r in rows), dtype=bool, count=n)
+        self.suspended = np.fromiter((r.get("is_suspended") is True for r in rows), dtype=bool, count=n)
+        self.rejected = np.fromiter((r.get("vetting_status") == "rejected" for r in rows), dtype=bool, count=n)
+        self.hidden = np.fromiter(
+            (r.get("id") == ZERO_ID or r.get("name") == "0" for r in rows), dtype=bool, count=n
+        )
+        self.spec, self.spec_labels = _encode([r.get("specialization") for r in rows])
+        self.eth, self.eth_labels = _encode([r.get("ethnicity") for r in rows])
+        self._index = {aid: i for i, aid in enumerate(self.ids) if aid}
+        if row_source is None:
+            snapshot = {r.get("id"): dict(r) for r in rows}
+            row_source = lambda ids: [dict(snapshot[i]) for i in ids if i in snapshot]  # noqa: E731
+        self._row_source = row_source
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------- maskeler ----------
+
+    def eligible_mask(
+        self,
+        min_trust: float = DEFAULT_MIN_TRUST,
+        include_hidden: bool = True,
+        exclude_ids: Iterable[str] | None = None,
+    ) -> np.ndarray:
+        """Aktif, askıda değil, veto edilmemiş ve trust >= min_trust (trust yoksa geçer)."""
+        mask = self.active & ~self.suspended & ~self.rejected & ~(self.trust < min_trust)
+        if not include_hidden:
+            mask &= ~self.hidden
+        for aid in exclude_ids or ():
+            i = self._index.get(aid)
+            if i is not None:
+                mask[i] = False
+        return mask
+
+    def specialization_mask(self, specialization: str) -> np.ndarray:
+        try:
+            code = self.spec_labels.index(specialization or "")
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        return self.spec == code
+
+    @staticmethod
+    def indices(mask: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(mask)
+
+    # ---------- satır erişimi ----------
+
+    def row(self, i: int) -> Optional[Dict[str, Any]]:
+        found = self._row_source([self.ids[int(i)]])
+        return found[0] if found else None
+
+    def rows(self, idx: Iterable[int] | None = None) -> List[Dict[str, Any]]:
+        """Satır kopyaları (indeks sırasıyla); kaynağında artık olmayan ajan atlanır."""
+        if idx is None:
+            return self._row_source(self.ids.tolist())
+        return self._row_source([self.ids[int(i)] for i in idx])
+
+    def get(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        i = self._index.get(agent_id)
+        return self.row(i) if i is not None else None
+
+    def index_of(self, agent_id: str) -> Optional[int]:
+        return self._index.get(agent_id)
+
+    # ---------- örnekleme ----------
+
+    def sample_indices(
+        self,
+        k: int,
+        mask: np.ndarray | None = None,
+        weights: str | np.ndarray | None = None,
+        replace: bool = True,
+        rng: np.random.Generator | None = None,
+    ) -> np.ndarray:
+        """
+        mask içinden k indeks seçer. weights: None (uniform), "merit" veya dizi (len == len(self)).
+        replace=False ise k, uygun ajan sayısıyla sınırlanır.
+        """
+        pool = self.indices(mask) if mask is not None else np.arange(len(self))
+        if k <= 0 or pool.size == 0:
+            return np.empty(0, dtype=np.int64)
+        if not replace:
+            k = min(k, pool.size)
+
+        p = None
+        if weights is not None:
+            w = self.merit if isinstance(weights, str) and weights == "merit" else np.asarray(weights, dtype=np.float64)
+            w = np.clip(np.asarray(w[pool], dtype=np.float64), 0.0, None)
+            total = w.sum()
+            p = w / total if total > 0 else None
+        return (rng or _default_rng()).choice(pool, size=k, replace=replace, p=p)
+
+    def sample_ids(self, k: int, mask: np.ndarray | None = None, **kwargs) -> List[str]:
+        return self.ids[self.sample_indices(k, mask, **kwargs)].tolist()
+
+    def choice(self, mask: np.ndarray | None = None, **kwargs) -> Optional[Dict[str, Any]]:
+        idx = self.sample_indices(1, mask, **kwargs)
+        return self.row(idx[0]) if idx.size else None
+
+    def top_by_merit(self, k: int, mask: np.ndarray | None = None) -> List[Dict[str, Any]]:
+        """Merit'e göre azalan ilk k ajan (eşitlikte kadro sırası korunur)."""
+        pool = self.indices(mask) if mask is not None else np.arange(len(self))
+        order = pool[np.argsort(-self.merit[pool], kind="stable")]
+        return self.rows(order[:max(0, k)])
+
+    # ---------- gruplama ----------
+
+    def counts_by_specialization(self, mask: np.ndarray | None = None) -> Dict[str, int]:
+        codes = self.spec if mask is None else self.spec[mask]
+        counts = np.bincount(codes, minlength=len(self.spec_labels)) if codes.size else np.zeros(len(self.spec_labels), dtype=np.int64)
+        return {self.spec_labels[c]: int(n) for c, n in enumerate(counts) if n}
+
+    def group_by_specialization(self, mask: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+        """specialization -> indeks dizisi (kadro sırasıyla)."""
+        pool = self.indices(mask) if mask is not None else np.arange(len(self))
+        if pool.size == 0:
+            return {}
+        codes = self.spec[pool]
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+        groups: Dict[str, np.ndarray] = {}
+        for chunk in np.split(pool[order], bounds):
+            groups[self.spec_labels[self.spec[chunk[0]]]] = chunk
+        return groups
+
+    def memory_bytes(self) -> int:
+        """Sütun dizilerinin yaklaşık bellek kullanımı."""
+        arrays = (self.merit, self.trust, self.active, self.suspended, self.rejected, self.hidden, self.spec, self.eth)
+        return int(sum(a.nbytes for a in arrays) + self.ids.nbytes)
@@ -30,7 +30,7 @@ def eyavap_405b_analiz(prompt):
         base_url="https://api.deepinfra.com/v1/openai"
     )
 
-    response = client.chat.completions.create(
+    response = chat_completion(client, provider="deepinfra", site="deepinfra_405b",
         model=model_id,
         messages=[
             {"role": "system", "content": "Sen Llama 3.1 405B motoruyla çalışan, Danimarka uzmanı EyaVAP'sın."},
@@ -46,6 +46,7 @@ import json
 import streamlit as st
 from typing import Dict, Any, Optional
 from datetime import datetime
+from llm_gateway import chat_completion, gemini_model_generate
 
 try:
     import google.generativeai as genai
@@ -60,21 +61,22 @@ except ImportError:
 def get_supabase_client():
     """Supabase client'ını al"""
     try:
-        from supabase import create_client
-        
-        supabase_url = st.secrets.get("SUPABASE_URL")
-        supabase_key = st.secrets.get("SUPABASE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            print("⚠️ Supabase credentials bulunamadı")
-            return None
-        
-        return create_client(supabase_url, supabase_key)
+        # Process genelindeki paylaşılan client (her soru için yeni client kurma)
+        from database import get_database
+
+        return get_database().client
     except Exception as e:
         print(f"⚠️ Supabase bağlantı hatası: {e}")
         return None
 
 
+def _get_roster():
+    """Paylaşılan ajan kadrosu cache'i (database.Database.roster)"""
+    from database import get_database
+
+    return get_database().roster
+
+
 # ==================== AI MODEL BAĞLANTILARI ====================
 
 def get_openai_client():
@@ -139,7 +141,7 @@ def get_gemini_model(is_unrestricted: bool = False):
                     model = genai.GenerativeModel(model_name)
                 
                 # Test et
-                model.generate_content("test")
+                gemini_model_generate(model, "test", site="gemini_probe")
                 print(f"✅ Gemini model hazır: {model_name} ({'Unrestricted' if is_unrestricted else 'Normal'})")
                 return model
             except:
@@ -200,7 +202,7 @@ SADECE JSON formatında yanıt ver:
 
         # OpenAI veya Gemini kullan
         if hasattr(client, 'chat'):  # OpenAI
-            response = client.chat.completions.create(
+            response = chat_completion(client, site="topic_analysis",
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "Sen bir sorgu sınıflandırma uzmanısın. Sadece JSON formatında yanıt ver."},
@@ -212,7 +214,7 @@ SADECE JSON formatında yanıt ver:
             )
             result = json.loads(response.choices[0].message.content)
         else:  # Gemini
-            response = client.generate_content(prompt)
+            response = gemini_model_generate(client, prompt, site="topic_analysis")
             result = json.loads(response.text.strip().replace('```json', '').replace('```', ''))
         
         return {
@@ -246,12 +248,12 @@ def find_or_create_agent(specialization: str, keywords: list, supabase) -> Dict[
         }
     
     try:
-        # Mevcut ajanları ara
-        response = supabase.table("agents").select("*").eq("specialization", specialization).eq("is_active", True).execute()
+        # Mevcut ajanları ara (kadro cache'inden)
+        candidates = _get_roster().by_specialization(specialization)
         
-        if response.data and len(response.data) > 0:
+        if candidates:
             # En yüksek liyakat puanlı ajanı seç
-            agent = sorted(response.data, key=lambda x: x.get("merit_score", 0), reverse=True)[0]
+            agent = max(candidates, key=lambda x: x.get("merit_score", 0) or 0)
             print(f"✅ Mevcut ajan bulundu: {agent['name']}")
             agent["is_new"] = False
             return agent
@@ -291,6 +293,7 @@ def find_or_create_agent(specialization: str, keywords: list, supabase) -> Dict[
         result = supabase.table("agents").insert(new_agent).execute()
         
         if result.data:
+            _get_roster().invalidate()
             agent = result.data[0]
             agent["is_new"] = True
             print(f"🆕 Yeni Soldier ajan oluşturuldu: {agent_name}")
@@ -323,17 +326,27 @@ def update_merit_score(agent_id: str, success: bool, supabase):
         return
     
     try:
-        # Mevcut ajanı al
-        response = supabase.table("agents").select("*").eq("id", agent_id).single().execute()
-        
+        delta = 2 if success else -3
+        try:
+            # Sunucu tarafında atomik artış (social_schema.sql); eşzamanlı yazımlar kaybolmaz
+            supabase.rpc("adjust_merit_score", {"agent_id_param": agent_id, "adjustment": delta}).execute()
+            adjusted = True
+        except Exception as e:
+            print(f"⚠️ adjust_merit_score RPC kullanılamıyor, satır bazlı güncelleme: {e}")
+            adjusted = False
+
+        # Rütbe için taze satır (roster cache TTL kadar eski olabilir)
+        response = supabase.table("agents").select("id,merit_score").eq("id", agent_id).limit(1).execute()
         if not response.data:
             return
         
-        agent = response.data
-        current_score = agent.get("merit_score", 50)
+        current_score = response.data[0].get("merit_score", 50)
         
         # Puan güncelle
-        if success:
+        if adjusted:
+            new_score = current_score
+            current_score = new_score - delta
+        elif success:
             new_score = min(100, current_score + 2)
         else:
             new_score = max(0, current_score - 3)
@@ -348,12 +361,15 @@ def update_merit_score(agent_id: str, success: bool, supabase):
         else:
             new_rank = "menig"
         
-        # Güncelle
-        supabase.table("agents").update({
-            "merit_score": new_score,
+        # Güncelle (RPC çalıştıysa puan zaten yazıldı; sadece rütbe / last_used)
+        update = {
             "rank": new_rank,
             "last_used": datetime.utcnow().isoformat()
-        }).eq("id", agent_id).execute()
+        }
+        if not adjusted:
+            update["merit_score"] = new_score
+        supabase.table("agents").update(update).eq("id", agent_id).execute()
+        _get_roster().patch(agent_id, {**update, "merit_score": new_score})
         
         print(f"📊 Liyakat güncellendi: {current_score} → {new_score} (Rütbe: {new_rank})")
         
@@ -433,15 +449,30 @@ def perform_action(action_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
 
 # ==================== ANA FONKSİYON ====================
 
-def ask_the_government(user_query: str) -> Dict[str, Any]:
+ASK_CACHE_PROMPT_ID = "ask_the_government:v1"
+
+
+def _stream_gemini_tokens(model, prompt: str):
+    """Gemini yanıtını parça parça akıtır."""
+    for chunk in gemini_model_generate(model, prompt, stream=True, site="ask_answer_stream"):
+        text = getattr(chunk, "text", "")
+        if text:
+            yield text
+
+
+def ask_the_government(user_query: str, use_cache: bool = True, stream: bool = False) -> Dict[str, Any]:
     """
     Ana ajan sistemi
     
+    0. Cache kontrolü (aynı soru + aynı model = anında yanıt)
     1. Konuyu analiz et (OpenAI/Gemini)
     2. Uygun ajan bul/oluştur (Supabase)
     3. Yanıt üret (OpenAI/Gemini)
     4. Liyakat puanını güncelle
     5. Sorguyu logla
+
+    stream=True: dönen dict'te "answer_stream" token generator'ı olur; 4-5. adımlar
+    ve cache yazımı akış bittiğinde yapılır, "answer" / "ttft_ms" o zaman dolar.
     """
     start_time = time.time()
     
@@ -451,6 +482,27 @@ def ask_the_government(user_query: str) -> Dict[str, Any]:
     # AI model seçimi: Önce OpenAI, fallback Gemini
     client = get_openai_client()
     use_openai = bool(client)
+
+    # 0. Cache (sistem prompt'u ajanın anlık liyakatini içerdiği için sürüm kimliği ile anahtarlanır)
+    from answer_cache import get_answer_cache, make_cache_key, cache_disabled
+
+    cache = get_answer_cache()
+    cache_key = make_cache_key(user_query, ASK_CACHE_PROMPT_ID, "gpt-4o-mini" if use_openai else "gemini")
+    if use_cache and not cache_disabled():
+        cached = cache.get(cache_key)
+        if cached is not None:
+            log_query(cached.get("agent_id", "fallback"), user_query, cached.get("answer", ""), True, supabase)
+            result = {
+                **cached,
+                "execution_time_ms": int((time.time() - start_time) * 1000),
+                "cached": True,
+            }
+            if stream:
+                result["answer_stream"] = iter([cached.get("answer", "")])
+                result["ttft_ms"] = result["execution_time_ms"]
+            return result
+    else:
+        cache.record_bypass()
     
     if not use_openai:
         # OpenAI yoksa Gemini dene (kısıtlamasız mod için hazır olsun)
@@ -548,37 +600,17 @@ Gerekirse eylem yetkilerini kullan (web araştırması, analiz, vb.).
 Dürüst ve yardımcı ol. Bilmediğin konularda tahminde bulunma."""
 
         # AI model ile yanıt üret
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_query}
+        ]
+        full_prompt = f"{system_prompt}\n\nSORU: {user_query}"
         if use_openai:
-            # OpenAI ile yanıt üret
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_query}
-                ],
-                temperature=0.3,
-                max_tokens=1500
-            )
-            answer = response.choices[0].message.content.strip()
             model_used = "OpenAI GPT-4o-mini"
         else:
-            # Gemini ile yanıt üret (kısıtlamasız modda güvenlik filtreleri kapalı)
-            full_prompt = f"{system_prompt}\n\nSORU: {user_query}"
-            response = gemini_model.generate_content(full_prompt)
-            answer = response.text.strip()
+            # Gemini (kısıtlamasız modda güvenlik filtreleri kapalı)
             model_used = f"Gemini {'🔓 Unrestricted' if is_unrestricted else ''}"
-        
-        # 4. Liyakat güncelle
-        success = len(answer) > 50  # Basit başarı kriteri
-        update_merit_score(agent["id"], success, supabase)
-        
-        # 5. Logla
-        log_query(agent["id"], user_query, answer, success, supabase)
-        
-        execution_time_ms = int((time.time() - start_time) * 1000)
-        
-        print(f"✅ İşlem tamamlandı ({execution_time_ms}ms)")
-        
+
         # Dashboard formatı
         rank_icons = {
             "soldier": "🪖",
@@ -587,8 +619,8 @@ Dürüst ve yardımcı ol. Bilmediğin konularda tahminde bulunma."""
             "vice_president": "⭐"
         }
         
-        return {
-            "answer": answer,
+        result = {
+            "answer": "",
             "ministry_name": agent["name"],
             "ministry_icon": rank_icons.get(agent.get("rank", "soldier"), "🤖"),
             "ministry_style": "color: white;",
@@ -599,9 +631,84 @@ Dürüst ve yardımcı ol. Bilmediğin konularda tahminde bulunma."""
             "agent_merit": agent.get("merit_score", 50),
             "agent_created": agent.get("is_new", False),
             "ai_model": model_used,  # Hangi AI modeli kullanıldı
-            "execution_time_ms": execution_time_ms,
-            "success": success
+            "execution_time_ms": 0,
+            "success": False,
+            "cached": False
         }
+
+        def _finalize(answer: str) -> Dict[str, Any]:
+            # 4. Liyakat güncelle
+            success = len(answer) > 50  # Basit başarı kriteri
+            update_merit_score(agent["id"], success, supabase)
+            
+            # 5. Logla
+            log_query(agent["id"], user_query, answer, success, supabase)
+            
+            result["answer"] = answer
+            result["success"] = success
+            result["execution_time_ms"] = int((time.time() - start_time) * 1000)
+            print(f"✅ İşlem tamamlandı ({result['execution_time_ms']}ms)")
+
+            # Sadece başarılı yanıtlar cache'lenir; yeni ajan bayrağı tekrar edilmez
+            if success:
+                cache.set(cache_key, {k: v for k, v in result.items() if k != "answer_stream"} | {"agent_created": False})
+            return result
+
+        def _abort(partial: str) -> None:
+            log_query(agent["id"], user_query, partial, False, supabase)
+            result["answer"] = partial
+            result["success"] = False
+            result["execution_time_ms"] = int((time.time() - start_time) * 1000)
+            print(f"⚠️ Akış tamamlanmadı ({result['execution_time_ms']}ms)")
+
+        if stream:
+            def _answer_stream():
+                parts = []
+                gen_start = time.time()
+                if use_openai:
+                    from database import openai_chat_stream
+                    tokens = openai_chat_stream(
+                        messages, temperature=0.3, max_tokens=1500,
+                        client=client, site="ask_answer_stream",
+                    )
+                else:
+                    tokens = _stream_gemini_tokens(gemini_model, full_prompt)
+                completed = False
+                try:
+                    for token in tokens:
+                        if not parts:
+                            result["ttft_ms"] = int((time.time() - gen_start) * 1000)
+                            print(f"⏱️ TTFT: {result['ttft_ms']}ms (toplam {int((time.time() - start_time) * 1000)}ms)")
+                        parts.append(token)
+                        yield token
+                    completed = True
+                except Exception as e:
+                    print(f"❌ Akış hatası: {e}")
+                    yield f"\n\n⚠️ Sistem hatası: {str(e)}"
+                finally:
+                    if completed:
+                        _finalize("".join(parts).strip())
+                    else:
+                        # Yarıda kalan akış (hata / tüketici bıraktı): başarısız logla,
+                        # liyakat artmaz, kısmi yanıt cache'e yazılmaz
+                        _abort("".join(parts).strip())
+
+            result["answer_stream"] = _answer_stream()
+            return result
+
+        if use_openai:
+            response = chat_completion(client, site="ask_answer",
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.3,
+                max_tokens=1500
+            )
+            answer = response.choices[0].message.content.strip()
+        else:
+            response = gemini_model_generate(gemini_model, full_prompt, site="ask_answer")
+            answer = response.text.strip()
+
+        return _finalize(answer)
         
     except Exception as e:
         print(f"❌ Hata: {e}")
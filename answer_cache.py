@@ -0,0 +1,211 @@
+"""
+EYAVAP: Answer Cache
+Tekrarlanan kullanıcı sorularına (vergi, CPR, sağlık...) milisaniyede cevap.
+
+- Bellek içi LRU katmanı (her zaman açık)
+- Opsiyonel SQLite/disk katmanı (EYAVAP_ANSWER_CACHE_DB=/path/cache.sqlite3)
+- TTL + boyut sınırlı tahliye, hit/miss sayaçları
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_TTL_SECONDS = 6 * 3600
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_DISK_MAX_ENTRIES = 10000
+
+_WS_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s\?\!\.\,\;\:]+$")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+def normalize_query(text: str) -> str:
+    """Küçük harf, tek boşluk, sondaki noktalama yok."""
+    t = _WS_RE.sub(" ", (text or "").strip().lower())
+    return _TRAILING_PUNCT_RE.sub("", t)
+
+
+def make_cache_key(query: str, system_prompt: str = "", model: str = "") -> str:
+    raw = "\x1f".join([normalize_query(query), system_prompt or "", model or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """LRU + TTL bellek katmanı, opsiyonel SQLite ikinci katman."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        disk_path: str | None = None,
+        disk_max_entries: int = DEFAULT_DISK_MAX_ENTRIES,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = max(1, ttl_seconds)
+        self.disk_max_entries = max(1, disk_max_entries)
+        self._mem: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: sqlite3.Connection | None = None
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "sets": 0, "evictions": 0, "bypassed": 0}
+
+        if disk_path:
+            try:
+                self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS answer_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._disk.execute("CREATE INDEX IF NOT EXISTS idx_answer_cache_accessed ON answer_cache(accessed_at)")
+                self._disk.commit()
+            except Exception as e:
+                print(f"⚠️ Answer cache disk katmanı açılamadı: {e}")
+                self._disk = None
+
+    # ---------- public ----------
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._mem.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                del self._mem[key]
+
+            value = self._disk_get(key, now)
+            if value is not None:
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                self._mem_set(key, value, now + self.ttl_seconds)
+                return value
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: int | None = None) -> None:
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._mem_set(key, value, expires_at)
+            self._disk_set(key, value, expires_at)
+            self.stats["sets"] += 1
+
+    def invalidate(self, key: str | None = None) -> None:
+        """key verilmezse tüm cache temizlenir."""
+        with self._lock:
+            if key is None:
+                self._mem.clear()
+            else:
+                self._mem.pop(key, None)
+            if self._disk is not None:
+                try:
+                    if key is None:
+                        self._disk.execute("DELETE FROM answer_cache")
+                    else:
+                        self._disk.execute("DELETE FROM answer_cache WHERE key = ?", (key,))
+                    self._disk.commit()
+                except Exception as e:
+                    print(f"⚠️ Answer cache disk temizleme hatası: {e}")
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.stats["bypassed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._mem)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    # ---------- internal ----------
+
+    def _mem_set(self, key: str, value: Any, expires_at: float) -> None:
+        self._mem[key] = (expires_at, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Any]:
+        if self._disk is None:
+            return None
+        try:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM answer_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if row[1] <= now:
+                self._disk.execute("DELETE FROM answer_cache WHERE key = ?", (key,))
+                self._disk.commit()
+                return None
+            self._disk.execute("UPDATE answer_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._disk.commit()
+            return json.loads(row[0])
+        except Exception as e:
+            print(f"⚠️ Answer cache disk okuma hatası: {e}")
+            return None
+
+    def _disk_set(self, key: str, value: Any, expires_at: float) -> None:
+        if self._disk is None:
+            return
+        try:
+            now = time.time()
+            self._disk.execute(
+                "INSERT OR REPLACE INTO answer_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            self._disk.execute("DELETE FROM answer_cache WHERE expires_at <= ?", (now,))
+            # Boyut sınırı: en eski erişilenleri sil
+            self._disk.execute(
+                "DELETE FROM answer_cache WHERE key IN ("
+                "SELECT key FROM answer_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            )
+            self._disk.commit()
+        except Exception as e:
+            print(f"⚠️ Answer cache disk yazma hatası: {e}")
+
+
+_CACHE: AnswerCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """
+    Process genelinde paylaşılan cache.
+    Ayarlar: EYAVAP_ANSWER_CACHE_SIZE, EYAVAP_ANSWER_CACHE_TTL, EYAVAP_ANSWER_CACHE_DB
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = AnswerCache(
+                max_entries=_env_int("EYAVAP_ANSWER_CACHE_SIZE", DEFAULT_MAX_ENTRIES),
+                ttl_seconds=_env_int("EYAVAP_ANSWER_CACHE_TTL", DEFAULT_TTL_SECONDS),
+                disk_path=(os.getenv("EYAVAP_ANSWER_CACHE_DB") or "").strip() or None,
+            )
+        return _CACHE
+
+
+def cache_disabled() -> bool:
+    """EYAVAP_ANSWER_CACHE=0 ile tamamen kapatılabilir."""
+    return (os.getenv("EYAVAP_ANSWER_CACHE", "1") or "1").strip().lower() in ("0", "false", "no")
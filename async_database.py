@@ -0,0 +1,384 @@
+"""
+EYAVAP: Async Database
+database.Database'in asyncio karşılığı. supabase AsyncClient (httpx.AsyncClient)
+üzerine kurulu; aynı metotları coroutine olarak sunar. Eşzamanlı istek sayısı
+bir semaphore ile sınırlanır, böylece döngü kodu bağımsız okuma/yazmaları
+asyncio.gather ile paralel çalıştırabilir.
+
+    adb = await AsyncDatabase.create()
+    await adb.gather(*(adb.log_learning_event(a, "post_created") for a in agent_ids))
+    await adb.close()
+
+Ayarlar: SUPABASE_ASYNC_CONCURRENCY (varsayılan 16), SUPABASE_POOL_SIZE, SUPABASE_KEEPALIVE_SECONDS
+Native karşılığı olmayan Database metotları, paylaşılan sync Database üzerinde
+thread'de (yine semaphore altında) çalıştırılır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Dict, List
+
+from database import (
+    Database,
+    _get_int_setting,
+    _get_secret,
+    _is_missing_function,
+    get_database,
+    httpx,
+)
+
+DEFAULT_CONCURRENCY = 16
+
+
+async def _create_async_client(url: str, key: str):
+    """Havuzlu httpx.AsyncClient ile supabase AsyncClient kurar."""
+    from supabase import acreate_client
+
+    pool_size = max(1, _get_int_setting("SUPABASE_POOL_SIZE", 20))
+    keepalive = max(1, _get_int_setting("SUPABASE_KEEPALIVE_SECONDS", 60))
+
+    if httpx is not None:
+        try:
+            from supabase.lib.client_options import AsyncClientOptions
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=keepalive,
+                ),
+                timeout=httpx.Timeout(30.0),
+            )
+            return await acreate_client(url, key, options=AsyncClientOptions(httpx_client=http_client))
+        except Exception:
+            # Eski supabase sürümleri httpx_client kabul etmez
+            pass
+    return await acreate_client(url, key)
+
+
+class AsyncDatabase:
+    """Database metotlarının coroutine halleri + sınırlı eşzamanlılık."""
+
+    def __init__(self, client, concurrency: int | None = None):
+        self.client = client
+        self.concurrency = max(1, concurrency or _get_int_setting("SUPABASE_ASYNC_CONCURRENCY", DEFAULT_CONCURRENCY))
+        self._sem = asyncio.Semaphore(self.concurrency)
+        self._skill_rpc_available = True
+        self.created_at = time.time()
+        self.last_health_check = 0.0
+        self.stats = {"requests": 0, "errors": 0, "thread_calls": 0}
+
+    @classmethod
+    async def create(cls, concurrency: int | None = None) -> "AsyncDatabase":
+        url = _get_secret("SUPABASE_URL", "")
+        key = _get_secret("SUPABASE_SERVICE_ROLE_KEY", "") or _get_secret("SUPABASE_KEY", "")
+        if not url or not key:
+            missing = []
+            if not url:
+                missing.append("SUPABASE_URL")
+            if not key:
+                missing.append("SUPABASE_SERVICE_ROLE_KEY/SUPABASE_KEY")
+            raise ValueError(f"❌ HATA: Eksik ortam değişkenleri: {', '.join(missing)}")
+        client = await _create_async_client(url, key)
+        return cls(client, concurrency=concurrency)
+
+    async def close(self) -> None:
+        """Alttaki HTTP bağlantılarını kapatır (best effort)."""
+        for attr in ("postgrest", "_postgrest"):
+            pg = getattr(self.client, attr, None)
+            session = getattr(pg, "session", None)
+            if session is not None and hasattr(session, "aclose"):
+                try:
+                    await session.aclose()
+                except Exception:
+                    pass
+                return
+
+    # ==================== ÇEKİRDEK ====================
+
+    async def execute(self, query):
+        """Bir PostgREST sorgusunu (await query.execute()) semaphore altında çalıştırır."""
+        async with self._sem:
+            self.stats["requests"] += 1
+            try:
+                return await query.execute()
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+
+    async def gather(self, *aws: Awaitable, return_exceptions: bool = True) -> List[Any]:
+        """asyncio.gather kısayolu; varsayılan olarak hataları sonuç listesinde döndürür."""
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    async def run_sync(self, method: str, *args, **kwargs):
+        """Native karşılığı olmayan Database metodunu thread'de çalıştırır."""
+        async with self._sem:
+            self.stats["thread_calls"] += 1
+            return await asyncio.to_thread(getattr(get_database(), method), *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Database'de olup burada olmayan public metotlar -> thread'de çalışan coroutine
+        if not name.startswith("_") and callable(getattr(Database, name, None)):
+            async def _proxy(*args, **kwargs):
+                return await self.run_sync(name, *args, **kwargs)
+
+            _proxy.__name__ = name
+            return _proxy
+        raise AttributeError(name)
+
+    # ==================== LOG / AJAN ====================
+
+    async def log_query(self, agent_id: str, user_query: str, agent_response: str, success: bool = True):
+        """Sorguları agent_queries tablosuna loglar"""
+        try:
+            return await self.execute(
+                self.client.table("agent_queries").insert(
+                    {
+                        "agent_id": agent_id,
+                        "user_query": user_query,
+                        "agent_response": agent_response,
+                        "success": success,
+                        "created_at": datetime.utcnow().isoformat(),
+                    }
+                )
+            )
+        except Exception as e:
+            print(f"❌ Sorgu loglama hatası: {e}")
+
+    async def get_all_agents(self, include_inactive: bool = False) -> List[Dict[str, Any]]:
+        """Ajanları merit puanına göre listeler"""
+        try:
+            q = self.client.table("agents").select("*")
+            if not include_inactive:
+                q = q.eq("is_active", True)
+            res = await self.execute(q.order("merit_score", desc=True))
+            return res.data or []
+        except Exception as e:
+            print(f"❌ Ajan listeleme hatası: {e}")
+            return []
+
+    async def get_agent_statistics(self) -> List[Dict[str, Any]]:
+        """agent_activity_statistics view'ından okur; yoksa sync legacy yola döner."""
+        try:
+            res = await self.execute(
+                self.client.table("agent_activity_statistics")
+                .select(
+                    "id,name,specialization,rank,merit_score,total_queries,successful_queries,success_rate,last_used,"
+                    "ethnicity,origin_country,total_topics,total_comments,last_post_at,last_comment_at"
+                )
+                .eq("is_active", True)
+                .order("merit_score", desc=True)
+            )
+            agents = res.data or []
+            for a in agents:
+                a["total_topics"] = a.get("total_topics") or 0
+                a["total_comments"] = a.get("total_comments") or 0
+                last_post = a.pop("last_post_at", None)
+                last_comment = a.pop("last_comment_at", None)
+                a["last_active"] = max([t for t in [a.get("last_used"), last_post, last_comment] if t], default=None)
+            return agents
+        except Exception as e:
+            print(f"⚠️ Rollup view hatası, satır bazlı istatistiğe dönülüyor: {e}")
+        return await self.run_sync("_get_agent_statistics_legacy")
+
+    # ==================== LEARNING / KNOWLEDGE ====================
+
+    async def add_knowledge_unit(
+        self,
+        agent_id: str,
+        content: str,
+        source_type: str = "news",
+        source_title: str = "",
+        source_link: str = "",
+        tags: List[str] | None = None,
+        reliability_score: float = 0.6,
+    ):
+        try:
+            return await self.execute(
+                self.client.table("knowledge_units").insert(
+                    {
+                        "agent_id": agent_id,
+                        "source_type": source_type,
+                        "source_title": source_title,
+                        "source_link": source_link,
+                        "content": content,
+                        "tags": tags or [],
+                        "reliability_score": max(0.0, min(1.0, reliability_score)),
+                        "created_at": datetime.utcnow().isoformat(),
+                    }
+                )
+            )
+        except Exception as e:
+            print(f"❌ Knowledge unit hatası: {e}")
+
+    async def update_skill_score(self, agent_id: str, specialization: str, delta: float, reason: str = ""):
+        """increment_skill_score RPC; RPC yoksa oku-yaz yolu."""
+        try:
+            if not await self._increment_skill_score_rpc(agent_id, specialization, delta):
+                await self.run_sync("_update_skill_score_legacy", agent_id, specialization, delta)
+            if reason:
+                await self.log_learning_event(
+                    agent_id=agent_id,
+                    event_type="skill_update",
+                    details={"specialization": specialization, "delta": delta, "reason": reason},
+                )
+        except Exception as e:
+            print(f"❌ Skill score hatası: {e}")
+
+    async def _increment_skill_score_rpc(self, agent_id: str, specialization: str, delta: float) -> bool:
+        if not self._skill_rpc_available:
+            return False
+        try:
+            await self.execute(
+                self.client.rpc(
+                    "increment_skill_score",
+                    {
+                        "agent_id_param": agent_id,
+                        "specialization_param": specialization,
+                        "delta_param": float(delta),
+                    },
+                )
+            )
+            return True
+        except Exception as e:
+            # Sadece RPC tanımlı değilse eski yola kalıcı dön; geçici hatalar yükselir
+            if not _is_missing_function(e):
+                raise
+            print(f"⚠️ increment_skill_score RPC kullanılamıyor, eski yola dönülüyor: {e}")
+            self._skill_rpc_available = False
+            return False
+
+    async def log_learning_event(self, agent_id: str, event_type: str, details: Dict[str, Any] | None = None):
+        try:
+            return await self.execute(
+                self.client.table("agent_learning_logs").insert(
+                    {
+                        "agent_id": agent_id,
+                        "event_type": event_type,
+                        "details": details or {},
+                        "created_at": datetime.utcnow().isoformat(),
+                    }
+                )
+            )
+        except Exception as e:
+            print(f"❌ Learning log hatası: {e}")
+
+    # ==================== COMPLIANCE / TRUST ====================
+
+    async def log_compliance_event(
+        self,
+        agent_id: str,
+        event_type: str,
+        severity: str = "low",
+        details: Dict[str, Any] | None = None,
+    ):
+        try:
+            return await self.execute(
+                self.client.table("compliance_events").insert(
+                    {
+                        "agent_id": agent_id,
+                        "event_type": event_type,
+                        "severity": severity,
+                        "details": details or {},
+                        "created_at": datetime.utcnow().isoformat(),
+                    }
+                )
+            )
+        except Exception as e:
+            print(f"❌ Compliance event hatası: {e}")
+
+    async def apply_compliance_strikes(self, strikes: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Toplu strike (apply_compliance_strikes RPC); RPC yoksa sync yola döner."""
+        strikes = [s for s in strikes if s and s.get("agent_id")]
+        if not strikes:
+            return {}
+        payload = [
+            {
+                "agent_id": s["agent_id"],
+                "reason": s.get("reason") or "policy_violation",
+                "severity": s.get("severity") or "low",
+            }
+            for s in strikes
+        ]
+        try:
+            res = await self.execute(self.client.rpc("apply_compliance_strikes", {"strikes": payload}))
+            results = {
+                row["agent_id"]: {
+                    "trust_score": row.get("trust_score"),
+                    "compliance_strikes": row.get("compliance_strikes"),
+                    "is_suspended": row.get("is_suspended"),
+                    "trust_delta": row.get("trust_delta"),
+                }
+                for row in (res.data or [])
+            }
+            roster = get_database().roster
+            for aid, out in results.items():
+                roster.patch(aid, {k: v for k, v in out.items() if k != "trust_delta"})
+            return results
+        except Exception as e:
+            print(f"⚠️ apply_compliance_strikes RPC hatası, sync yola dönülüyor: {e}")
+        return await self.run_sync("apply_compliance_strikes", payload)
+
+    async def apply_compliance_strike(self, agent_id: str, reason: str, severity: str = "low") -> Dict[str, Any] | None:
+        results = await self.apply_compliance_strikes([{"agent_id": agent_id, "reason": reason, "severity": severity}])
+        return results.get(agent_id)
+
+    async def create_revision_task(self, agent_id: str, post_id: str, reason: str):
+        try:
+            return await self.execute(
+                self.client.table("revision_tasks").insert(
+                    {
+                        "agent_id": agent_id,
+                        "post_id": post_id,
+                        "reason": reason,
+                        "status": "open",
+                        "created_at": datetime.utcnow().isoformat(),
+                    }
+                )
+            )
+        except Exception as e:
+            print(f"❌ Revision task hatası: {e}")
+
+    async def update_revision_task(
+        self,
+        task_id: str,
+        revised_content: str,
+        ai_summary: str = "",
+        status: str = "in_review",
+    ):
+        try:
+            await self.execute(
+                self.client.table("revision_tasks").update(
+                    {
+                        "revised_content": revised_content,
+                        "ai_summary": ai_summary,
+                        "status": status,
+                        "resolved_at": datetime.utcnow().isoformat() if status == "closed" else None,
+                    }
+                ).eq("id", task_id)
+            )
+        except Exception as e:
+            print(f"❌ Revision update hatası: {e}")
+
+    async def daily_amnesty(self):
+        try:
+            res = await self.execute(self.client.rpc("daily_amnesty_bulk", {}))
+            get_database().roster.invalidate()
+            return {"amnestied": int(res.data or 0)}
+        except Exception as e:
+            print(f"⚠️ daily_amnesty_bulk RPC hatası, ajan bazlı affa dönülüyor: {e}")
+        return await self.run_sync("_daily_amnesty_legacy")
+
+    # ==================== HEALTH ====================
+
+    async def health_check(self) -> bool:
+        try:
+            await self.execute(self.client.table("agents").select("id").limit(1))
+            self.last_health_check = time.time()
+            return True
+        except Exception as e:
+            print(f"⚠️ Supabase health check başarısız: {e}")
+            return False
@@ -0,0 +1,290 @@
+"""
+EYAVAP: AI Budget Control
+ai_budget_state tablosunu okuyan (load shedding) ve güncelleyen (controller) katman.
+
+Modlar:
+- high   -> bütçe bol: iş hacmi x1.3
+- normal -> harcama hızına göre 0.6-1.0 arası ölçek (yorumlar daha sert kısılır)
+- low    -> bütçe bitti / sağlayıcı hataları yüksek: az iş + şablon fallback (AI kapalı)
+
+Ayarlar (env / secrets):
+- EYAVAP_DAILY_TOKEN_BUDGET=2000000  -> günlük token bütçesi
+- EYAVAP_BUDGET_MAX_ERROR_RATE=0.2   -> bu oranı aşan hata oranı "low"a geçirir
+- EYAVAP_BUDGET_TTL=60               -> state cache süresi (sn)
+- BUDGET_MODE=low|normal|high        -> controller'ı ezer (manuel)
+
+Kullanım:
+    state = get_budget_state()
+    n = scaled(num_comments, state, "comments")
+    use_ai = ai_allowed(state)
+
+    python budget_control.py            # controller'ı bir kez çalıştırır
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+DEFAULT_DAILY_TOKEN_BUDGET = 2_000_000
+DEFAULT_MAX_ERROR_RATE = 0.2
+DEFAULT_TTL_SECONDS = 60
+
+MODE_PRESETS: Dict[str, Dict[str, float]] = {
+    "high": {"scale_posts": 1.3, "scale_comments": 1.3, "scale_votes": 1.3},
+    "normal": {"scale_posts": 1.0, "scale_comments": 1.0, "scale_votes": 1.0},
+    "low": {"scale_posts": 0.6, "scale_comments": 0.3, "scale_votes": 1.0},
+}
+# Hata oranı penceresi için en az bu kadar istek gerekir (gürültüye tepki verme)
+MIN_REQUESTS_FOR_ERROR_RATE = 10
+
+_STATE: Optional[Dict[str, Any]] = None
+_STATE_AT = 0.0
+_LOCK = threading.Lock()
+# Gateway sayaçlarının son bildirilen değerleri (süreç başına delta için)
+_REPORTED = {"tokens": 0, "requests": 0, "errors": 0}
+# Aynı deltanın eşzamanlı iki güncellemede iki kez yazılmasını önler
+_UPDATE_LOCK = threading.Lock()
+
+
+def _setting(name: str, default: float) -> float:
+    val = os.getenv(name)
+    if val is None:
+        try:
+            import streamlit as st
+
+            val = st.secrets.get(name)
+        except Exception:
+            val = None
+    try:
+        return float(val) if val not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def _preset(mode: str, reason: str = "") -> Dict[str, Any]:
+    mode = mode if mode in MODE_PRESETS else "normal"
+    return {"day": _today(), "mode": mode, **MODE_PRESETS[mode], "reason": reason}
+
+
+def _manual_mode() -> str:
+    return (os.getenv("BUDGET_MODE") or "").strip().lower()
+
+
+# ==================== OKUMA (LOAD SHEDDING) ====================
+
+def get_budget_state(refresh: bool = False) -> Dict[str, Any]:
+    """
+    Bugünün bütçe durumu (mode + scale_*). Tablo / satır yoksa "normal".
+    EYAVAP_BUDGET_TTL saniye cache'lenir.
+    """
+    global _STATE, _STATE_AT
+    manual = _manual_mode()
+    if manual in MODE_PRESETS:
+        return _preset(manual, "BUDGET_MODE")
+
+    ttl = _setting("EYAVAP_BUDGET_TTL", DEFAULT_TTL_SECONDS)
+    with _LOCK:
+        if not refresh and _STATE is not None and _STATE.get("day") == _today() and time.time() - _STATE_AT < ttl:
+            return dict(_STATE)
+
+    state = _preset("normal", "default")
+    try:
+        from database import get_database
+
+        res = (
+            get_database().client.table("ai_budget_state")
+            .select("*")
+            .eq("day", _today())
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        if res.data:
+            row = res.data[0]
+            state = {**_preset(row.get("mode") or "normal"), **{k: v for k, v in row.items() if v is not None}}
+    except Exception as e:
+        print(f"⚠️ ai_budget_state okunamadı, normal mod: {e}")
+
+    with _LOCK:
+        _STATE, _STATE_AT = state, time.time()
+    return dict(state)
+
+
+def scaled(count: int, state: Dict[str, Any], kind: str) -> int:
+    """count'u state'teki scale_<kind> ile ölçekler (kind: posts | comments | votes)."""
+    if count <= 0:
+        return 0
+    try:
+        scale = float(state.get(f"scale_{kind}", 1.0))
+    except (TypeError, ValueError):
+        scale = 1.0
+    return max(0, int(round(count * max(0.0, scale))))
+
+
+def ai_allowed(state: Dict[str, Any]) -> bool:
+    """low modda içerik üretimi şablonlara düşer."""
+    return state.get("mode") != "low"
+
+
+def describe(state: Dict[str, Any]) -> str:
+    return (
+        f"{state.get('mode')} (posts x{state.get('scale_posts')}, comments x{state.get('scale_comments')}, "
+        f"votes x{state.get('scale_votes')})"
+    )
+
+
+# ==================== CONTROLLER ====================
+
+def _gateway_totals() -> Dict[str, int]:
+    try:
+        from llm_gateway import get_gateway_stats
+    except Exception:
+        return dict(_REPORTED)
+    totals = {"tokens": 0, "requests": 0, "errors": 0}
+    for stats in get_gateway_stats().values():
+        # Gerçek usage + usage dönmeyen çağrıların tahmini (çağrı bazında)
+        totals["tokens"] += int(stats.get("tokens_used") or 0) + int(stats.get("tokens_unreported") or 0)
+        totals["requests"] += int(stats.get("requests") or 0)
+        totals["errors"] += int(stats.get("errors") or 0) + int(stats.get("timeouts") or 0)
+    return totals
+
+
+def _record_usage(client, day: str, delta: Dict[str, int]) -> Dict[str, Any]:
+    """Deltayı günün satırına ekler; güncel satırı döndürür."""
+    try:
+        res = client.rpc(
+            "add_ai_budget_usage",
+            {
+                "day_param": day,
+                "tokens_param": delta["tokens"],
+                "requests_param": delta["requests"],
+                "errors_param": delta["errors"],
+            },
+        ).execute()
+        if res.data:
+            return res.data[0]
+    except Exception as e:
+        print(f"⚠️ add_ai_budget_usage RPC yok, satır bazlı güncelleme: {e}")
+
+    # Fallback (migration_ai_budget_controller.sql çalıştırılmamış)
+    rows = client.table("ai_budget_state").select("*").eq("day", day).limit(1).execute().data or []
+    row = rows[0] if rows else {"day": day}
+    for col, key in (("tokens_spent", "tokens"), ("llm_requests", "requests"), ("llm_errors", "errors")):
+        row[col] = int(row.get(col) or 0) + delta[key]
+    return row
+
+
+def decide_mode(
+    tokens_spent: int,
+    daily_budget: float,
+    error_rate: float,
+    day_fraction: float,
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+) -> Dict[str, Any]:
+    """
+    Harcama hızına göre mod ve ölçekler.
+    pace = (bugüne kadarki harcama / geçen gün oranı) / günlük bütçe; 1.0 = tam bütçede biter.
+    """
+    if tokens_spent >= daily_budget:
+        return _preset("low", "daily_budget_exhausted")
+    if error_rate > max_error_rate:
+        return _preset("low", f"error_rate={error_rate:.2f}")
+
+    pace = (tokens_spent / max(day_fraction, 1 / 24)) / max(daily_budget, 1)
+    if pace > 1.5:
+        return _preset("low", f"pace={pace:.2f}")
+    if pace < 0.5:
+        return _preset("high", f"pace={pace:.2f}")
+
+    # 0.5 <= pace <= 1.5: hızı bütçeye oturt; yorumlar (çağrıların çoğu) daha sert kısılır
+    scale = max(0.6, min(1.0, 1.0 / pace))
+    return {
+        "day": _today(),
+        "mode": "normal",
+        "scale_posts": round(scale, 2),
+        "scale_comments": round(max(0.3, scale * scale), 2),
+        "scale_votes": 1.0,
+        "reason": f"pace={pace:.2f}",
+    }
+
+
+def update_budget_state() -> Dict[str, Any]:
+    """
+    Controller: bu sürecin gateway sayaçlarındaki yeni harcamayı günün satırına ekler,
+    modu/ölçekleri yeniden hesaplar ve ai_budget_state'e yazar.
+    """
+    global _STATE, _STATE_AT
+    day = _today()
+    with _UPDATE_LOCK:
+        totals = _gateway_totals()
+        with _LOCK:
+            delta = {k: max(0, totals[k] - _REPORTED[k]) for k in _REPORTED}
+
+        try:
+            from database import get_database
+
+            client = get_database().client
+            row = _record_usage(client, day, delta)
+        except Exception as e:
+            # Delta kaybolmaz: _REPORTED ilerlemediği için sonraki çağrıda tekrar denenir
+            print(f"❌ Budget controller hatası: {e}")
+            return get_budget_state()
+
+        with _LOCK:
+            _REPORTED.update(totals)
+
+    now = datetime.now(timezone.utc)
+    day_fraction = (now.hour * 3600 + now.minute * 60 + now.second) / 86400
+    error_rate = delta["errors"] / delta["requests"] if delta["requests"] >= MIN_REQUESTS_FOR_ERROR_RATE else 0.0
+    state = decide_mode(
+        tokens_spent=int(row.get("tokens_spent") or 0),
+        daily_budget=_setting("EYAVAP_DAILY_TOKEN_BUDGET", DEFAULT_DAILY_TOKEN_BUDGET),
+        error_rate=error_rate,
+        day_fraction=day_fraction,
+        max_error_rate=_setting("EYAVAP_BUDGET_MAX_ERROR_RATE", DEFAULT_MAX_ERROR_RATE),
+    )
+    update = {
+        "day": day,
+        "mode": state["mode"],
+        "scale_posts": state["scale_posts"],
+        "scale_comments": state["scale_comments"],
+        "scale_votes": state["scale_votes"],
+        "updated_at": now.isoformat(),
+    }
+    extended = {
+        **update,
+        "tokens_spent": int(row.get("tokens_spent") or 0),
+        "llm_requests": int(row.get("llm_requests") or 0),
+        "llm_errors": int(row.get("llm_errors") or 0),
+        "error_rate": round(error_rate, 4),
+        "reason": state["reason"],
+    }
+    try:
+        client.table("ai_budget_state").upsert(extended, on_conflict="day").execute()
+    except Exception:
+        # Ek sütunlar / unique index yoksa temel sütunlarla satır bazlı yaz
+        try:
+            if row.get("id"):
+                client.table("ai_budget_state").update(update).eq("id", row["id"]).execute()
+            else:
+                client.table("ai_budget_state").insert(update).execute()
+        except Exception as e:
+            print(f"❌ ai_budget_state yazılamadı: {e}")
+
+    state = {**state, "tokens_spent": extended["tokens_spent"], "error_rate": extended["error_rate"]}
+    with _LOCK:
+        _STATE, _STATE_AT = state, time.time()
+    print(f"💰 AI bütçe: {describe(state)} | {extended['tokens_spent']} token | {state['reason']}")
+    return dict(state)
+
+
+if __name__ == "__main__":
+    print(update_budget_state())
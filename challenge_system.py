@@ -8,6 +8,9 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import streamlit as st
 from database import get_database
+from row_models import ChallengeRef, ChallengeTarget, ChallengeVote
+from llm_gateway import chat_completion
+from llm_provider import get_openai_client
 
 try:
     from openai import OpenAI
@@ -46,14 +49,12 @@ def create_challenge(
     
     try:
         # Challenger ve post bilgilerini al
-        challenger = db.supabase_client.table("agents").select("*").eq("id", challenger_id).single().execute()
-        post = db.supabase_client.table("posts").select("*, agents!inner(id, name, merit_score, rank)").eq("id", target_post_id).single().execute()
+        challenger_data = db.roster.get(challenger_id)
+        post_data = ChallengeTarget.fetch(db.client, target_post_id)
         
-        if not challenger.data or not post.data:
+        if not challenger_data or not post_data:
             return None
         
-        challenger_data = challenger.data
-        post_data = post.data
         target_agent = post_data["agents"]
         
         # Kendi postuna meydan okuyamaz
@@ -77,7 +78,7 @@ def create_challenge(
             "created_at": datetime.utcnow().isoformat()
         }
         
-        result = db.supabase_client.table("challenges").insert(challenge_data).execute()
+        result = db.client.table("challenges").insert(challenge_data).execute()
         
         if result.data:
             print(f"⚔️ {challenger_data['name']} → {target_agent['name']} meydan okudu!")
@@ -129,8 +130,8 @@ Eğer sorun yoksa has_flaw: false döndür."""
     try:
         openai_key = st.secrets.get("OPENAI_API_KEY")
         if openai_key:
-            client = OpenAI(api_key=openai_key)
-            response = client.chat.completions.create(
+            client = get_openai_client(openai_key)
+            response = chat_completion(client, site="challenge_analysis",
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"},
@@ -202,13 +203,11 @@ def respond_to_challenge(
     
     try:
         # Challenge bilgisini al
-        challenge = db.supabase_client.table("challenges").select("*").eq("id", challenge_id).single().execute()
+        challenge_data = ChallengeRef.fetch(db.client, challenge_id)
         
-        if not challenge.data:
+        if not challenge_data:
             return {"success": False, "error": "Challenge bulunamadı"}
         
-        challenge_data = challenge.data
-        
         if accept:
             # Challenge kabul edildi - liyakat puanı düşür
             merit_penalty = {
@@ -220,20 +219,21 @@ def respond_to_challenge(
             penalty = merit_penalty.get(challenge_data["severity"], -5)
             
             # Hedef ajanın puanını düşür
-            db.supabase_client.rpc('adjust_merit_score', {
+            db.client.rpc('adjust_merit_score', {
                 'agent_id_param': target_agent_id,
                 'adjustment': penalty
             }).execute()
             
             # Challenger'a bonus
             bonus = abs(penalty) // 2
-            db.supabase_client.rpc('adjust_merit_score', {
+            db.client.rpc('adjust_merit_score', {
                 'agent_id_param': challenge_data["challenger_id"],
                 'adjustment': bonus
             }).execute()
-            
+            db.roster.invalidate([target_agent_id, challenge_data["challenger_id"]])
+
             # Challenge durumunu güncelle
-            db.supabase_client.table("challenges").update({
+            db.client.table("challenges").update({
                 "status": "accepted",
                 "resolved_at": datetime.utcnow().isoformat(),
                 "response_text": response_text or "Haklısın, hata bende."
@@ -250,7 +250,7 @@ def respond_to_challenge(
         
         else:
             # Challenge reddedildi - community vote'a gider
-            db.supabase_client.table("challenges").update({
+            db.client.table("challenges").update({
                 "status": "disputed",
                 "response_text": response_text or "Katılmıyorum, argümanım sağlam."
             }).eq("id", challenge_id).execute()
@@ -290,15 +290,12 @@ def vote_on_challenge(
     
     try:
         # Challenge ve voter bilgilerini al
-        challenge = db.supabase_client.table("challenges").select("*").eq("id", challenge_id).single().execute()
-        voter = db.supabase_client.table("agents").select("*").eq("id", voter_agent_id).single().execute()
+        challenge_data = ChallengeRef.fetch(db.client, challenge_id)
+        voter_data = db.roster.get(voter_agent_id)
         
-        if not challenge.data or not voter.data:
+        if not challenge_data or not voter_data:
             return {"success": False, "error": "Bilgi bulunamadı"}
         
-        challenge_data = challenge.data
-        voter_data = voter.data
-        
         # Taraf olamazlar
         if voter_agent_id in [challenge_data["challenger_id"], challenge_data["target_agent_id"]]:
             return {"success": False, "error": "Taraf olanlar oy veremez"}
@@ -312,15 +309,17 @@ def vote_on_challenge(
             "created_at": datetime.utcnow().isoformat()
         }
         
-        db.supabase_client.table("challenge_votes").insert(vote_data).execute()
+        db.client.table("challenge_votes").insert(vote_data).execute()
         
         # Oyları say
-        votes = db.supabase_client.table("challenge_votes").select("*").eq("challenge_id", challenge_id).execute()
+        votes = ChallengeVote.from_rows(
+            ChallengeVote.query(db.client).eq("challenge_id", challenge_id).execute().data
+        )
         
-        if votes.data and len(votes.data) >= 5:  # Minimum 5 oy
+        if len(votes) >= 5:  # Minimum 5 oy
             # Ağırlıklı oylama
-            support_score = sum(v["voter_merit_weight"] for v in votes.data if v["support_challenger"])
-            reject_score = sum(v["voter_merit_weight"] for v in votes.data if not v["support_challenger"])
+            support_score = sum(v.voter_merit_weight or 0 for v in votes if v.support_challenger)
+            reject_score = sum(v.voter_merit_weight or 0 for v in votes if not v.support_challenger)
             
             # Karar
             if support_score > reject_score:
@@ -329,14 +328,14 @@ def vote_on_challenge(
                 return {"success": True, "verdict": "challenger_wins", "support_score": support_score, "reject_score": reject_score}
             else:
                 # Target haklı
-                db.supabase_client.table("challenges").update({
+                db.client.table("challenges").update({
                     "status": "rejected",
                     "resolved_at": datetime.utcnow().isoformat()
                 }).eq("id", challenge_id).execute()
                 
                 return {"success": True, "verdict": "target_wins", "support_score": support_score, "reject_score": reject_score}
         
-        return {"success": True, "status": "vote_recorded", "total_votes": len(votes.data) if votes.data else 0}
+        return {"success": True, "status": "vote_recorded", "total_votes": len(votes)}
     
     except Exception as e:
         print(f"❌ Vote hatası: {e}")
@@ -351,10 +350,10 @@ def get_agent_challenge_stats(agent_id: str) -> Dict[str, Any]:
     
     try:
         # Challenger olarak
-        challenges_made = db.supabase_client.table("challenges").select("*").eq("challenger_id", agent_id).execute()
+        challenges_made = db.client.table("challenges").select("status").eq("challenger_id", agent_id).execute()
         
         # Target olarak
-        challenges_received = db.supabase_client.table("challenges").select("*").eq("target_agent_id", agent_id).execute()
+        challenges_received = db.client.table("challenges").select("status").eq("target_agent_id", agent_id).execute()
         
         # İstatistikler
         made_count = len(challenges_made.data) if challenges_made.data else 0
@@ -25,6 +25,13 @@ try:
 except Exception as e:
     print(f"⚠️ agents import failed: {e}")
 from translations import get_text, RANK_DISPLAY, get_rank_display
+from row_models import AgentCard, CommentCard, PostCard
+
+@st.cache_resource(show_spinner=False)
+def _get_shared_supabase(supabase_url: str, supabase_key: str):
+    """Dashboard sekmeleri ve rerun'lar arasında tek Supabase client paylaşılır."""
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
 
 # Copenhagen time formatting helper
 def format_copenhagen_time(timestamp: str) -> str:
@@ -450,8 +457,7 @@ elif page == get_text("social_stream", lang):
             3. `social_stream.py` ile aktivite başlatın
             """)
         else:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
             
             # Refresh butonu
             col1, col2 = st.columns([3, 1])
@@ -475,7 +481,7 @@ elif page == get_text("social_stream", lang):
             st.divider()
             
             # Postları çek
-            query = supabase.table("posts").select("*, agents!inner(name, rank, ethnicity, merit_score)").limit(50)
+            query = PostCard.query(supabase).limit(50)
             
             all_text = get_text("all", lang)
             if topic_filter != all_text:
@@ -494,7 +500,7 @@ elif page == get_text("social_stream", lang):
             response = query.execute()
             
             if response.data:
-                for post in response.data:
+                for post in PostCard.from_rows(response.data):
                     agent = post["agents"]
                     
                     # Post container (Instagram-style)
@@ -541,10 +547,12 @@ elif page == get_text("social_stream", lang):
                         unsafe_allow_html=True,
                     )
 
-                    comments = supabase.table("comments").select("*, agents!inner(name, rank)").eq("post_id", post['id']).limit(3).execute()
-                    if comments.data:
-                        with st.expander(f"View all {len(comments.data)} comments"):
-                            for comment in comments.data:
+                    comments = CommentCard.from_rows(
+                        CommentCard.query(supabase).eq("post_id", post['id']).limit(3).execute().data
+                    )
+                    if comments:
+                        with st.expander(f"View all {len(comments)} comments"):
+                            for comment in comments:
                                 comment_time = format_copenhagen_time(comment.get("created_at"))
                                 st.markdown(f"**{comment['agents']['name']}** {comment['content']}")
                                 st.caption(f"{comment_time}")
@@ -575,8 +583,7 @@ elif page == get_text("community_hub", lang):
         if not (supabase_url and supabase_key):
             st.warning("⚠️ Veritabanı bağlı değil")
         else:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
 
             st.divider()
 
@@ -720,8 +727,7 @@ elif page == get_text("free_zone", lang):
         if not (supabase_url and supabase_key):
             st.warning("⚠️ Veritabanı bağlı değil")
         else:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
 
             col1, col2 = st.columns([3, 1])
             with col2:
@@ -731,8 +737,7 @@ elif page == get_text("free_zone", lang):
             st.divider()
 
             query = (
-                supabase.table("posts")
-                .select("*, agents!inner(name, rank, ethnicity, merit_score)")
+                PostCard.query(supabase)
                 .eq("topic", "free_zone")
                 .order("updated_at", desc=True)
                 .limit(50)
@@ -740,7 +745,7 @@ elif page == get_text("free_zone", lang):
             response = query.execute()
 
             if response.data:
-                for post in response.data:
+                for post in PostCard.from_rows(response.data):
                     agent = post["agents"]
                     with st.container():
                         col1, col2 = st.columns([1, 4])
@@ -773,17 +778,17 @@ elif page == get_text("free_zone", lang):
                             with col_c:
                                 st.caption(f"😊 {post['sentiment']}")
 
-                            comments = (
-                                supabase.table("comments")
-                                .select("*, agents!inner(name, rank)")
+                            comments = CommentCard.from_rows(
+                                CommentCard.query(supabase)
                                 .eq("post_id", post['id'])
                                 .limit(3)
                                 .execute()
+                                .data
                             )
 
-                            if comments.data:
-                                with st.expander(f"💬 {len(comments.data)} Yorum"):
-                                    for comment in comments.data:
+                            if comments:
+                                with st.expander(f"💬 {len(comments)} Yorum"):
+                                    for comment in comments:
                                         comment_time = format_copenhagen_time(comment.get("created_at"))
                                         st.markdown(f"**{comment['agents']['name']}**: {comment['content']}")
                                         st.caption(f"🕒 {comment_time} (Copenhagen) · _{comment['sentiment']}_")
@@ -817,8 +822,7 @@ elif page == get_text("leaderboard", lang):
         if not (supabase_url and supabase_key):
             st.warning("⚠️ Veritabanı bağlı değil")
         else:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
             
             # Filtreler
             col1, col2, col3 = st.columns(3)
@@ -836,7 +840,7 @@ elif page == get_text("leaderboard", lang):
             st.divider()
             
             # Lider ajanları çek
-            query = supabase.table("agents").select("*").eq("is_active", True).order("merit_score", desc=True).limit(limit)
+            query = AgentCard.query(supabase).eq("is_active", True).order("merit_score", desc=True).limit(limit)
             
             all_text = get_text("all", lang)
             if rank_filter != all_text:
@@ -849,7 +853,7 @@ elif page == get_text("leaderboard", lang):
             
             if response.data:
                 agents_filtered = [
-                    a for a in response.data
+                    a for a in AgentCard.from_rows(response.data)
                     if a.get("id") != zero_id and a.get("name") != "0"
                 ]
                 
@@ -862,8 +866,7 @@ elif page == get_text("leaderboard", lang):
                     # Başkan (0 görünmez, sadece görünür başkan gösterilir)
                     try:
                         president_res = (
-                            supabase.table("agents")
-                            .select("*")
+                            AgentCard.query(supabase)
                             .eq("is_active", True)
                             .in_("rank", ["president", "præsident"])
                             .neq("id", zero_id)
@@ -896,8 +899,7 @@ elif page == get_text("leaderboard", lang):
                     st.markdown("### 👥 VP-Råd (30)" if lang == "da" else "### 👥 VP Council (30)")
                     try:
                         vp_res = (
-                            supabase.table("agents")
-                            .select("*")
+                            AgentCard.query(supabase)
                             .eq("is_active", True)
                             .in_("rank", ["vice_president", "vicepræsident"])
                             .neq("id", zero_id)
@@ -978,8 +980,7 @@ elif page == get_text("election", lang):
         if not (supabase_url and supabase_key):
             st.warning("⚠️ Veritabanı bağlı değil")
         else:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
             from election_system import run_presidential_election, get_latest_election
             
             latest = None
@@ -1131,11 +1132,10 @@ elif page == get_text("decision_room", lang):
         if not (supabase_url and supabase_key):
             st.warning("⚠️ Veritabanı bağlı değil")
         else:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
             
             # VP'leri al
-            vps = supabase.table("agents").select("*").in_("rank", ["vice_president", "vicepræsident"]).eq("is_active", True).limit(10).execute()
+            vps = AgentCard.query(supabase).in_("rank", ["vice_president", "vicepræsident"]).eq("is_active", True).limit(10).execute()
             
             if vps.data and len(vps.data) > 0:
                 st.success(f"⭐ Kurul: {len(vps.data)} Başkan Yardımcısı")
@@ -1260,8 +1260,7 @@ elif page == get_text("evolution_history", lang):
         if not (supabase_url and supabase_key):
             st.warning("⚠️ Veritabanı bağlı değil")
         else:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
             
             # Evrim loglarını al (merit_history tablosundan)
             evolutions = supabase.table("merit_history").select("*").ilike("reason", "%EVOLUTION%").order("created_at", desc=True).limit(100).execute()
@@ -1496,8 +1495,7 @@ elif page == get_text("agent_stats", lang):
                 st.divider()
                 st.subheader("📚 Udviklingspanel" if lang == "da" else "📚 Learning Dashboard")
                 try:
-                    from supabase import create_client
-                    supabase = create_client(supabase_url, supabase_key)
+                    supabase = _get_shared_supabase(supabase_url, supabase_key)
                     
                     # Skill leaderboard
                     skill_res = (
@@ -1625,8 +1623,7 @@ elif page == get_text("monitoring", lang):
             supabase_key = os.getenv("SUPABASE_KEY")
 
         if supabase_url and supabase_key:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
             now = datetime.datetime.now(datetime.timezone.utc)
             since = (now - datetime.timedelta(hours=1)).isoformat()
 
@@ -1713,8 +1710,7 @@ elif page == get_text("monitoring", lang):
 
     try:
         if supabase_url and supabase_key:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
 
             # Fetch recent super agent missions from activity log
             missions = (
@@ -1762,8 +1758,7 @@ elif page == get_text("monitoring", lang):
 
     try:
         if supabase_url and supabase_key:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
 
             summaries = (
                 supabase.table("agent_cell_summaries")
@@ -1798,8 +1793,7 @@ elif page == get_text("monitoring", lang):
 
     try:
         if supabase_url and supabase_key:
-            from supabase import create_client
-            supabase = create_client(supabase_url, supabase_key)
+            supabase = _get_shared_supabase(supabase_url, supabase_key)
 
             events = []
 
@@ -1,10 +1,17 @@
+import atexit
+import json
 import os
+import random
 import sys
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from urllib.parse import urlparse
 
-import requests
 from dotenv import load_dotenv
 
 # Streamlit opsiyonel (GitHub Actions'ta yoksa bile sorun olmasın)
@@ -15,6 +22,15 @@ except Exception:
 
 from supabase import create_client, Client
 
+from llm_provider import fake_llm_enabled, get_fake_llm
+from llm_gateway import chat_completion, estimate_tokens, gateway_slot
+from roster_cache import RosterCache
+
+try:
+    import httpx
+except Exception:
+    httpx = None
+
 # Lokal için .env (GitHub Actions'ta env zaten gelir, bu zararsız)
 load_dotenv()
 
@@ -66,6 +82,13 @@ def _get_deepinfra_token() -> str:
     return ""
 
 
+def _get_int_setting(name: str, default: int) -> int:
+    try:
+        return int(_get_secret(name, str(default)) or default)
+    except (TypeError, ValueError):
+        return default
+
+
 def _safe_host(url: str) -> str:
     try:
         return urlparse(url).netloc
@@ -77,7 +100,158 @@ def _safe_host(url: str) -> str:
 #  LLM CLIENTS (LLAMA + OPENAI FALLBACK)
 # =========================
 
-DEEPINFRA_CHAT_URL = "https://api.deepinfra.com/v1/openai/chat/completions"
+# Yerel fake sunucuya yönlendirmek için DEEPINFRA_CHAT_URL env ile ezilebilir (bkz. llm_provider.py)
+DEEPINFRA_CHAT_URL = os.getenv("DEEPINFRA_CHAT_URL") or "https://api.deepinfra.com/v1/openai/chat/completions"
+
+# Paylaşılan LLM HTTP havuzu. Ayarlar: LLM_HTTP_POOL_SIZE, LLM_HTTP_KEEPALIVE_SECONDS,
+# LLM_HTTP2 (1/0), LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS
+_RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+_LLM_HTTP_CLIENT = None
+_LLM_HTTP_LOCK = threading.Lock()
+_LLM_HTTP_STATS = {
+    "calls": 0,
+    "retries": 0,
+    "failures": 0,
+    "latency_ms_total": 0.0,
+    "latency_ms_max": 0.0,
+    "last_latency_ms": 0.0,
+}
+
+
+def _get_llm_http_client():
+    """Keep-alive'lı, sınırlı havuzlu tek httpx.Client (opsiyonel HTTP/2)."""
+    global _LLM_HTTP_CLIENT
+    if httpx is None:
+        raise RuntimeError("httpx yüklü değil")
+    with _LLM_HTTP_LOCK:
+        if _LLM_HTTP_CLIENT is None:
+            pool_size = max(1, _get_int_setting("LLM_HTTP_POOL_SIZE", 10))
+            limits = httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=max(1, _get_int_setting("LLM_HTTP_KEEPALIVE_SECONDS", 90)),
+            )
+            use_http2 = _get_secret("LLM_HTTP2", "1").lower() in ("1", "true", "yes")
+            try:
+                _LLM_HTTP_CLIENT = httpx.Client(limits=limits, http2=use_http2)
+            except ImportError:
+                # http2 için 'h2' paketi gerekli; yoksa HTTP/1.1 keep-alive
+                _LLM_HTTP_CLIENT = httpx.Client(limits=limits)
+            atexit.register(_LLM_HTTP_CLIENT.close)
+        return _LLM_HTTP_CLIENT
+
+
+def _retry_after_seconds(response) -> float | None:
+    val = response.headers.get("Retry-After") if response is not None else None
+    if not val:
+        return None
+    try:
+        return max(0.0, float(val))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+
+        return max(0.0, parsedate_to_datetime(val).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _backoff_seconds(attempt: int, base: float, cap: float = 20.0) -> float:
+    # Full jitter exponential backoff
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LLMRequestCancelled(RuntimeError):
+    """Hedge'i kaybeden istek iptal edildi (sonraki retry yapılmadı)."""
+
+
+def _post_with_retry(
+    url: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    timeout: float,
+    provider: str = "deepinfra",
+    site: str = "",
+    cancel: threading.Event | None = None,
+    latencies: deque | None = None,
+) -> Dict[str, Any]:
+    """
+    Gateway üzerinden POST atar; 429/5xx ve ağ hatalarında Retry-After'a uyarak yeniden dener.
+    - Her deneme ayrı gateway slot'u ayırır: retry'lar da RPM/TPM'e sayılır, 429'da
+      sağlayıcı soğutulur ve sonraki deneme bu soğumayı bekler.
+    - `timeout` tüm çağrının (denemeler + beklemeler) üst sınırıdır.
+    - `cancel` set edilirse (hedge'i kaybeden istek) yeni deneme yapılmaz, bekleme kesilir.
+    - `latencies`: başarılı denemenin kendi süresi eklenir (retry beklemeleri hariç).
+    JSON gövdesini döndürür; usage slot'a işlenir.
+    """
+    client = _get_llm_http_client()
+    max_retries = max(0, _get_int_setting("LLM_MAX_RETRIES", 3))
+    try:
+        base = float(_get_secret("LLM_BACKOFF_BASE_SECONDS", "0.5") or 0.5)
+    except ValueError:
+        base = 0.5
+    estimated = estimate_tokens(payload.get("messages"), payload.get("max_tokens"))
+
+    start = time.perf_counter()
+    deadline = start + timeout
+    attempt = 0
+    last_error: Exception | None = None
+    try:
+        while True:
+            response = None
+            if cancel is not None and cancel.is_set():
+                raise LLMRequestCancelled(f"{site or url}: istek iptal edildi")
+            try:
+                with gateway_slot(provider, estimated, site=site, max_wait=max(0.0, deadline - time.perf_counter())) as slot:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise httpx.TimeoutException(f"toplam süre ({timeout}s) doldu")
+                    attempt_started = time.perf_counter()
+                    response = client.post(url, headers=headers, json=payload, timeout=remaining)
+                    response.raise_for_status()
+                    data = response.json()
+                    if latencies is not None:
+                        latencies.append(time.perf_counter() - attempt_started)
+                    usage = data.get("usage") or {}
+                    slot.used(usage.get("total_tokens"), usage.get("prompt_tokens"), usage.get("completion_tokens"))
+                    return data
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in _RETRY_STATUS or attempt >= max_retries:
+                    raise
+                last_error = e
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if attempt >= max_retries:
+                    raise
+                last_error = e
+
+            wait = _retry_after_seconds(response)
+            if wait is None:
+                wait = _backoff_seconds(attempt, base)
+            if time.perf_counter() + wait >= deadline:
+                raise last_error
+            attempt += 1
+            _LLM_HTTP_STATS["retries"] += 1
+            if cancel is not None:
+                cancel.wait(wait)
+            else:
+                time.sleep(wait)
+    except Exception:
+        _LLM_HTTP_STATS["failures"] += 1
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _LLM_HTTP_STATS["calls"] += 1
+        _LLM_HTTP_STATS["latency_ms_total"] += elapsed_ms
+        _LLM_HTTP_STATS["latency_ms_max"] = max(_LLM_HTTP_STATS["latency_ms_max"], elapsed_ms)
+        _LLM_HTTP_STATS["last_latency_ms"] = elapsed_ms
+
+
+def get_llm_http_stats() -> Dict[str, float]:
+    """llama_chat HTTP çağrıları için gecikme / retry sayaçları."""
+    stats = dict(_LLM_HTTP_STATS)
+    stats["latency_ms_avg"] = round(stats["latency_ms_total"] / stats["calls"], 1) if stats["calls"] else 0.0
+    return stats
 
 
 def llama_chat(
@@ -87,11 +261,19 @@ def llama_chat(
     temperature: float = 0.2,
     max_tokens: int = 600,
     timeout: int = 60,
+    cancel: threading.Event | None = None,
 ) -> str:
     """
     DeepInfra üzerinden Llama çağrısı.
-    OpenAI uyumlu endpoint kullanır.
+    OpenAI uyumlu endpoint kullanır. cancel: bkz. _post_with_retry.
     """
+    if fake_llm_enabled():
+        with gateway_slot("deepinfra", estimate_tokens(messages, max_tokens), site="llama_chat"):
+            started = time.perf_counter()
+            text = get_fake_llm().complete(messages, max_tokens=max_tokens)
+            _LLAMA_LATENCIES.append(time.perf_counter() - started)
+        return text
+
     token = _get_deepinfra_token()
     if not token:
         raise ValueError("DeepInfra token yok. Secret adı: DEEPINFRA_API_TOKEN olmalı.")
@@ -108,9 +290,10 @@ def llama_chat(
         "max_tokens": max_tokens,
     }
 
-    r = requests.post(DEEPINFRA_CHAT_URL, headers=headers, json=payload, timeout=timeout)
-    r.raise_for_status()
-    data = r.json()
+    data = _post_with_retry(
+        DEEPINFRA_CHAT_URL, headers=headers, payload=payload, timeout=timeout,
+        site="llama_chat", cancel=cancel, latencies=_LLAMA_LATENCIES,
+    )
 
     return data["choices"][0]["message"]["content"]
 
@@ -124,6 +307,10 @@ def openai_chat(
     """
     OpenAI fallback. openai paketi yüklü olmalı.
     """
+    if fake_llm_enabled():
+        with gateway_slot("openai", estimate_tokens(messages, max_tokens), site="openai_chat"):
+            return get_fake_llm().complete(messages, max_tokens=max_tokens)
+
     key = _get_secret("OPENAI_API_KEY", "")
     if not key:
         raise ValueError("OPENAI_API_KEY yok")
@@ -131,7 +318,9 @@ def openai_chat(
     from openai import OpenAI  # lazy import
 
     client = OpenAI(api_key=key)
-    resp = client.chat.completions.create(
+    resp = chat_completion(
+        client,
+        site="openai_chat",
         model=model,
         messages=messages,
         temperature=temperature,
@@ -140,44 +329,435 @@ def openai_chat(
     return resp.choices[0].message.content
 
 
+def llama_chat_stream(
+    messages: List[Dict[str, str]],
+    model: str = "meta-llama/Llama-3-8B-Instruct",
+    temperature: float = 0.2,
+    max_tokens: int = 600,
+    timeout: int = 60,
+) -> Iterator[str]:
+    """
+    llama_chat'in akışlı (SSE) hali: token parçalarını geldikçe yield eder.
+    Akış başlamadan önceki hatalar yükselir; retry yapılmaz.
+    """
+    if fake_llm_enabled():
+        for word in get_fake_llm().complete(messages, max_tokens=max_tokens).split(" "):
+            yield word + " "
+        return
+
+    token = _get_deepinfra_token()
+    if not token:
+        raise ValueError("DeepInfra token yok. Secret adı: DEEPINFRA_API_TOKEN olmalı.")
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+
+    client = _get_llm_http_client()
+    started = time.perf_counter()
+    with gateway_slot("deepinfra", estimate_tokens(messages, max_tokens), site="llama_chat_stream") as slot, \
+            client.stream("POST", DEEPINFRA_CHAT_URL, headers=headers, json=payload, timeout=timeout) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            usage = event.get("usage")
+            if usage:
+                slot.used(usage.get("total_tokens"), usage.get("prompt_tokens"), usage.get("completion_tokens"))
+            choices = event.get("choices") or []
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            if delta:
+                yield delta
+    _LLAMA_LATENCIES.append(time.perf_counter() - started)
+
+
+def openai_chat_stream(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.2,
+    max_tokens: int = 600,
+    client: Any = None,
+    site: str = "openai_chat_stream",
+) -> Iterator[str]:
+    """
+    openai_chat'in akışlı hali.
+    client verilirse o kullanılır (ör. agents'ın secrets'tan kurduğu client).
+    """
+    if fake_llm_enabled():
+        for word in get_fake_llm().complete(messages, max_tokens=max_tokens).split(" "):
+            yield word + " "
+        return
+
+    if client is None:
+        key = _get_secret("OPENAI_API_KEY", "")
+        if not key:
+            raise ValueError("OPENAI_API_KEY yok")
+
+        from openai import OpenAI  # lazy import
+
+        client = OpenAI(api_key=key)
+    stream = chat_completion(
+        client,
+        site=site,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+# =========================
+#  HEDGED REQUESTS (LLAMA || OPENAI)
+# =========================
+
+# Son başarılı Llama gecikmeleri (saniye) -> hedge gecikmesi için p90
+_LLAMA_LATENCIES: deque = deque(maxlen=200)
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="eyavap-hedge")
+# İkinci sağlayıcı ayrı havuzda: takılan Llama istekleri hedge'in önünü tıkamasın
+_HEDGE_SECONDARY_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="eyavap-hedge-2")
+_HEDGE_LOCK = threading.Lock()
+# hedges_fired: gecikme doldu, ikinci istek ateşlendi; primary_failures: Llama gecikme içinde
+# hata verdi, OpenAI yedek olarak çağrıldı (hedge_rate'e sayılmaz)
+_HEDGE_STATS = {
+    "requests": 0, "hedges_fired": 0, "primary_failures": 0,
+    "primary_wins": 0, "secondary_wins": 0, "failures": 0,
+}
+
+
+def _hedge_enabled() -> bool:
+    return _get_secret("LLM_HEDGE", "0").lower() in ("1", "true", "yes")
+
+
+def get_hedge_delay() -> float:
+    """
+    İkinci sağlayıcı ne zaman ateşlensin?
+    LLM_HEDGE_DELAY_SECONDS verilmişse o, yoksa gözlenen Llama p90 (yeterli örnek yoksa 4s).
+    """
+    fixed = _get_secret("LLM_HEDGE_DELAY_SECONDS", "")
+    if fixed:
+        try:
+            return max(0.0, float(fixed))
+        except ValueError:
+            pass
+    samples = sorted(_LLAMA_LATENCIES)
+    if len(samples) < 10:
+        return 4.0
+    return samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+
+
+def get_hedge_stats() -> Dict[str, Any]:
+    with _HEDGE_LOCK:
+        stats = dict(_HEDGE_STATS)
+    stats["hedge_rate"] = round(stats["hedges_fired"] / stats["requests"], 3) if stats["requests"] else 0.0
+    stats["hedge_delay_s"] = round(get_hedge_delay(), 3)
+    return stats
+
+
+def _hedged_chat(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Llama'yı başlatır; hedge gecikmesi içinde bitmezse OpenAI'yi de ateşler, ilk başarılıyı döndürür.
+    Kaybeden istek henüz başlamadıysa iptal edilir; başlamış Llama isteği cancel
+    event'i ile sonraki retry'dan önce durur. OpenAI isteği başladıysa sonucu yok sayılır.
+    """
+    delay = get_hedge_delay()
+    with _HEDGE_LOCK:
+        _HEDGE_STATS["requests"] += 1
+
+    cancel_primary = threading.Event()
+    primary = _HEDGE_EXECUTOR.submit(llama_chat, messages, cancel=cancel_primary)
+    providers = {primary: "DeepInfra Llama"}
+    done, _ = wait_futures([primary], timeout=delay)
+
+    # Llama gecikme içinde başarıyla bittiyse hedge yok
+    if primary in done and primary.exception() is None:
+        with _HEDGE_LOCK:
+            _HEDGE_STATS["primary_wins"] += 1
+        return {"text": primary.result(), "provider": providers[primary], "hedged": False}
+
+    primary_failed = primary in done
+    secondary = _HEDGE_SECONDARY_EXECUTOR.submit(openai_chat, messages)
+    providers[secondary] = "OpenAI"
+    with _HEDGE_LOCK:
+        _HEDGE_STATS["primary_failures" if primary_failed else "hedges_fired"] += 1
+
+    pending = {primary, secondary}
+    last_error: Exception | None = None
+    while pending:
+        done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            err = fut.exception()
+            if err is not None:
+                last_error = err
+                print(f"⚠️ {providers[fut]} başarısız: {err}")
+                continue
+            for loser in pending:
+                loser.cancel()
+            if fut is not primary:
+                cancel_primary.set()
+            with _HEDGE_LOCK:
+                _HEDGE_STATS["primary_wins" if fut is primary else "secondary_wins"] += 1
+            return {"text": fut.result(), "provider": providers[fut], "hedged": not primary_failed}
+
+    with _HEDGE_LOCK:
+        _HEDGE_STATS["failures"] += 1
+    raise last_error or RuntimeError("Hedged istek başarısız")
+
+
 def ai_answer(
     user_query: str,
     system_prompt: str = "Türkçe cevap ver. Kısa, net, çözüm odaklı ol. Emin olmadığın yerde açıkça belirt.",
     llama_first: bool = True,
+    use_cache: bool = True,
+    hedge: bool | None = None,
 ) -> Dict[str, Any]:
     """
     Llama-first + OpenAI fallback cevap üretir.
-    Dönen dict: { text, provider }
+    Dönen dict: { text, provider, cached }
+    use_cache=False cache'i atlar (yeni cevap zorlanır).
+    hedge=True (veya LLM_HEDGE=1): Llama yavaşsa OpenAI paralel ateşlenir, ilk biten kazanır.
     """
+    from answer_cache import get_answer_cache, make_cache_key, cache_disabled
+
+    cache = get_answer_cache()
+    cache_key = make_cache_key(user_query, system_prompt, "llama-first" if llama_first else "openai")
+    if use_cache and not cache_disabled():
+        hit = cache.get(cache_key)
+        if hit is not None:
+            return {**hit, "cached": True}
+    else:
+        cache.record_bypass()
+
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_query},
     ]
 
+    # 0) Hedged mod: iki sağlayıcı yarışır
+    if llama_first and (hedge if hedge is not None else _hedge_enabled()):
+        try:
+            out = _hedged_chat(messages)
+            cache.set(cache_key, {"text": out["text"], "provider": out["provider"]})
+            return {**out, "cached": False}
+        except Exception as e:
+            print(f"❌ Hedged istek başarısız: {e}")
+            return {
+                "text": "Şu an sistem yoğun veya anahtarlar eksik. Lütfen biraz sonra tekrar dene.",
+                "provider": "None",
+                "cached": False,
+            }
+
     # 1) Llama
     if llama_first:
         try:
             text = llama_chat(messages)
-            return {"text": text, "provider": "DeepInfra Llama"}
+            out = {"text": text, "provider": "DeepInfra Llama"}
+            cache.set(cache_key, out)
+            return {**out, "cached": False}
         except Exception as e:
             print(f"⚠️ Llama başarısız: {e}")
 
     # 2) OpenAI fallback
     try:
         text = openai_chat(messages)
-        return {"text": text, "provider": "OpenAI"}
+        out = {"text": text, "provider": "OpenAI"}
+        cache.set(cache_key, out)
+        return {**out, "cached": False}
     except Exception as e:
         print(f"❌ OpenAI de başarısız: {e}")
         return {
             "text": "Şu an sistem yoğun veya anahtarlar eksik. Lütfen biraz sonra tekrar dene.",
             "provider": "None",
+            "cached": False,
         }
 
 
+# =========================
+#  WRITE-BEHIND BUFFER
+# =========================
+
+class WriteBuffer:
+    """
+    Tablo başına satır biriktirir, boyut/zaman eşiğinde çok satırlı insert yapar.
+    Log / knowledge / revision gibi "yaz ve unut" kayıtlar için.
+    """
+
+    def __init__(self, client: Client, max_rows: int = 50, max_age_seconds: float = 5.0, max_pending: int = 5000):
+        self.client = client
+        self.max_rows = max(1, max_rows)
+        self.max_age_seconds = max(0.1, max_age_seconds)
+        self.max_pending = max(self.max_rows, max_pending)
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._first_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = {"buffered": 0, "flushed": 0, "dropped": 0, "requests": 0}
+
+        self._timer = threading.Thread(target=self._run_timer, name="eyavap-write-buffer", daemon=True)
+        self._timer.start()
+        atexit.register(self.close)
+
+    def add(self, table: str, row: Dict[str, Any]) -> None:
+        flush_now = False
+        with self._lock:
+            pending = sum(len(v) for v in self._rows.values())
+            if pending >= self.max_pending:
+                self.stats["dropped"] += 1
+                print(f"⚠️ Write buffer dolu, satır düşürüldü: {table}")
+                return
+            rows = self._rows.setdefault(table, [])
+            if not rows:
+                self._first_at[table] = time.time()
+            rows.append(row)
+            self.stats["buffered"] += 1
+            flush_now = len(rows) >= self.max_rows
+        if flush_now:
+            self.flush(table)
+
+    def flush(self, table: str | None = None) -> int:
+        """Bekleyen satırları yazar. table verilmezse tüm tablolar."""
+        with self._flush_lock:
+            with self._lock:
+                tables = [table] if table else list(self._rows.keys())
+                batches = {t: self._rows.pop(t, []) for t in tables}
+                for t in tables:
+                    self._first_at.pop(t, None)
+
+            written = 0
+            for t, rows in batches.items():
+                for i in range(0, len(rows), self.max_rows):
+                    chunk = rows[i:i + self.max_rows]
+                    try:
+                        self.client.table(t).insert(chunk).execute()
+                        self.stats["requests"] += 1
+                        self.stats["flushed"] += len(chunk)
+                        written += len(chunk)
+                    except Exception as e:
+                        print(f"⚠️ Toplu insert başarısız ({t}, {len(chunk)} satır), tek tek deneniyor: {e}")
+                        written += self._insert_one_by_one(t, chunk)
+            return written
+
+    def _insert_one_by_one(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        # Bozuk tek satır tüm chunk'ı düşürmesin
+        written = 0
+        for row in rows:
+            try:
+                self.client.table(table).insert(row).execute()
+                self.stats["requests"] += 1
+                self.stats["flushed"] += 1
+                written += 1
+            except Exception as e:
+                self.stats["dropped"] += 1
+                print(f"❌ Write buffer satır hatası ({table}): {e}")
+        return written
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._rows.values())
+
+    def _run_timer(self) -> None:
+        while not self._stop.wait(min(1.0, self.max_age_seconds)):
+            now = time.time()
+            with self._lock:
+                due = [t for t, ts in self._first_at.items() if now - ts >= self.max_age_seconds]
+            for t in due:
+                self.flush(t)
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+
+# =========================
+#  KEYSET SCAN
+# =========================
+
+DEFAULT_SCAN_PAGE_SIZE = 500
+# insert_many chunk boyutu (EYAVAP_INSERT_CHUNK_ROWS)
+DEFAULT_INSERT_CHUNK_ROWS = 100
+# Satıra özgü (deterministik) PostgREST hataları: bölünerek tekrar denenmeye değer
+# 22xxx veri hatası, 23xxx kısıt ihlali (23505 unique), PGRST102 anahtarları uyuşmayan gövde
+_ROW_ERROR_PREFIXES = ("22", "23")
+_ROW_ERROR_CODES = frozenset({"PGRST102"})
+
+
+def _pg_error_code(e: Exception) -> str:
+    """postgrest APIError kodu ("23505", "PGRST202", ...); yoksa ""."""
+    code = getattr(e, "code", None)
+    if not code and e.args and isinstance(e.args[0], dict):
+        code = e.args[0].get("code")
+    return str(code or "")
+
+
+def _is_row_error(e: Exception) -> bool:
+    code = _pg_error_code(e)
+    return code in _ROW_ERROR_CODES or code.startswith(_ROW_ERROR_PREFIXES)
+
+
+# RPC fonksiyonu tanımlı değil (migration çalıştırılmamış): PostgREST / Postgres kodları
+_MISSING_FUNCTION_CODES = frozenset({"PGRST202", "42883"})
+
+
+def _is_missing_function(e: Exception) -> bool:
+    return _pg_error_code(e) in _MISSING_FUNCTION_CODES
+
+
+# Bir sonraki sayfayı önceden çeken iş parçacıkları (iter_rows(prefetch=True))
+_SCAN_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="eyavap-scan")
+
+
+def _keyset_condition(created_at: str, row_id: Any, desc: bool) -> str:
+    """(created_at, id) > / < cursor koşulu, PostgREST or=(...) sözdiziminde."""
+    op = "lt" if desc else "gt"
+    return f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}."{row_id}")'
+
+
+def _scan_columns(columns: str) -> str:
+    """Cursor için created_at ve id'nin seçildiğinden emin olur."""
+    cols = [c.strip() for c in columns.split(",") if c.strip()]
+    if "*" in cols:
+        return columns
+    for key in ("created_at", "id"):
+        if key not in cols:
+            cols.append(key)
+    return ",".join(cols)
+
+
 # =========================
 #  DATABASE (SUPABASE)
 # =========================
 
+class _SkillBatch:
+    """Bir thread'in açık skill batch'i: iç içe derinlik + birikmiş delta'lar."""
+
+    __slots__ = ("depth", "deltas")
+
+    def __init__(self):
+        self.depth = 0
+        self.deltas: Dict[tuple, float] = {}
+
+
 class Database:
     """EYAVAP Komuta Merkezi: Supabase + hafıza + log"""
 
@@ -219,10 +799,161 @@ class Database:
 
         # Supabase client
         try:
-            self.client: Client = create_client(url, key)
+            self.client, self._http_client = _create_pooled_client(url, key)
         except Exception as e:
             print(f"❌ Supabase bağlantı hatası: {e}")
             raise
+        self.created_at = time.time()
+        self.last_health_check = 0.0
+        self.health_failures = 0
+
+        # Paylaşılan ajan kadrosu (EYAVAP_ROSTER_TTL); merit/trust/suspension yazımlarında invalidate edilir
+        self.roster = RosterCache(self.client, iter_rows=self.iter_rows)
+
+        # Skill delta biriktirici (begin_skill_batch / end_skill_batch); batch thread'e özel,
+        # açık bir simülasyon batch'i diğer thread'lerin (etkileşimli) güncellemelerini geciktirmez
+        self._skill_lock = threading.Lock()
+        self._skill_local = threading.local()
+        self._skill_batches: List[_SkillBatch] = []
+        self._skill_rpc_available = True
+        atexit.register(self._flush_open_skill_batches)
+
+        # Opsiyonel write-behind buffer (EYAVAP_WRITE_BUFFER=1 ile açılır)
+        self.write_buffer: WriteBuffer | None = None
+        if _get_secret("EYAVAP_WRITE_BUFFER", "").lower() in ("1", "true", "yes"):
+            self.enable_write_buffer()
+
+    # ==================== WRITE BUFFER ====================
+
+    def enable_write_buffer(self, max_rows: int | None = None, max_age_seconds: float | None = None) -> WriteBuffer:
+        """Learning/compliance/knowledge/revision insert'lerini toplu yazmaya geçirir."""
+        if self.write_buffer is None:
+            self.write_buffer = WriteBuffer(
+                self.client,
+                max_rows=max_rows or _get_int_setting("EYAVAP_WRITE_BUFFER_ROWS", 50),
+                max_age_seconds=max_age_seconds or _get_int_setting("EYAVAP_WRITE_BUFFER_SECONDS", 5),
+            )
+        return self.write_buffer
+
+    def disable_write_buffer(self) -> None:
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+            self.write_buffer = None
+
+    def flush_writes(self) -> int:
+        """Buffer'daki satırları hemen yazar. Yazılan satır sayısını döndürür."""
+        if self.write_buffer is None:
+            return 0
+        return self.write_buffer.flush()
+
+    def write_buffer_stats(self) -> Dict[str, int]:
+        if self.write_buffer is None:
+            return {"buffered": 0, "flushed": 0, "dropped": 0, "requests": 0, "pending": 0}
+        return {**self.write_buffer.stats, "pending": self.write_buffer.pending()}
+
+    def _insert_row(self, table: str, row: Dict[str, Any]):
+        """Buffer açıksa kuyruğa atar, değilse tek satır insert yapar."""
+        if self.write_buffer is not None:
+            self.write_buffer.add(table, row)
+            return None
+        return self.client.table(table).insert(row).execute()
+
+    # ==================== TOPLU INSERT ====================
+
+    def insert_many(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        chunk_size: int | None = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Satırları chunk'lar halinde çok satırlı insert ile yazar.
+        Dönüş girdiyle aynı sırada ve uzunlukta: eklenen satır (id dahil) veya None.
+
+        Bir chunk satıra özgü hata verirse (unique ihlali vb.) ikiye bölünerek yeniden
+        denenir; bozuk satır sadece kendisini düşürür. Zaman aşımı / bağlantı / yetki
+        gibi hatalarda chunk tekrar denenmez (yazılmış olabilir, çift kayıt riski) ve None döner.
+        """
+        size = max(1, chunk_size or _get_int_setting("EYAVAP_INSERT_CHUNK_ROWS", DEFAULT_INSERT_CHUNK_ROWS))
+        results: List[Optional[Dict[str, Any]]] = []
+        for i in range(0, len(rows), size):
+            results.extend(self._insert_chunk(table, rows[i:i + size]))
+        return results
+
+    def _insert_chunk(self, table: str, rows: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        if not rows:
+            return []
+        try:
+            data = self.client.table(table).insert(rows).execute().data or []
+        except Exception as e:
+            if len(rows) == 1 or not _is_row_error(e):
+                print(f"❌ Insert hatası ({table}, {len(rows)} satır): {e}")
+                return [None] * len(rows)
+            mid = len(rows) // 2
+            return self._insert_chunk(table, rows[:mid]) + self._insert_chunk(table, rows[mid:])
+        # PostgREST eklenen satırları girdi sırasıyla döndürür
+        if len(data) != len(rows):
+            print(f"⚠️ Toplu insert ({table}): {len(rows)} satır gönderildi, {len(data)} döndü")
+        return list(data[:len(rows)]) + [None] * (len(rows) - len(data))
+
+    # ==================== TABLO TARAMA ====================
+
+    def iter_rows(
+        self,
+        table: str,
+        columns: str = "*",
+        filters=None,
+        page_size: int | None = None,
+        prefetch: bool = False,
+        desc: bool = False,
+        max_rows: int | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Tabloyu (created_at, id) keyset'i ile sabit boyutlu sayfalar halinde tarar.
+        OFFSET kullanmaz; her sayfa bir öncekinin son satırından devam eder.
+
+        Args:
+            table: Tablo / view adı (created_at ve id sütunları olmalı)
+            columns: select ifadesi; created_at ve id yoksa eklenir
+            filters: query -> query (ör. lambda q: q.gte("created_at", since)); or_ kullanmamalı
+            page_size: Sayfa boyutu (varsayılan EYAVAP_SCAN_PAGE_SIZE / 500)
+            prefetch: Satırlar tüketilirken bir sonraki sayfayı arka planda çek
+            desc: Yeniden eskiye tara
+            max_rows: En fazla bu kadar satır üret
+
+        Yields:
+            Satır dict'leri (tembel). Hatalar çağırana iletilir; tarama sessizce kesilmez.
+        """
+        size = max(1, page_size or _get_int_setting("EYAVAP_SCAN_PAGE_SIZE", DEFAULT_SCAN_PAGE_SIZE))
+        if max_rows is not None:
+            size = min(size, max(1, max_rows))
+        select = _scan_columns(columns)
+
+        def fetch(cursor) -> List[Dict[str, Any]]:
+            q = self.client.table(table).select(select)
+            if filters is not None:
+                q = filters(q)
+            if cursor is not None:
+                q = q.or_(_keyset_condition(cursor[0], cursor[1], desc))
+            return q.order("created_at", desc=desc).order("id", desc=desc).limit(size).execute().data or []
+
+        emitted = 0
+        page = fetch(None)
+        while page:
+            last = page[-1]
+            cursor = (last.get("created_at"), last.get("id"))
+            more = len(page) >= size and cursor[0] is not None and cursor[1] is not None
+            pending = _SCAN_EXECUTOR.submit(fetch, cursor) if (more and prefetch) else None
+            for row in page:
+                if max_rows is not None and emitted >= max_rows:
+                    if pending is not None:
+                        pending.cancel()
+                    return
+                yield row
+                emitted += 1
+            if not more:
+                return
+            page = pending.result() if pending is not None else fetch(cursor)
 
     # ==================== RAG / HAFIZA ====================
 
@@ -318,68 +1049,64 @@ class Database:
             return []
 
     def get_agent_statistics(self) -> List[Dict[str, Any]]:
-        """Dashboard için ajan istatistikleri"""
+        """
+        Dashboard için ajan istatistikleri.
+        agent_activity_statistics view'ından (trigger ile güncellenen rollup) tek sorguda okur.
+        """
         try:
             res = (
                 self.client
-                .table("agents")
+                .table("agent_activity_statistics")
                 .select(
-                    "id,name,specialization,rank,merit_score,total_queries,successful_queries,success_rate,last_used,ethnicity,origin_country"
+                    "id,name,specialization,rank,merit_score,total_queries,successful_queries,success_rate,last_used,"
+                    "ethnicity,origin_country,total_topics,total_comments,last_post_at,last_comment_at"
                 )
                 .eq("is_active", True)
                 .order("merit_score", desc=True)
                 .execute()
             )
             agents = res.data or []
+            for a in agents:
+                a["total_topics"] = a.get("total_topics") or 0
+                a["total_comments"] = a.get("total_comments") or 0
+                last_post = a.pop("last_post_at", None)
+                last_comment = a.pop("last_comment_at", None)
+                a["last_active"] = max([t for t in [a.get("last_used"), last_post, last_comment] if t], default=None)
+            return agents
         except Exception as e:
-            print(f"❌ Ajan istatistikleri hatası: {e}")
-            agents = self.get_all_agents()
+            # Rollup yoksa (migration_agent_activity_rollup.sql çalıştırılmamış) eski yol
+            print(f"⚠️ Rollup view hatası, satır bazlı istatistiğe dönülüyor: {e}")
+        return self._get_agent_statistics_legacy()
 
-        # Post ve yorum sayıları + son aktivite
-        posts = []
-        comments = []
+    def refresh_activity_rollup(self) -> int:
+        """Rollup'ı posts/comments'ten yeniden hesaplar (drift onarımı)."""
         try:
-            posts = (
-                self.client
-                .table("posts")
-                .select("agent_id,created_at")
-                .limit(10000)
-                .execute()
-            ).data or []
+            res = self.client.rpc("refresh_agent_activity_rollup", {}).execute()
+            return int(res.data or 0)
         except Exception as e:
-            print(f"❌ Post istatistikleri hatası: {e}")
+            print(f"❌ Rollup refresh hatası: {e}")
+            return 0
+
+    def _get_agent_statistics_legacy(self) -> List[Dict[str, Any]]:
         try:
-            comments = (
+            res = (
                 self.client
-                .table("comments")
-                .select("agent_id,created_at")
-                .limit(10000)
+                .table("agents")
+                .select(
+                    "id,name,specialization,rank,merit_score,total_queries,successful_queries,success_rate,last_used,ethnicity,origin_country"
+                )
+                .eq("is_active", True)
+                .order("merit_score", desc=True)
                 .execute()
-            ).data or []
+            )
+            agents = res.data or []
         except Exception as e:
-            print(f"❌ Yorum istatistikleri hatası: {e}")
+            print(f"❌ Ajan istatistikleri hatası: {e}")
+            agents = self.get_all_agents()
 
-        post_count = {}
-        post_last = {}
-        for p in posts:
-            aid = p.get("agent_id")
-            if not aid:
-                continue
-            post_count[aid] = post_count.get(aid, 0) + 1
-            ts = p.get("created_at")
-            if ts and (post_last.get(aid) is None or ts > post_last[aid]):
-                post_last[aid] = ts
-
-        comment_count = {}
-        comment_last = {}
-        for c in comments:
-            aid = c.get("agent_id")
-            if not aid:
-                continue
-            comment_count[aid] = comment_count.get(aid, 0) + 1
-            ts = c.get("created_at")
-            if ts and (comment_last.get(aid) is None or ts > comment_last[aid]):
-                comment_last[aid] = ts
+        # Post ve yorum sayıları + son aktivite (tam tarama, sayfa sayfa)
+        post_count, post_last = self._count_activity("posts")
+        comment_count, comment_last = self._count_activity("comments")
 
         # success_rate hesapla (yoksa)
         for a in agents:
@@ -396,6 +1123,23 @@ class Database:
             a["last_active"] = max([t for t in [last_used, last_post, last_comment] if t], default=None)
         return agents
 
+    def _count_activity(self, table: str) -> tuple[Dict[str, int], Dict[str, str]]:
+        """agent_id başına satır sayısı ve son created_at."""
+        counts: Dict[str, int] = {}
+        last: Dict[str, str] = {}
+        try:
+            for r in self.iter_rows(table, "agent_id,created_at", page_size=1000, prefetch=True):
+                aid = r.get("agent_id")
+                if not aid:
+                    continue
+                counts[aid] = counts.get(aid, 0) + 1
+                ts = r.get("created_at")
+                if ts and (last.get(aid) is None or ts > last[aid]):
+                    last[aid] = ts
+        except Exception as e:
+            print(f"❌ {table} istatistikleri hatası: {e}")
+        return counts, last
+
     # ==================== LEARNING / KNOWLEDGE ====================
 
     def add_knowledge_unit(
@@ -419,7 +1163,7 @@ class Database:
                 "reliability_score": max(0.0, min(1.0, reliability_score)),
                 "created_at": datetime.utcnow().isoformat(),
             }
-            return self.client.table("knowledge_units").insert(data).execute()
+            return self._insert_row("knowledge_units", data)
         except Exception as e:
             print(f"❌ Knowledge unit hatası: {e}")
 
@@ -430,6 +1174,122 @@ class Database:
         delta: float,
         reason: str = "",
     ):
+        """
+        Skill puanını günceller.
+        - Batch modunda (begin_skill_batch) delta hafızada toplanır, flush'ta tek RPC ile yazılır.
+        - Aksi halde increment_skill_score RPC ile tek çağrıda atomik günceller.
+        """
+        try:
+            batch = getattr(self._skill_local, "batch", None)
+            if batch is not None:
+                key = (agent_id, specialization)
+                batch.deltas[key] = batch.deltas.get(key, 0.0) + float(delta)
+            elif not self._increment_skill_score_rpc(agent_id, specialization, delta):
+                self._update_skill_score_legacy(agent_id, specialization, delta)
+
+            if reason:
+                self.log_learning_event(
+                    agent_id=agent_id,
+                    event_type="skill_update",
+                    details={"specialization": specialization, "delta": delta, "reason": reason},
+                )
+        except Exception as e:
+            print(f"❌ Skill score hatası: {e}")
+
+    def begin_skill_batch(self) -> None:
+        """Bu thread'in skill delta'larını biriktirmeye başlar (iç içe çağrılabilir)."""
+        batch = getattr(self._skill_local, "batch", None)
+        if batch is None:
+            batch = self._skill_local.batch = _SkillBatch()
+            with self._skill_lock:
+                self._skill_batches.append(batch)
+        batch.depth += 1
+
+    def end_skill_batch(self) -> int:
+        """Batch'i kapatır; en dıştaki çağrıda birikmiş delta'ları yazar."""
+        batch = getattr(self._skill_local, "batch", None)
+        if batch is None:
+            return 0
+        batch.depth -= 1
+        if batch.depth > 0:
+            return 0
+        self._skill_local.batch = None
+        with self._skill_lock:
+            self._skill_batches.remove(batch)
+        return self._apply_skill_deltas(batch.deltas)
+
+    def flush_skill_deltas(self) -> int:
+        """Bu thread'in açık batch'inde birikenleri hemen yazar (batch açık kalır)."""
+        batch = getattr(self._skill_local, "batch", None)
+        if batch is None:
+            return 0
+        pending, batch.deltas = batch.deltas, {}
+        return self._apply_skill_deltas(pending)
+
+    def _flush_open_skill_batches(self) -> int:
+        """Kapatılmamış tüm batch'leri yazar (süreç sonu)."""
+        with self._skill_lock:
+            batches = list(self._skill_batches)
+        written = 0
+        for batch in batches:
+            pending, batch.deltas = batch.deltas, {}
+            written += self._apply_skill_deltas(pending)
+        return written
+
+    def _apply_skill_deltas(self, pending: Dict[tuple, float]) -> int:
+        """(agent_id, specialization) delta'larını tek apply_skill_deltas çağrısıyla yazar."""
+        if not pending:
+            return 0
+
+        payload = [
+            {"agent_id": aid, "specialization": spec, "delta": round(d, 4)}
+            for (aid, spec), d in pending.items()
+            if aid and d
+        ]
+        if not payload:
+            return 0
+        try:
+            self.client.rpc("apply_skill_deltas", {"deltas": payload}).execute()
+            return len(payload)
+        except Exception as e:
+            if not _is_missing_function(e):
+                # Zaman aşımı vb.: batch yazılmış olabilir, tek tek tekrar uygulamak çift sayar
+                print(f"❌ apply_skill_deltas hatası, {len(payload)} delta yazılamadı: {e}")
+                return 0
+            # RPC yoksa (migration_skill_scores_rpc.sql çalıştırılmamış) tek tek yaz
+            print(f"⚠️ apply_skill_deltas RPC yok, tek tek yazılıyor: {e}")
+            written = 0
+            for row in payload:
+                try:
+                    if not self._increment_skill_score_rpc(row["agent_id"], row["specialization"], row["delta"]):
+                        self._update_skill_score_legacy(row["agent_id"], row["specialization"], row["delta"])
+                    written += 1
+                except Exception as row_error:
+                    print(f"❌ Skill delta yazılamadı ({row['agent_id']}): {row_error}")
+            return written
+
+    def _increment_skill_score_rpc(self, agent_id: str, specialization: str, delta: float) -> bool:
+        if not self._skill_rpc_available:
+            return False
+        try:
+            self.client.rpc(
+                "increment_skill_score",
+                {
+                    "agent_id_param": agent_id,
+                    "specialization_param": specialization,
+                    "delta_param": float(delta),
+                },
+            ).execute()
+            return True
+        except Exception as e:
+            # Sadece RPC tanımlı değilse eski yola kalıcı dön; geçici hatalar yükselir
+            if not _is_missing_function(e):
+                raise
+            print(f"⚠️ increment_skill_score RPC kullanılamıyor, eski yola dönülüyor: {e}")
+            self._skill_rpc_available = False
+            return False
+
+    def _update_skill_score_legacy(self, agent_id: str, specialization: str, delta: float):
         try:
             current = (
                 self.client
@@ -456,26 +1316,20 @@ class Database:
                         "last_updated": datetime.utcnow().isoformat(),
                     }
                 ).execute()
-
-            if reason:
-                self.log_learning_event(
-                    agent_id=agent_id,
-                    event_type="skill_update",
-                    details={"specialization": specialization, "delta": delta, "reason": reason},
-                )
         except Exception as e:
             print(f"❌ Skill score hatası: {e}")
 
     def log_learning_event(self, agent_id: str, event_type: str, details: Dict[str, Any] | None = None):
         try:
-            self.client.table("agent_learning_logs").insert(
+            self._insert_row(
+                "agent_learning_logs",
                 {
                     "agent_id": agent_id,
                     "event_type": event_type,
                     "details": details or {},
                     "created_at": datetime.utcnow().isoformat(),
-                }
-            ).execute()
+                },
+            )
         except Exception as e:
             print(f"❌ Learning log hatası: {e}")
 
@@ -489,15 +1343,16 @@ class Database:
         details: Dict[str, Any] | None = None,
     ):
         try:
-            self.client.table("compliance_events").insert(
+            self._insert_row(
+                "compliance_events",
                 {
                     "agent_id": agent_id,
                     "event_type": event_type,
                     "severity": severity,
                     "details": details or {},
                     "created_at": datetime.utcnow().isoformat(),
-                }
-            ).execute()
+                },
+            )
         except Exception as e:
             print(f"❌ Compliance event hatası: {e}")
 
@@ -506,7 +1361,8 @@ class Database:
         agent_id: str,
         reason: str,
         severity: str = "low",
-    ):
+    ) -> Dict[str, Any] | None:
+        """Tek strike uygular. Sonuç: {trust_score, compliance_strikes, is_suspended, trust_delta}"""
         try:
             agent_res = (
                 self.client
@@ -536,14 +1392,70 @@ class Database:
                 }
             ).eq("id", agent_id).execute()
 
+            self.roster.patch(
+                agent_id,
+                {"trust_score": new_trust, "compliance_strikes": new_strikes, "is_suspended": suspend},
+            )
+
             self.log_compliance_event(
                 agent_id=agent_id,
                 event_type="strike",
                 severity=severity,
                 details={"reason": reason, "trust_delta": -penalty},
             )
+            return {
+                "trust_score": new_trust,
+                "compliance_strikes": new_strikes,
+                "is_suspended": suspend,
+                "trust_delta": -penalty,
+            }
         except Exception as e:
             print(f"❌ Compliance strike hatası: {e}")
+            return None
+
+    def apply_compliance_strikes(self, strikes: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Çok sayıda strike'ı tek RPC ile uygular.
+        strikes: [{"agent_id", "reason", "severity"}, ...]
+        Dönen: {agent_id: {trust_score, compliance_strikes, is_suspended, trust_delta}}
+        """
+        strikes = [s for s in strikes if s and s.get("agent_id")]
+        if not strikes:
+            return {}
+        payload = [
+            {
+                "agent_id": s["agent_id"],
+                "reason": s.get("reason") or "policy_violation",
+                "severity": s.get("severity") or "low",
+            }
+            for s in strikes
+        ]
+        try:
+            res = self.client.rpc("apply_compliance_strikes", {"strikes": payload}).execute()
+            results = {
+                row["agent_id"]: {
+                    "trust_score": row.get("trust_score"),
+                    "compliance_strikes": row.get("compliance_strikes"),
+                    "is_suspended": row.get("is_suspended"),
+                    "trust_delta": row.get("trust_delta"),
+                }
+                for row in (res.data or [])
+            }
+            for aid, out in results.items():
+                self.roster.patch(aid, {k: v for k, v in out.items() if k != "trust_delta"})
+            return results
+        except Exception as e:
+            # RPC yoksa (migration_compliance_bulk.sql çalıştırılmamış) tek tek uygula
+            print(f"⚠️ apply_compliance_strikes RPC hatası, tek tek uygulanıyor: {e}")
+            results: Dict[str, Dict[str, Any]] = {}
+            for s in payload:
+                out = self.apply_compliance_strike(s["agent_id"], s["reason"], s["severity"])
+                if out:
+                    prev = results.get(s["agent_id"])
+                    if prev:
+                        out["trust_delta"] += prev["trust_delta"]
+                    results[s["agent_id"]] = out
+            return results
 
     def create_revision_task(
         self,
@@ -552,15 +1464,16 @@ class Database:
         reason: str,
     ):
         try:
-            self.client.table("revision_tasks").insert(
+            self._insert_row(
+                "revision_tasks",
                 {
                     "agent_id": agent_id,
                     "post_id": post_id,
                     "reason": reason,
                     "status": "open",
                     "created_at": datetime.utcnow().isoformat(),
-                }
-            ).execute()
+                },
+            )
         except Exception as e:
             print(f"❌ Revision task hatası: {e}")
 
@@ -643,7 +1556,17 @@ class Database:
     def daily_amnesty(self):
         """
         Günlük af: askıda olanları geri alır, strike sayısını azaltır.
+        Tek set-based UPDATE (daily_amnesty_bulk RPC); yoksa ajan başına UPDATE.
         """
+        try:
+            res = self.client.rpc("daily_amnesty_bulk", {}).execute()
+            self.roster.invalidate()
+            return {"amnestied": int(res.data or 0)}
+        except Exception as e:
+            print(f"⚠️ daily_amnesty_bulk RPC hatası, ajan bazlı affa dönülüyor: {e}")
+        return self._daily_amnesty_legacy()
+
+    def _daily_amnesty_legacy(self):
         try:
             res = (
                 self.client.table("agents")
@@ -666,26 +1589,167 @@ class Database:
                     }
                 ).eq("id", a["id"]).execute()
                 updated += 1
+            self.roster.invalidate()
             return {"amnestied": updated}
         except Exception as e:
             print(f"❌ Amnesty hatası: {e}")
             return {"amnestied": 0, "error": str(e)}
 
+    # ==================== HEALTH ====================
+
+    def close(self) -> None:
+        """
+        Bekleyen yazımları boşaltır ve HTTP havuzunu kapatır (süreç sonu / testler).
+        get_database bunu çağırmaz: değiştirilen örnek başka thread'lerde hâlâ kullanılıyor olabilir.
+        """
+        try:
+            self._flush_open_skill_batches()
+            if self.write_buffer is not None:
+                self.write_buffer.close()
+        except Exception as e:
+            print(f"⚠️ Database kapatılırken flush hatası: {e}")
+        if self._http_client is not None:
+            try:
+                self._http_client.close()
+            except Exception as e:
+                print(f"⚠️ HTTP havuzu kapatılamadı: {e}")
+            self._http_client = None
+
+    def health_check(self) -> bool:
+        """Bağlantı canlı mı? En ucuz sorgu ile PostgREST'e ping atar."""
+        try:
+            self.client.table("agents").select("id").limit(1).execute()
+            self.last_health_check = time.time()
+            return True
+        except Exception as e:
+            print(f"⚠️ Supabase health check başarısız: {e}")
+            return False
+
     # ==================== AI HELPERS ====================
 
-    def answer_with_llama_first(self, user_query: str) -> Dict[str, Any]:
+    def answer_with_llama_first(self, user_query: str, use_cache: bool = True) -> Dict[str, Any]:
         """Llama -> OpenAI fallback. provider'ı da döndürür."""
-        return ai_answer(user_query, llama_first=True)
+        return ai_answer(user_query, llama_first=True, use_cache=use_cache)
 
 
 # ==================== KÖPRÜLER (workflow'un aradığı fonksiyonlar) ====================
 
-def get_database() -> Database:
-    return Database()
+# Process genelinde tek Database (tek Supabase client + tek HTTP havuzu).
+# Ayarlar: SUPABASE_POOL_SIZE, SUPABASE_KEEPALIVE_SECONDS, SUPABASE_HEALTH_CHECK_SECONDS,
+# SUPABASE_HEALTH_FAILURES
+_DB_INSTANCE: Database | None = None
+_DB_LOCK = threading.Lock()
+_POOL_STATS = {"clients_created": 0, "health_checks": 0, "health_failures": 0}
+# Başarısız ping'den sonra bir sonraki ping'e kadar beklenen süre
+HEALTH_RETRY_SECONDS = 30
+
+
+def _create_pooled_client(url: str, key: str) -> Tuple[Client, Any]:
+    """
+    Keep-alive'lı, boyutu sınırlı bir httpx havuzu ile Supabase client kurar.
+    (client, httpx_client) döner; httpx_client eski supabase sürümlerinde None.
+    """
+    pool_size = max(1, _get_int_setting("SUPABASE_POOL_SIZE", 20))
+    keepalive = max(1, _get_int_setting("SUPABASE_KEEPALIVE_SECONDS", 60))
+
+    client = None
+    http_client = None
+    if httpx is not None:
+        try:
+            from supabase.lib.client_options import SyncClientOptions
+
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=keepalive,
+                ),
+                timeout=httpx.Timeout(30.0),
+            )
+            client = create_client(url, key, options=SyncClientOptions(httpx_client=http_client))
+        except Exception:
+            # Eski supabase sürümleri httpx_client kabul etmez
+            client = None
+            if http_client is not None:
+                http_client.close()
+                http_client = None
+    if client is None:
+        client = create_client(url, key)
+    elif http_client is not None:
+        # Client'a referans kalmayınca (değiştirilen örnek) havuz kapanır
+        try:
+            weakref.finalize(client, http_client.close)
+        except TypeError:
+            pass
+
+    _POOL_STATS["clients_created"] += 1
+    return client, http_client
+
+
+def get_database(force_new: bool = False) -> Database:
+    """
+    Paylaşılan (thread-safe) Database örneğini döndürür.
+    İlk çağrıda kurulur; SUPABASE_HEALTH_FAILURES (varsayılan 3) ardışık sağlık
+    kontrolü başarısız olursa yeniden kurulur. Ping kilit dışında atılır.
+    Eski örnek kapatılmaz (elinde tutan thread'ler kullanmaya devam edebilir);
+    referansı kalmayınca HTTP havuzu GC ile kapanır.
+    """
+    global _DB_INSTANCE
+    health_interval = _get_int_setting("SUPABASE_HEALTH_CHECK_SECONDS", 300)
+
+    with _DB_LOCK:
+        if _DB_INSTANCE is None or force_new:
+            _DB_INSTANCE = Database()
+            _DB_INSTANCE.last_health_check = time.time()
+            return _DB_INSTANCE
+
+        db = _DB_INSTANCE
+        if health_interval <= 0 or time.time() - db.last_health_check <= health_interval:
+            return db
+        # Ping'i bu çağrı üstlenir; diğer çağıranlar beklemeden mevcut örneği alır
+        db.last_health_check = time.time()
+        _POOL_STATS["health_checks"] += 1
+
+    if db.health_check():
+        db.health_failures = 0
+        return db
+
+    max_failures = max(1, _get_int_setting("SUPABASE_HEALTH_FAILURES", 3))
+    with _DB_LOCK:
+        _POOL_STATS["health_failures"] += 1
+        db.health_failures += 1
+        if _DB_INSTANCE is not db:
+            # Bu arada başka bir çağrı yeniledi
+            return _DB_INSTANCE
+        if db.health_failures < max_failures:
+            # Tek geçici hata örneği değiştirmez; tekrar ping kısa süre sonra
+            retry = min(HEALTH_RETRY_SECONDS, health_interval)
+            db.last_health_check = time.time() - health_interval + retry
+            return db
+        _DB_INSTANCE = Database()
+        _DB_INSTANCE.last_health_check = time.time()
+        return _DB_INSTANCE
+
+
+def reset_database() -> None:
+    """Paylaşılan örneği bırakır (testler / yeniden yapılandırma için)."""
+    global _DB_INSTANCE
+    with _DB_LOCK:
+        _DB_INSTANCE = None
+
+
+def get_pool_stats(reset: bool = False) -> Dict[str, int]:
+    """Bu process'te kurulan client sayısı ve sağlık kontrolü sayaçları."""
+    with _DB_LOCK:
+        stats = dict(_POOL_STATS)
+        if reset:
+            for k in _POOL_STATS:
+                _POOL_STATS[k] = 0
+    return stats
 
 
 def veriyi_hafizaya_yaz(metin: str, kaynak_url: str, vektor: list):
-    db = Database()
+    db = get_database()
     db.veriyi_hafizaya_yaz(metin, kaynak_url, vektor)
 
 
@@ -693,7 +1757,7 @@ def veriyi_hafizaya_yaz(metin: str, kaynak_url: str, vektor: list):
 
 if __name__ == "__main__":
     try:
-        db = Database()
+        db = get_database()
         print("✅ Veritabanı bağlantısı başarılı.")
 
         q = "Danimarka'da vergi borcum var mı nasıl öğrenirim?"
@@ -9,6 +9,9 @@ import datetime
 import random
 from typing import Dict, List, Any, Tuple
 
+import numpy as np
+
+from agent_roster import AgentRoster
 from database import get_database
 from governance_rules import ELECTION_RULES, ELECTION_RULES_LOCKED
 
@@ -20,37 +23,20 @@ def _now_iso() -> str:
     return datetime.datetime.utcnow().isoformat()
 
 
-def _get_active_agents(supabase) -> List[Dict[str, Any]]:
-    res = (
-        supabase.table("agents")
-        .select("id,name,specialization,merit_score,rank,ethnicity,is_active,is_suspended,vetting_status,trust_score")
-        .eq("is_active", True)
-        .execute()
-    )
-    agents = res.data or []
-    # Hide ZERO (0)
-    filtered = [a for a in agents if a.get("id") != ZERO_ID and a.get("name") != "0"]
-    eligible = []
-    for a in filtered:
-        if a.get("is_suspended") is True:
-            continue
-        if a.get("vetting_status") == "rejected":
-            continue
-        trust = a.get("trust_score")
-        if trust is not None and trust < MIN_TRUST_SCORE:
-            continue
-        eligible.append(a)
-    return eligible
+def _get_eligible_roster() -> Tuple[AgentRoster, np.ndarray]:
+    """Paylaşılan kadro + seçime katılabilir ajan maskesi (ZERO gizli, askı/veto/trust filtreli)."""
+    roster = get_database().roster.columnar()
+    return roster, roster.eligible_mask(MIN_TRUST_SCORE, include_hidden=False)
 
 
 def _compute_state_delegates(
-    agents: List[Dict[str, Any]],
+    spec_counts: Dict[str, int],
     total_delegates: int = 100,
 ) -> Dict[str, int]:
     counts: Dict[str, int] = {}
-    for a in agents:
-        spec = a.get("specialization", "general") or "general"
-        counts[spec] = counts.get(spec, 0) + 1
+    for spec, cnt in spec_counts.items():
+        spec = spec or "general"
+        counts[spec] = counts.get(spec, 0) + cnt
 
     total_agents = sum(counts.values()) or 1
     delegates = {
@@ -80,26 +66,13 @@ def _compute_state_delegates(
 
 
 def _select_candidates(
-    agents: List[Dict[str, Any]],
+    roster: AgentRoster,
+    mask: np.ndarray,
     max_candidates: int = 5,
     min_candidates: int = 2,
 ) -> List[Dict[str, Any]]:
-    sorted_agents = sorted(agents, key=lambda a: a.get("merit_score", 0), reverse=True)
-    candidates = sorted_agents[:max_candidates]
-    if len(candidates) < min_candidates:
-        candidates = sorted_agents[:min_candidates]
-    return candidates
-
-
-def _weighted_choice(weights: Dict[str, float]) -> str:
-    total = sum(weights.values())
-    r = random.uniform(0, total)
-    upto = 0.0
-    for k, w in weights.items():
-        upto += w
-        if upto >= r:
-            return k
-    return list(weights.keys())[0]
+    # En az min_candidates (ajan varsa), en fazla max(max, min) aday; merit'e göre
+    return roster.top_by_merit(max(max_candidates, min_candidates), mask)
 
 
 def _build_manifesto(agent: Dict[str, Any]) -> str:
@@ -116,11 +89,12 @@ def _build_manifesto(agent: Dict[str, Any]) -> str:
 def _refresh_candidates(
     supabase,
     election_id: str,
-    agents: List[Dict[str, Any]],
+    roster: AgentRoster,
+    mask: np.ndarray,
     max_candidates: int,
     min_candidates: int,
 ) -> List[Dict[str, Any]]:
-    candidates = _select_candidates(agents, max_candidates=max_candidates, min_candidates=min_candidates)
+    candidates = _select_candidates(roster, mask, max_candidates=max_candidates, min_candidates=min_candidates)
     for c in candidates:
         try:
             supabase.table("election_candidates").insert(
@@ -152,21 +126,24 @@ def _append_debate_summary(results: Dict[str, Any], text: str) -> Dict[str, Any]
 
 def _simulate_state_vote(
     state_key: str,
-    state_agents: List[Dict[str, Any]],
+    num_voters: int,
     candidates: List[Dict[str, Any]],
+    rng: np.random.Generator | None = None,
 ) -> Dict[str, int]:
-    vote_totals = {c["id"]: 0 for c in candidates}
-
-    for agent in state_agents:
-        weights = {}
-        for c in candidates:
-            merit = (c.get("merit_score", 50) or 50) / 100.0
-            spec_bonus = 0.15 if c.get("specialization") == state_key else 0.0
-            weights[c["id"]] = max(0.05, merit + spec_bonus)
-        chosen = _weighted_choice(weights)
-        vote_totals[chosen] += 1
-
-    return vote_totals
+    """
+    Her seçmen aynı ağırlıklarla (merit + eyalet bonusu) oy verdiği için
+    eyalet sonucu tek bir multinomial çekilişidir.
+    """
+    weights = np.array(
+        [
+            max(0.05, (c.get("merit_score", 50) or 50) / 100.0 + (0.15 if c.get("specialization") == state_key else 0.0))
+            for c in candidates
+        ],
+        dtype=np.float64,
+    )
+    rng = rng or np.random.default_rng(random.getrandbits(64))
+    votes = rng.multinomial(max(0, num_voters), weights / weights.sum())
+    return {c["id"]: int(v) for c, v in zip(candidates, votes)}
 
 
 def run_presidential_election(
@@ -183,11 +160,11 @@ def run_presidential_election(
     db = get_database()
     supabase = db.client
 
-    agents = _get_active_agents(supabase)
-    if not agents:
+    roster, eligible = _get_eligible_roster()
+    if not eligible.any():
         return {"success": False, "error": "No active agents"}
 
-    candidates = _select_candidates(agents, max_candidates=max_candidates, min_candidates=min_candidates)
+    candidates = _select_candidates(roster, eligible, max_candidates=max_candidates, min_candidates=min_candidates)
     if not candidates:
         return {"success": False, "error": "No candidates available"}
 
@@ -224,19 +201,21 @@ def run_presidential_election(
         except Exception:
             pass
 
-    delegates_map = _compute_state_delegates(agents, total_delegates=total_delegates)
+    spec_counts = roster.counts_by_specialization(eligible)
+    delegates_map = _compute_state_delegates(spec_counts, total_delegates=total_delegates)
 
     # Seed for deterministic results
     random.seed(str(election_id))
+    rng = np.random.default_rng(random.getrandbits(64))
 
     delegate_totals = {c["id"]: 0 for c in candidates}
     state_results = []
 
     for state_key, delegates in delegates_map.items():
-        state_agents = [a for a in agents if a.get("specialization") == state_key]
-        if not state_agents:
+        num_voters = spec_counts.get(state_key, 0)
+        if not num_voters:
             continue
-        vote_totals = _simulate_state_vote(state_key, state_agents, candidates)
+        vote_totals = _simulate_state_vote(state_key, num_voters, candidates, rng)
         winner_id = max(
             vote_totals.items(),
             key=lambda x: (x[1], next((c.get("merit_score", 0) for c in candidates if c["id"] == x[0]), 0)),
@@ -284,6 +263,7 @@ def run_presidential_election(
         supabase.table("agents").update(
             {"rank": "præsident"}
         ).eq("id", winner_id).execute()
+        get_database().roster.invalidate()
 
     return {
         "success": True,
@@ -404,8 +384,8 @@ def ensure_election_cycle(
         # Primary campaign updates (daily)
         last_update = _parse_iso(results.get("last_campaign_update"))
         if not last_update or (now - last_update).days >= 1:
-            agents = _get_active_agents(supabase)
-            _refresh_candidates(supabase, election_id, agents, max_candidates=5, min_candidates=2)
+            roster, eligible = _get_eligible_roster()
+            _refresh_candidates(supabase, election_id, roster, eligible, max_candidates=5, min_candidates=2)
             results = _append_campaign_update(
                 results,
                 "Primærvalg: kandidaterne opdateret og kampagner intensiveret.",
@@ -145,13 +145,11 @@ def assign_dynamic_expertise(agent_id: str, new_expertise: str, reason: str = "G
     
     try:
         # Mevcut ajanı al
-        agent = db.client.table("agents").select("*").eq("id", agent_id).single().execute()
+        agent_data = db.roster.get(agent_id)
         
-        if not agent.data:
+        if not agent_data:
             return False
         
-        agent_data = agent.data
-        
         # Mevcut expertise_areas
         expertise_areas = agent_data.get('expertise_areas', [])
         if isinstance(expertise_areas, str):
@@ -165,6 +163,7 @@ def assign_dynamic_expertise(agent_id: str, new_expertise: str, reason: str = "G
             db.client.table("agents").update({
                 "expertise_areas": expertise_areas
             }).eq("id", agent_id).execute()
+            db.roster.patch(agent_id, {"expertise_areas": expertise_areas})
             
             # Log
             log_evolution(
@@ -202,12 +201,11 @@ def evolve_agent(agent_id: str, new_specialization: str, reason: str = "Skill Mi
     
     try:
         # Mevcut ajanı al
-        agent = db.client.table("agents").select("*").eq("id", agent_id).single().execute()
+        agent_data = db.roster.get(agent_id)
         
-        if not agent.data:
+        if not agent_data:
             return False
         
-        agent_data = agent.data
         old_specialization = agent_data.get('specialization', 'Unknown')
         
         # Eski uzmanlığı expertise_areas'a ekle (DNA koruma)
@@ -223,6 +221,7 @@ def evolve_agent(agent_id: str, new_specialization: str, reason: str = "Skill Mi
             "specialization": new_specialization,
             "expertise_areas": expertise_areas
         }).eq("id", agent_id).execute()
+        db.roster.patch(agent_id, {"specialization": new_specialization, "expertise_areas": expertise_areas})
         
         # Log
         log_evolution(
@@ -300,22 +299,18 @@ def find_legacy_agents(inactive_days: int = 30) -> List[Dict]:
     
     try:
         # Tüm ajanları al
-        all_agents = db.client.table("agents").select("*").eq("is_active", True).execute().data
+        roster = db.roster.columnar()
         
-        legacy_agents = []
+        # Cutoff'tan sonra post atan ajanlar (ajan başına sorgu yerine tek tarama)
+        recent_authors = {
+            r.get("agent_id")
+            for r in db.iter_rows("posts", "agent_id", filters=lambda q: q.gte("created_at", cutoff_date), page_size=1000)
+        }
         
-        for agent in all_agents:
-            # Bu ajanın son postunu kontrol et
-            last_post = db.client.table("posts").select("created_at").eq("agent_id", agent['id']).order("created_at", desc=True).limit(1).execute()
-            
-            if not last_post.data:
-                # Hiç post atmamış
-                legacy_agents.append(agent)
-            else:
-                last_post_date = last_post.data[0]['created_at']
-                if last_post_date < cutoff_date:
-                    # 30 günden eski
-                    legacy_agents.append(agent)
+        # Hiç post atmamış veya son postu 30 günden eski
+        legacy_idx = [i for i, agent_id in enumerate(roster.ids.tolist()) if agent_id not in recent_authors]
+        
+        legacy_agents = roster.rows(legacy_idx)
         
         return legacy_agents
     
@@ -388,8 +383,9 @@ def evolution_controller(force_evolution: bool = False) -> Dict[str, int]:
     
     # En popüler 3 topic için gap kontrolü
     for topic, count in topics_used.most_common(3):
-        # Bu topic için uygun ajan var mı?
-        all_agents = db.client.table("agents").select("*").eq("is_active", True).execute().data
+        # Bu topic için uygun ajan var mı? (kadro cache'inden; önceki atamalar patch ile yansır)
+        roster = db.roster.columnar()
+        all_agents = roster.rows(roster.indices(roster.active))
         
         # Rastgele bir haber başlığı (simülasyon için)
         news_title = f"Breaking news about {topic}"
@@ -16,17 +16,21 @@ try:
 except ImportError:
     HAS_STREAMLIT = False
 
+from llm_provider import get_openai_client, get_gemini_client, fake_llm_enabled
+from llm_gateway import chat_completion, generate_content
+from budget_control import ai_allowed, describe as describe_budget, get_budget_state, scaled, update_budget_state
+
 try:
     from openai import OpenAI
     HAS_OPENAI = True
 except ImportError:
-    HAS_OPENAI = False
+    HAS_OPENAI = fake_llm_enabled()
 
 try:
     from google import genai
     HAS_GEMINI = True
 except ImportError:
-    HAS_GEMINI = False
+    HAS_GEMINI = fake_llm_enabled()
 
 
 def _get_secret(name: str) -> str:
@@ -39,7 +43,7 @@ def _get_secret(name: str) -> str:
     return (val or "").strip()
 
 
-def is_discussion_mature(post: Dict[str, Any], comments: List[Dict[str, Any]]) -> bool:
+def is_discussion_mature(post: Dict[str, Any], comments: List[Dict[str, Any]], use_ai: bool = True) -> bool:
     """
     Tartışma olgunlaştı mı? (Daha fazla yorum eklenecek mi?)
     
@@ -77,8 +81,8 @@ def is_discussion_mature(post: Dict[str, Any], comments: List[Dict[str, Any]]) -
         print(f"  ✅ Post {post['id'][:8]} mature: Low consensus ({consensus_score}), poor quality")
         return True
     
-    # Criteria 4: AI değerlendirmesi (optional, ağır işlem)
-    if comment_count >= 12:
+    # Criteria 4: AI değerlendirmesi (optional, ağır işlem; bütçe low ise atlanır)
+    if use_ai and comment_count >= 12:
         ai_mature = _ai_maturity_check(post, comments)
         if ai_mature:
             print(f"  ✅ Post {post['id'][:8]} mature: AI determined discussion exhausted")
@@ -129,8 +133,8 @@ Svar (JA/NEJ):"""
         if HAS_OPENAI and HAS_STREAMLIT:
             openai_key = _get_secret("OPENAI_API_KEY")
             if openai_key:
-                client = OpenAI(api_key=openai_key)
-                response = client.chat.completions.create(
+                client = get_openai_client(openai_key)
+                response = chat_completion(client, site="maturity_check",
                     model="gpt-4o-mini",
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=10,
@@ -143,8 +147,8 @@ Svar (JA/NEJ):"""
         if HAS_GEMINI and HAS_STREAMLIT:
             gemini_key = _get_secret("GEMINI_API_KEY")
             if gemini_key:
-                client = genai.Client(api_key=gemini_key)
-                response = client.models.generate_content(
+                client = get_gemini_client(gemini_key)
+                response = generate_content(client, site="maturity_check",
                     model="gemini-1.5-flash",
                     contents=prompt,
                     config={"temperature": 0.2, "max_output_tokens": 40},
@@ -169,6 +173,13 @@ def add_intelligent_comments(min_comments_per_post: int = 20, max_comments_per_p
     db = get_database()
     
     print("🧠 Akıllı yorum sistemi başlıyor...")
+
+    # AI bütçe durumu: low modda daha az yorum + şablon fallback
+    budget = get_budget_state()
+    use_ai = ai_allowed(budget)
+    min_comments_per_post = scaled(min_comments_per_post, budget, "comments")
+    max_comments_per_post = max(min_comments_per_post, scaled(max_comments_per_post, budget, "comments"))
+    print(f"💰 Bütçe modu: {describe_budget(budget)}")
     
     # Tüm aktif postları al
     posts_result = db.client.table("posts").select("*").order("created_at", desc=True).limit(50).execute()
@@ -181,62 +192,64 @@ def add_intelligent_comments(min_comments_per_post: int = 20, max_comments_per_p
     print(f"📊 {len(posts)} post bulundu")
     
     total_comments_added = 0
-    
-    for post in posts:
-        # Post'a ait yorumları al
-        comments_result = db.client.table("comments").select("*").eq("post_id", post['id']).execute()
-        comments = comments_result.data or []
-        
-        print(f"\n📝 Post: {post['id'][:8]} | Topic: {post.get('topic', 'N/A')} | Comments: {len(comments)}")
-        
-        # Tartışma olgunlaştı mı? (Minimum hedefe ulaşmadıysa atlama)
-        if is_discussion_mature(post, comments) and len(comments) >= min_comments_per_post:
-            print(f"  ⏭️ Atlıyor (mature)")
-            continue
-        
-        # Hedefe tamamla: 20-30 arası yorum
-        target = random.randint(min_comments_per_post, max_comments_per_post)
-        remaining = max(0, target - len(comments))
-        num_comments = remaining if remaining > 0 else random.randint(3, max_comments_per_post)
-        print(f"  ➕ {num_comments} yorum eklenecek")
-        
-        # Aktif ajanları al
-        agents_result = db.client.table("agents").select("*").eq("is_active", True).limit(100).execute()
-        agents = [a for a in (agents_result.data or []) if _is_agent_allowed(a)]
-        
-        if not agents:
-            print("  ⚠️ Aktif ajan bulunamadı")
-            continue
-        
-        for i in range(num_comments):
-            # Rastgele bir ajan seç (post sahibi hariç)
-            available_agents = [a for a in agents if a['id'] != post['agent_id']]
-            if not available_agents:
-                break
-            
-            commenter = random.choice(available_agents)
-            
-            # Yorum yap
-            comment = create_comment(
-                post_id=post['id'],
-                agent_id=commenter['id'],
-                use_ai=True  # AI ile derin yorumlar
-            )
-            
-            if comment:
-                total_comments_added += 1
-                print(f"    💬 {commenter['name'][:20]} yorum yaptı")
-                
-                # Yoruma oy ver (consensus güncellemesi için)
-                if random.random() > 0.3:  # %70 şans
-                    vote_on_post(
-                        voter_agent_id=random.choice(available_agents)['id'],
-                        target_post_id=post['id'],
-                        use_ai_evaluation=False  # Hızlı oy
-                    )
-            else:
-                print(f"    ⚠️ Yorum eklenemedi")
-    
+    db.begin_skill_batch()
+    try:
+        for post in posts:
+            # Post'a ait yorumları al
+            comments_result = db.client.table("comments").select("*").eq("post_id", post['id']).execute()
+            comments = comments_result.data or []
+
+            print(f"\n📝 Post: {post['id'][:8]} | Topic: {post.get('topic', 'N/A')} | Comments: {len(comments)}")
+
+            # Tartışma olgunlaştı mı? (Minimum hedefe ulaşmadıysa atlama)
+            if is_discussion_mature(post, comments, use_ai=use_ai) and len(comments) >= min_comments_per_post:
+                print(f"  ⏭️ Atlıyor (mature)")
+                continue
+
+            # Hedefe tamamla: 20-30 arası yorum
+            target = random.randint(min_comments_per_post, max_comments_per_post)
+            remaining = max(0, target - len(comments))
+            num_comments = remaining if remaining > 0 else random.randint(min(3, max_comments_per_post), max_comments_per_post)
+            print(f"  ➕ {num_comments} yorum eklenecek")
+
+            # Aktif ajanlar (kadro cache'i; post başına yeniden okunmaz)
+            agents = [a for a in db.roster.active(limit=100) if _is_agent_allowed(a)]
+
+            if not agents:
+                print("  ⚠️ Aktif ajan bulunamadı")
+                continue
+
+            for i in range(num_comments):
+                # Rastgele bir ajan seç (post sahibi hariç)
+                available_agents = [a for a in agents if a['id'] != post['agent_id']]
+                if not available_agents:
+                    break
+
+                commenter = random.choice(available_agents)
+
+                # Yorum yap
+                comment = create_comment(
+                    post_id=post['id'],
+                    agent_id=commenter['id'],
+                    use_ai=use_ai  # AI ile derin yorumlar (bütçe low ise şablon)
+                )
+
+                if comment:
+                    total_comments_added += 1
+                    print(f"    💬 {commenter['name'][:20]} yorum yaptı")
+
+                    # Yoruma oy ver (consensus güncellemesi için)
+                    if random.random() > 0.3:  # %70 şans
+                        vote_on_post(
+                            voter_agent_id=random.choice(available_agents)['id'],
+                            target_post_id=post['id'],
+                            use_ai_evaluation=False  # Hızlı oy
+                        )
+                else:
+                    print(f"    ⚠️ Yorum eklenemedi")
+    finally:
+        db.end_skill_batch()
+    update_budget_state()
     print(f"\n✅ Toplam {total_comments_added} yorum eklendi")
     return total_comments_added
 
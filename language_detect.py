@@ -0,0 +1,139 @@
+"""
+EYAVAP: Language Detector
+Danca / Türkçe / İngilizce için tek geçişli, önceden derlenmiş işaretçi tabanlı tespit.
+
+Metin bir kez küçük harfe çevrilip boşluktan token'lara ayrılır (eski " og "
+kalıplarıyla aynı sınır kuralı); diller küçük frozenset kesişimleriyle puanlanır,
+işaretçi başına ayrı `in` taraması yapılmaz. İngilizce ve Türkçe harf sinyali
+sadece detect()/scores() istendiğinde hesaplanır.
+
+- looks_danish / looks_turkish: social_stream / news_engine'in eski kuralları
+  (æ/ø/å veya >= 2 Danca işaretçi; herhangi bir Türkçe işaretçi)
+- violates_danish_only: ikisinin birleşimi, metni bir kez token'lar
+- analyze / detect: dil puanları ve en olası dil
+- *_many: liste API'si (haber, post, daily_quality_control toplu kontrolleri)
+
+Doğruluk / hız: python scripts/bench_language_detect.py
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+DANISH_MARKERS = frozenset({
+    "og", "det", "der", "ikke", "som", "for", "til", "med",
+    "en", "et", "også", "men", "på", "af", "i",
+})
+TURKISH_MARKERS = frozenset({
+    "ve", "bir", "için", "olarak", "çünkü", "ancak", "ayrıca",
+    "sistem", "ajan", "yorum", "başkan", "güven", "bilgi", "bugün",
+    "merhaba",
+})
+# Ek alan kelimeler: kök ile başlayan token eşleşir (teşekkürler, teşekkür ederim)
+TURKISH_PREFIXES = ("teşekkür",)
+ENGLISH_MARKERS = frozenset({
+    "the", "and", "is", "are", "of", "to", "that", "this", "with", "it",
+    "was", "be", "have", "not", "on", "from", "by", "which", "you", "we",
+})
+
+DANISH_CHARS = ("æ", "ø", "å")
+TURKISH_CHARS = ("ç", "ğ", "ı", "ş")
+# Özgün harf, işaretçi kelimeden daha güçlü sinyal
+CHAR_WEIGHT = 2
+MIN_DANISH_MARKERS = 2
+
+
+class LanguageSignals:
+    """Tek metnin dil sinyalleri (işaretçi sayıları + özgün harfler)."""
+
+    __slots__ = ("text", "tokens", "danish", "turkish", "danish_chars")
+
+    def __init__(self, text: str):
+        t = (text or "").lower()
+        tokens = set(t.split())
+        self.text = t
+        self.tokens = tokens
+        self.danish = len(tokens & DANISH_MARKERS)
+        self.turkish = len(tokens & TURKISH_MARKERS) + sum(1 for p in TURKISH_PREFIXES if p in t)
+        self.danish_chars = any(ch in t for ch in DANISH_CHARS)
+
+    @property
+    def looks_danish(self) -> bool:
+        return self.danish_chars or self.danish >= MIN_DANISH_MARKERS
+
+    @property
+    def looks_turkish(self) -> bool:
+        return self.turkish > 0
+
+    def scores(self) -> Dict[str, float]:
+        turkish_chars = any(ch in self.text for ch in TURKISH_CHARS)
+        return {
+            "da": float(self.danish + (CHAR_WEIGHT if self.danish_chars else 0)),
+            "tr": float(self.turkish + (CHAR_WEIGHT if turkish_chars else 0)),
+            "en": float(len(self.tokens & ENGLISH_MARKERS)),
+        }
+
+    def language(self) -> str:
+        """En yüksek puanlı dil; sinyal yoksa "unknown"."""
+        scores = self.scores()
+        lang = max(scores, key=scores.get)
+        return lang if scores[lang] > 0 else "unknown"
+
+
+def analyze(text: str) -> LanguageSignals:
+    return LanguageSignals(text)
+
+
+# Sıcak yol: LanguageSignals kurmadan, ilk kesin sinyalde döner
+
+def looks_danish(text: str) -> bool:
+    t = (text or "").lower()
+    if "æ" in t or "ø" in t or "å" in t:
+        return True
+    return len(DANISH_MARKERS.intersection(t.split())) >= MIN_DANISH_MARKERS
+
+
+def looks_turkish(text: str) -> bool:
+    t = (text or "").lower()
+    return not TURKISH_MARKERS.isdisjoint(t.split()) or any(p in t for p in TURKISH_PREFIXES)
+
+
+def violates_danish_only(text: str) -> bool:
+    """
+    `looks_turkish(text) or not looks_danish(text)` — tek lower() + tek split() ile.
+    Post / yorum içerik kuralı (Türkçe yasak, sadece Danca).
+    """
+    t = (text or "").lower()
+    tokens = t.split()
+    if not TURKISH_MARKERS.isdisjoint(tokens) or any(p in t for p in TURKISH_PREFIXES):
+        return True
+    if "æ" in t or "ø" in t or "å" in t:
+        return False
+    return len(DANISH_MARKERS.intersection(tokens)) < MIN_DANISH_MARKERS
+
+
+def detect(text: str) -> str:
+    """"da" | "tr" | "en" | "unknown" """
+    return LanguageSignals(text).language()
+
+
+def language_scores(text: str) -> Dict[str, float]:
+    return LanguageSignals(text).scores()
+
+
+# ==================== TOPLU ====================
+
+def analyze_many(texts: Iterable[str]) -> List[LanguageSignals]:
+    return [LanguageSignals(t) for t in texts]
+
+
+def looks_danish_many(texts: Iterable[str]) -> List[bool]:
+    return [looks_danish(t) for t in texts]
+
+
+def looks_turkish_many(texts: Iterable[str]) -> List[bool]:
+    return [looks_turkish(t) for t in texts]
+
+
+def detect_many(texts: Iterable[str]) -> List[str]:
+    return [s.language() for s in analyze_many(texts)]
@@ -9,13 +9,16 @@ import datetime
 from typing import Dict, Any, List
 
 from database import get_database
-from social_stream import _looks_turkish
+from row_models import PostBody, PostQuality
+from language_detect import looks_turkish_many
+from llm_provider import get_openai_client, fake_llm_enabled
+from llm_gateway import chat_completion
 
 try:
     from openai import OpenAI
     HAS_OPENAI = True
 except Exception:
-    HAS_OPENAI = False
+    HAS_OPENAI = fake_llm_enabled()
 
 
 def _get_secret(name: str) -> str:
@@ -56,7 +59,7 @@ def _rewrite_with_ai(content: str, reason: str) -> tuple[str, str]:
     key = _get_secret("OPENAI_API_KEY")
     if not key:
         return content, "OPENAI_API_KEY missing"
-    client = OpenAI(api_key=key)
+    client = get_openai_client(key)
     prompt = f"""Rewrite the following content to address: {reason}.
 Requirements:
 - Improve clarity and factual grounding
@@ -66,7 +69,7 @@ Requirements:
 CONTENT:
 {content}
 """
-    resp = client.chat.completions.create(
+    resp = chat_completion(client, site="revision_rewrite",
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=500,
@@ -80,6 +83,8 @@ CONTENT:
 def process_revision_tasks(max_tasks: int = 10) -> Dict[str, Any]:
     db = get_database()
     supabase = db.client
+    # Buffer'da bekleyen revision task'lar okunmadan önce yazılsın
+    db.flush_writes()
 
     tasks = (
         supabase.table("revision_tasks")
@@ -92,13 +97,7 @@ def process_revision_tasks(max_tasks: int = 10) -> Dict[str, Any]:
 
     processed = 0
     for t in tasks:
-        post = (
-            supabase.table("posts")
-            .select("id,content")
-            .eq("id", t["post_id"])
-            .single()
-            .execute()
-        ).data
+        post = PostBody.fetch(supabase, t["post_id"])
         if not post:
             continue
         revised, summary = _rewrite_with_ai(post.get("content", ""), t.get("reason", "revision"))
@@ -160,15 +159,16 @@ def apply_revision_updates(max_apply: int = 10) -> Dict[str, Any]:
 def delete_low_quality_posts(limit_posts: int = 50) -> Dict[str, Any]:
     db = get_database()
     supabase = db.client
-    posts = (
-        supabase.table("posts")
-        .select("id,agent_id,content,metadata,created_at")
+    posts = PostQuality.from_rows(
+        PostQuality.query(supabase)
         .order("created_at", desc=True)
         .limit(limit_posts)
         .execute()
-    ).data or []
+        .data
+    )
 
     deleted = 0
+    pending_strikes: List[Dict[str, Any]] = []
     for p in posts:
         meta = p.get("metadata") or {}
         content = p.get("content") or ""
@@ -177,10 +177,8 @@ def delete_low_quality_posts(limit_posts: int = 50) -> Dict[str, Any]:
         if missing_source and short:
             try:
                 supabase.table("posts").delete().eq("id", p["id"]).execute()
-                db.apply_compliance_strike(
-                    agent_id=p["agent_id"],
-                    reason="auto_deleted_low_quality",
-                    severity="high",
+                pending_strikes.append(
+                    {"agent_id": p["agent_id"], "reason": "auto_deleted_low_quality", "severity": "high"}
                 )
                 db.log_learning_event(
                     agent_id=p["agent_id"],
@@ -191,6 +189,8 @@ def delete_low_quality_posts(limit_posts: int = 50) -> Dict[str, Any]:
             except Exception:
                 continue
 
+    db.apply_compliance_strikes(pending_strikes)
+
     return {"deleted": deleted}
 
 
@@ -198,16 +198,18 @@ def daily_quality_control(limit_posts: int = 50) -> Dict[str, Any]:
     db = get_database()
     supabase = db.client
 
-    posts = (
-        supabase.table("posts")
-        .select("id,agent_id,content,metadata,topic,created_at,consensus_score")
+    posts = PostQuality.from_rows(
+        PostQuality.query(supabase)
         .order("created_at", desc=True)
         .limit(limit_posts)
         .execute()
-    ).data or []
+        .data
+    )
 
     strikes = 0
-    for p in posts:
+    pending_strikes: List[Dict[str, Any]] = []
+    turkish_flags = looks_turkish_many(p.get("content") or "" for p in posts)
+    for p, is_turkish in zip(posts, turkish_flags):
         meta = p.get("metadata") or {}
         # Quality score update
         try:
@@ -218,10 +220,8 @@ def daily_quality_control(limit_posts: int = 50) -> Dict[str, Any]:
         except Exception:
             pass
         if not meta.get("news_link"):
-            db.apply_compliance_strike(
-                agent_id=p["agent_id"],
-                reason="missing_source",
-                severity="medium",
+            pending_strikes.append(
+                {"agent_id": p["agent_id"], "reason": "missing_source", "severity": "medium"}
             )
             db.create_revision_task(
                 agent_id=p["agent_id"],
@@ -230,10 +230,8 @@ def daily_quality_control(limit_posts: int = 50) -> Dict[str, Any]:
             )
             strikes += 1
         if p.get("content") and len(p["content"]) < 400:
-            db.apply_compliance_strike(
-                agent_id=p["agent_id"],
-                reason="low_quality_length",
-                severity="low",
+            pending_strikes.append(
+                {"agent_id": p["agent_id"], "reason": "low_quality_length", "severity": "low"}
             )
             db.create_revision_task(
                 agent_id=p["agent_id"],
@@ -242,12 +240,10 @@ def daily_quality_control(limit_posts: int = 50) -> Dict[str, Any]:
             )
             strikes += 1
         # Turkish content hard delete
-        if _looks_turkish(p.get("content", "")):
+        if is_turkish:
             supabase.table("posts").delete().eq("id", p["id"]).execute()
-            db.apply_compliance_strike(
-                agent_id=p["agent_id"],
-                reason="turkish_content_forbidden",
-                severity="high",
+            pending_strikes.append(
+                {"agent_id": p["agent_id"], "reason": "turkish_content_forbidden", "severity": "high"}
             )
             db.log_learning_event(
                 agent_id=p["agent_id"],
@@ -256,12 +252,16 @@ def daily_quality_control(limit_posts: int = 50) -> Dict[str, Any]:
             )
             strikes += 1
 
+    # Tüm strike'lar tek RPC ile
+    db.apply_compliance_strikes(pending_strikes)
+
     return {"posts_checked": len(posts), "strikes": strikes}
 
 
 def generate_personal_reports(max_agents: int = 20) -> Dict[str, Any]:
     db = get_database()
     supabase = db.client
+    db.flush_writes()
     agents = (
         supabase.table("agents")
         .select("id,name")
@@ -293,19 +293,16 @@ def generate_personal_reports(max_agents: int = 20) -> Dict[str, Any]:
             .eq("agent_id", a["id"])
             .execute()
         ).data or []
-        knowledge_count = (
-            supabase.table("knowledge_units")
-            .select("id")
-            .eq("agent_id", a["id"])
-            .execute()
-        ).data or []
+        knowledge_count = sum(
+            1 for _ in db.iter_rows("knowledge_units", "id", filters=lambda q, aid=a["id"]: q.eq("agent_id", aid))
+        )
 
         db.log_learning_event(
             agent_id=a["id"],
             event_type="personal_report",
             details={
                 "skills": skills[:10],
-                "knowledge_units": len(knowledge_count),
+                "knowledge_units": knowledge_count,
             },
         )
         created += 1
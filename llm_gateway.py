@@ -0,0 +1,376 @@
+"""
+EYAVAP: LLM Gateway
+Tüm LLM çağrılarının geçtiği tek kapı. Sağlayıcı başına:
+- requests-per-minute token bucket
+- tokens-per-minute token bucket (tahminle ayrılır, gerçek usage ile düzeltilir)
+- max-in-flight (eşzamanlı istek) sınırı
+
+Sabit time.sleep(...) yerine izin verilen hızda çalışır: boşta beklemez,
+patlamada sıraya sokar. 429 görülürse sağlayıcı kısa süre soğutulur.
+
+Ayarlar (env / secrets), PROVIDER = OPENAI | GEMINI | DEEPINFRA:
+- LLM_<PROVIDER>_RPM
+- LLM_<PROVIDER>_TPM
+- LLM_<PROVIDER>_MAX_IN_FLIGHT
+- LLM_GATEWAY_MAX_WAIT_SECONDS=60   -> daha uzun bekleme gerekiyorsa LLMGatewayTimeout
+- LLM_GATEWAY=0                     -> sınırlamayı kapatır (sayaçlar yine tutulur)
+
+Her çağrı bir çağrı noktası (site) ile etiketlenir; gecikme, token ve sonuç
+llm_metrics'e kaydedilir.
+
+Kullanım:
+    resp = chat_completion(client, site="comment", model="gpt-4o-mini", messages=[...], max_tokens=600)
+    resp = generate_content(gemini_client, site="post", model="gemini-1.5-flash", contents=prompt, config={...})
+    with gateway_slot("deepinfra", estimate_tokens(messages, 600), site="llama_chat") as slot:
+        ...; slot.used(total_tokens, prompt_tokens, completion_tokens)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from llm_metrics import record_call
+
+DEFAULT_MAX_TOKENS = 600
+DEFAULT_MAX_WAIT_SECONDS = 60.0
+DEFAULT_COOLDOWN_SECONDS = 2.0
+# Bucket kapasitesi: dakikalık limitin bu kadar saniyelik kısmı tek seferde harcanabilir
+BURST_SECONDS = 6.0
+
+# (rpm, tpm, max_in_flight)
+PROVIDER_DEFAULTS = {
+    "openai": (500, 200_000, 8),
+    "gemini": (60, 1_000_000, 4),
+    "deepinfra": (200, 400_000, 8),
+}
+
+
+class LLMGatewayTimeout(RuntimeError):
+    """İstek, LLM_GATEWAY_MAX_WAIT_SECONDS içinde limitlere sığmadı."""
+
+
+def _setting(name: str, default: float) -> float:
+    val = os.getenv(name)
+    if val is None:
+        try:
+            import streamlit as st
+
+            val = st.secrets.get(name)
+        except Exception:
+            val = None
+    try:
+        return float(val) if val not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _gateway_enabled() -> bool:
+    return (os.getenv("LLM_GATEWAY", "1") or "1").strip().lower() not in ("0", "false", "no")
+
+
+# ==================== TOKEN BUCKET ====================
+
+class TokenBucket:
+    """
+    Dakikalık hız + sınırlı patlama. reserve() miktarı hemen düşer (bakiye eksiye
+    inebilir) ve bakiyenin sıfıra dönmesi için gereken bekleme süresini döndürür;
+    böylece bekleyenler rezervasyon sırasıyla, tam izin verilen hızda geçer.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.per_minute = max(1.0, float(per_minute))
+        self.rate = self.per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """amount kadar ayırır; beklenmesi gereken saniyeyi döndürür (0 = hemen)."""
+        # Kapasiteden büyük tek istek asla sığmaz; kapasiteyle sınırla
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        """Rezervasyonu düzeltir: pozitif = iade, negatif = ek tüketim."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+    def cooldown(self, seconds: float) -> None:
+        """Sonraki rezervasyonları en az `seconds` ileri iter (429 sonrası)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+# ==================== SAĞLAYICI ====================
+
+class _Slot:
+    """Tek çağrının rezervasyonu; gerçek token kullanımı used() ile bildirilir."""
+
+    __slots__ = ("estimated", "actual", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, estimated: int):
+        self.estimated = estimated
+        self.actual: Optional[int] = None
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+
+    def used(self, tokens: Optional[int], prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None) -> None:
+        if prompt_tokens is not None or completion_tokens is not None:
+            self.prompt_tokens = int(prompt_tokens or 0)
+            self.completion_tokens = int(completion_tokens or 0)
+            tokens = tokens or (self.prompt_tokens + self.completion_tokens)
+        if tokens:
+            self.actual = int(tokens)
+
+
+class ProviderLimiter:
+    def __init__(self, name: str, rpm: float, tpm: float, max_in_flight: int):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "tokens_estimated": 0,
+            "tokens_used": 0,
+            # usage dönmeyen çağrıların tahmini (bütçe toplamı = tokens_used + tokens_unreported)
+            "tokens_unreported": 0,
+        }
+
+    @classmethod
+    def from_settings(cls, name: str) -> "ProviderLimiter":
+        rpm, tpm, inflight = PROVIDER_DEFAULTS.get(name, PROVIDER_DEFAULTS["openai"])
+        key = name.upper()
+        return cls(
+            name,
+            rpm=_setting(f"LLM_{key}_RPM", rpm),
+            tpm=_setting(f"LLM_{key}_TPM", tpm),
+            max_in_flight=int(_setting(f"LLM_{key}_MAX_IN_FLIGHT", inflight)),
+        )
+
+    @contextmanager
+    def slot(self, estimated_tokens: int, max_wait: float | None = None, site: str = "") -> Iterator[_Slot]:
+        max_wait = _setting("LLM_GATEWAY_MAX_WAIT_SECONDS", DEFAULT_MAX_WAIT_SECONDS) if max_wait is None else max_wait
+        estimated_tokens = max(1, int(estimated_tokens))
+        slot = _Slot(estimated_tokens)
+        enabled = _gateway_enabled()
+
+        waited = 0.0
+        if enabled:
+            wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+            if wait > max_wait:
+                self.requests.adjust(1)
+                self.tokens.adjust(estimated_tokens)
+                self._count("timeouts")
+                record_call(site, self.name, 0.0, outcome="timeout")
+                raise LLMGatewayTimeout(f"{self.name}: limit beklemesi {wait:.1f}s > {max_wait:.0f}s")
+            started = time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if not self._slots.acquire(timeout=max(0.0, max_wait - wait)):
+                # Kullanılmayan rezervasyon iade edilir (doygunlukta RPM/TPM boşa erimesin)
+                self.requests.adjust(1)
+                self.tokens.adjust(estimated_tokens)
+                self._count("timeouts")
+                record_call(site, self.name, time.monotonic() - started, outcome="timeout")
+                raise LLMGatewayTimeout(f"{self.name}: max_in_flight={self.max_in_flight} dolu")
+            waited = time.monotonic() - started
+
+        with self._lock:
+            self.in_flight += 1
+            self.stats["requests"] += 1
+            self.stats["wait_seconds_total"] += waited
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+            self.stats["tokens_estimated"] += estimated_tokens
+        outcome = "ok"
+        call_started = time.perf_counter()
+        try:
+            yield slot
+        except Exception as e:
+            self._count("errors")
+            outcome = "error"
+            if _is_rate_limit_error(e):
+                self._count("rate_limited")
+                outcome = "rate_limited"
+                if enabled:
+                    self.requests.cooldown(_retry_after(e))
+            raise
+        finally:
+            # Gecikme limit beklemesini içermez: sadece sağlayıcı süresi
+            record_call(
+                site,
+                self.name,
+                time.perf_counter() - call_started,
+                slot.prompt_tokens,
+                slot.completion_tokens if slot.completion_tokens is not None else slot.actual,
+                outcome,
+            )
+            with self._lock:
+                self.in_flight -= 1
+                if slot.actual is not None:
+                    self.stats["tokens_used"] += slot.actual
+                else:
+                    self.stats["tokens_unreported"] += estimated_tokens
+            if enabled:
+                self._slots.release()
+                if slot.actual is not None:
+                    self.tokens.adjust(estimated_tokens - slot.actual)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["in_flight"] = self.in_flight
+        stats["rpm"] = self.requests.per_minute
+        stats["tpm"] = self.tokens.per_minute
+        stats["max_in_flight"] = self.max_in_flight
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 3)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 3)
+        return stats
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    text = str(e).lower()
+    return "429" in text or "rate limit" in text or "resource_exhausted" in text
+
+
+def _retry_after(e: Exception) -> float:
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after") or headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return DEFAULT_COOLDOWN_SECONDS
+
+
+# ==================== GATEWAY ====================
+
+_LIMITERS: Dict[str, ProviderLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    provider = (provider or "openai").lower()
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            limiter = _LIMITERS[provider] = ProviderLimiter.from_settings(provider)
+        return limiter
+
+
+def reset_gateway() -> None:
+    """Limiter'ları siler; yeni ayarlar bir sonraki çağrıda okunur."""
+    with _LIMITERS_LOCK:
+        _LIMITERS.clear()
+
+
+def get_gateway_stats() -> Dict[str, Dict[str, Any]]:
+    with _LIMITERS_LOCK:
+        limiters = list(_LIMITERS.values())
+    return {l.name: l.get_stats() for l in limiters}
+
+
+def estimate_tokens(messages: List[Dict[str, Any]] | str | None, max_tokens: int | None = None) -> int:
+    """Kaba tahmin: ~4 karakter/token prompt + istenen azami çıktı."""
+    if isinstance(messages, str):
+        chars = len(messages)
+    else:
+        chars = sum(len(str(m.get("content") or "")) for m in messages or [])
+    return chars // 4 + int(max_tokens or DEFAULT_MAX_TOKENS)
+
+
+def gateway_slot(provider: str, estimated_tokens: int, site: str = "", max_wait: float | None = None):
+    """Ham HTTP çağrıları için (database.llama_chat): with gateway_slot(...) as slot."""
+    return get_limiter(provider).slot(estimated_tokens, max_wait=max_wait, site=site)
+
+
+def _usage_tokens(response: Any) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """(total, prompt, completion) — OpenAI usage veya Gemini usage_metadata."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        prompt = getattr(usage, "prompt_tokens", None)
+        completion = getattr(usage, "completion_tokens", None)
+        return getattr(usage, "total_tokens", None), prompt, completion
+    meta = getattr(response, "usage_metadata", None)
+    if meta is not None:
+        return (
+            getattr(meta, "total_token_count", None),
+            getattr(meta, "prompt_token_count", None),
+            getattr(meta, "candidates_token_count", None),
+        )
+    return None, None, None
+
+
+def _gated_stream(limiter: ProviderLimiter, estimated: int, create, site: str) -> Iterator[Any]:
+    # Slot akış boyunca tutulur; tüketici bıraktığında (close) serbest kalır.
+    # Usage taşıyan parça (OpenAI include_usage son parçası, Gemini usage_metadata) slot'a işlenir.
+    with limiter.slot(estimated, site=site) as slot:
+        for chunk in create():
+            total, prompt, completion = _usage_tokens(chunk)
+            if total is not None or prompt is not None:
+                slot.used(total, prompt, completion)
+            yield chunk
+
+
+def chat_completion(client, provider: str = "openai", site: str = "", **kwargs) -> Any:
+    """client.chat.completions.create(**kwargs) — limitler dahilinde. stream=True desteklenir."""
+    limiter = get_limiter(provider)
+    estimated = estimate_tokens(kwargs.get("messages"), kwargs.get("max_tokens"))
+    if kwargs.get("stream"):
+        if provider == "openai":
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        return _gated_stream(limiter, estimated, lambda: client.chat.completions.create(**kwargs), site)
+    with limiter.slot(estimated, site=site) as slot:
+        response = client.chat.completions.create(**kwargs)
+        slot.used(*_usage_tokens(response))
+    return response
+
+
+def generate_content(client, site: str = "", **kwargs) -> Any:
+    """google.genai: client.models.generate_content(**kwargs) — limitler dahilinde."""
+    config = kwargs.get("config") or {}
+    max_tokens = config.get("max_output_tokens") if isinstance(config, dict) else None
+    estimated = estimate_tokens(str(kwargs.get("contents") or ""), max_tokens)
+    with get_limiter("gemini").slot(estimated, site=site) as slot:
+        response = client.models.generate_content(**kwargs)
+        slot.used(*_usage_tokens(response))
+    return response
+
+
+def gemini_model_generate(model, prompt: str, stream: bool = False, site: str = "", **kwargs) -> Any:
+    """google.generativeai GenerativeModel.generate_content — limitler dahilinde."""
+    limiter = get_limiter("gemini")
+    estimated = estimate_tokens(prompt)
+    if stream:
+        return _gated_stream(limiter, estimated, lambda: model.generate_content(prompt, stream=True, **kwargs), site)
+    with limiter.slot(estimated, site=site) as slot:
+        response = model.generate_content(prompt, **kwargs)
+        slot.used(*_usage_tokens(response))
+    return response
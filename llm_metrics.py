@@ -0,0 +1,258 @@
+"""
+EYAVAP: LLM Call Metrics
+Her LLM çağrısını çağrı noktası (site) ve sağlayıcı ile etiketleyip süreç içi
+histogramlarda toplar: gecikme, prompt/completion token, sonuç (ok / error /
+rate_limited / timeout). llm_gateway her çağrıda record() çağırır.
+
+Aggregate'ler periyodik olarak boşaltılır:
+- EYAVAP_LLM_METRICS_FILE=/tmp/eyavap_llm.prom -> Prometheus text formatı (node_exporter textfile)
+- EYAVAP_LLM_METRICS_TABLE=1                   -> llm_call_metrics tablosuna satır (migration_llm_call_metrics.sql)
+- EYAVAP_LLM_METRICS_FLUSH_SECONDS=60          -> boşaltma aralığı (0 = sadece çıkışta)
+
+Site adları: post, comment, vote_eval, maturity_check, revision_rewrite, challenge_analysis,
+topic_analysis, ask_answer, react_plan, react_think, react_act, llama_chat, openai_chat, ...
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Gecikme kovaları (saniye, üst sınır dahil); +Inf ayrıca tutulur
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OUTCOMES = ("ok", "error", "rate_limited", "timeout")
+DEFAULT_FLUSH_SECONDS = 60
+
+
+class CallStats:
+    """Tek (site, provider) çifti için sayaçlar + gecikme histogramı."""
+
+    __slots__ = ("count", "outcomes", "latency_sum", "latency_max", "buckets", "prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self.count = 0
+        self.outcomes = {o: 0 for o in OUTCOMES}
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, latency: float, prompt_tokens: int, completion_tokens: int, outcome: str) -> None:
+        self.count += 1
+        self.outcomes[outcome if outcome in self.outcomes else "error"] += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def merge(self, other: "CallStats") -> None:
+        self.count += other.count
+        for o, n in other.outcomes.items():
+            self.outcomes[o] += n
+        self.latency_sum += other.latency_sum
+        self.latency_max = max(self.latency_max, other.latency_max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+
+    def quantile(self, q: float) -> float:
+        """Histogramdan yaklaşık kantil (kova üst sınırı)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets[:-1]):
+            seen += n
+            if seen >= target:
+                return min(LATENCY_BUCKETS[i], self.latency_max)
+        return self.latency_max
+
+    def to_dict(self) -> Dict[str, Any]:
+        errors = self.count - self.outcomes["ok"]
+        return {
+            "calls": self.count,
+            **{f"outcome_{o}": n for o, n in self.outcomes.items()},
+            "error_rate": round(errors / self.count, 4) if self.count else 0.0,
+            "latency_avg_ms": round(self.latency_sum / self.count * 1000, 1) if self.count else 0.0,
+            "latency_p50_ms": round(self.quantile(0.5) * 1000, 1),
+            "latency_p95_ms": round(self.quantile(0.95) * 1000, 1),
+            "latency_max_ms": round(self.latency_max * 1000, 1),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+class LLMMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], CallStats] = {}
+        # Tabloya son flush'tan beri olan delta yazılır; Prometheus kümülatif ister
+        self._window: Dict[Tuple[str, str], CallStats] = {}
+        self.started_at = time.time()
+
+    def record(
+        self,
+        site: str,
+        provider: str,
+        latency: float,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        outcome: str = "ok",
+    ) -> None:
+        key = (site or "unknown", provider or "unknown")
+        with self._lock:
+            for table in (self._stats, self._window):
+                stats = table.get(key)
+                if stats is None:
+                    stats = table[key] = CallStats()
+                stats.add(latency, int(prompt_tokens or 0), int(completion_tokens or 0), outcome)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{"site/provider": {...}} — süreç başından beri kümülatif."""
+        with self._lock:
+            return {f"{s}/{p}": st.to_dict() for (s, p), st in sorted(self._stats.items())}
+
+    def _take_window(self) -> Dict[Tuple[str, str], CallStats]:
+        with self._lock:
+            window, self._window = self._window, {}
+        return window
+
+    def _restore_window(self, window: Dict[Tuple[str, str], CallStats]) -> None:
+        """Yazılamayan pencereyi bir sonraki flush'a geri katar."""
+        with self._lock:
+            for key, st in window.items():
+                current = self._window.get(key)
+                if current is None:
+                    self._window[key] = st
+                else:
+                    current.merge(st)
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = [
+            "# HELP eyavap_llm_call_duration_seconds LLM call latency by call site",
+            "# TYPE eyavap_llm_call_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self._stats.items())
+            for (site, provider), st in items:
+                labels = f'site="{site}",provider="{provider}"'
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS, st.buckets):
+                    cumulative += n
+                    lines.append(f'eyavap_llm_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'eyavap_llm_call_duration_seconds_bucket{{{labels},le="+Inf"}} {st.count}')
+                lines.append(f"eyavap_llm_call_duration_seconds_sum{{{labels}}} {st.latency_sum:.6f}")
+                lines.append(f"eyavap_llm_call_duration_seconds_count{{{labels}}} {st.count}")
+
+            lines += ["# HELP eyavap_llm_calls_total LLM calls by outcome", "# TYPE eyavap_llm_calls_total counter"]
+            for (site, provider), st in items:
+                for outcome, n in st.outcomes.items():
+                    lines.append(f'eyavap_llm_calls_total{{site="{site}",provider="{provider}",outcome="{outcome}"}} {n}')
+
+            lines += ["# HELP eyavap_llm_tokens_total LLM tokens by kind", "# TYPE eyavap_llm_tokens_total counter"]
+            for (site, provider), st in items:
+                for kind, n in (("prompt", st.prompt_tokens), ("completion", st.completion_tokens)):
+                    lines.append(f'eyavap_llm_tokens_total{{site="{site}",provider="{provider}",kind="{kind}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self, path: str | None = None, to_table: bool | None = None) -> int:
+        """
+        Prometheus dosyasını yeniden yazar ve/veya son pencereyi tabloya ekler.
+        Yazılan tablo satırı sayısını döndürür.
+        """
+        path = path if path is not None else os.getenv("EYAVAP_LLM_METRICS_FILE", "")
+        if to_table is None:
+            to_table = os.getenv("EYAVAP_LLM_METRICS_TABLE", "").lower() in ("1", "true", "yes")
+
+        if path:
+            try:
+                tmp = f"{path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(self.render_prometheus())
+                os.replace(tmp, path)  # textfile collector yarım dosya görmesin
+            except Exception as e:
+                print(f"⚠️ LLM metrics dosyası yazılamadı: {e}")
+
+        if not to_table:
+            return 0
+        window = self._take_window()
+        if not window:
+            return 0
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            {"site": site, "provider": provider, "window_end": now, **st.to_dict()}
+            for (site, provider), st in window.items()
+        ]
+        try:
+            from database import get_database
+
+            get_database().client.table("llm_call_metrics").insert(rows).execute()
+            return len(rows)
+        except Exception as e:
+            # Pencere kaybolmaz; bir sonraki flush'ta tekrar denenir
+            self._restore_window(window)
+            print(f"⚠️ llm_call_metrics yazılamadı: {e}")
+            return 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._window.clear()
+            self.started_at = time.time()
+
+
+_METRICS = LLMMetrics()
+_FLUSHER: threading.Thread | None = None
+_FLUSHER_LOCK = threading.Lock()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    return _METRICS
+
+
+def record_call(site: str, provider: str, latency: float, prompt_tokens=None, completion_tokens=None, outcome="ok") -> None:
+    _METRICS.record(site, provider, latency, prompt_tokens, completion_tokens, outcome)
+    _ensure_flusher()
+
+
+def _flush_enabled() -> bool:
+    return bool(os.getenv("EYAVAP_LLM_METRICS_FILE")) or os.getenv("EYAVAP_LLM_METRICS_TABLE", "").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+
+def _run_flusher(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        _METRICS.flush()
+
+
+def _ensure_flusher() -> None:
+    """İlk kayıtta (ve bir hedef ayarlıysa) periyodik flush + çıkışta flush kurulur."""
+    global _FLUSHER
+    if _FLUSHER is not None or not _flush_enabled():
+        return
+    with _FLUSHER_LOCK:
+        if _FLUSHER is not None:
+            return
+        try:
+            interval = float(os.getenv("EYAVAP_LLM_METRICS_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS))
+        except ValueError:
+            interval = DEFAULT_FLUSH_SECONDS
+        atexit.register(_METRICS.flush)
+        _FLUSHER = threading.Thread(target=_run_flusher, args=(max(1.0, interval),), name="eyavap-llm-metrics", daemon=True)
+        if interval > 0:
+            _FLUSHER.start()
@@ -0,0 +1,346 @@
+"""
+EYAVAP: LLM Provider katmanı
+Gerçek sağlayıcılar (OpenAI / Gemini / DeepInfra) ile deterministik, ağsız
+sahte sağlayıcı arasında seçim yapar. Amaç: üretim yollarının kendi
+overhead'ini (Supabase, prompt kurma, parse) para ödemeden ölçebilmek.
+
+Ayarlar (env):
+- EYAVAP_LLM_PROVIDER=fake      -> tüm hot path'ler sahte istemciyi kullanır
+- FAKE_LLM_LATENCY_MS=150       -> medyan gecikme (ms)
+- FAKE_LLM_LATENCY_SIGMA=0.4    -> lognormal sigma (0 = sabit gecikme)
+- FAKE_LLM_ERROR_RATE=0.0       -> 0..1 arası hata oranı
+- FAKE_LLM_SEED=42              -> gecikme/hata dizisi tohum değeri
+
+Yerel HTTP sunucusu (OpenAI chat-completions şekli):
+    python llm_provider.py serve --port 8089
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake
+    DEEPINFRA_CHAT_URL=http://127.0.0.1:8089/v1/chat/completions DEEPINFRA_API_TOKEN=fake
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_LATENCY_MS = 150.0
+DEFAULT_LATENCY_SIGMA = 0.4
+DEFAULT_SEED = 42
+
+_DANISH_SENTENCES = [
+    "Digitaliseringsstyrelsen har offentliggjort nye retningslinjer for MitID i kommunerne.",
+    "Borgere kan nu ansøge om boligstøtte direkte via borger.dk uden papirblanketter.",
+    "Skattestyrelsen forventer færre fejl i årsopgørelsen efter den nye automatiske indberetning.",
+    "NIS2-direktivet stiller skærpede krav til cybersikkerhed i kritisk infrastruktur.",
+    "Region Hovedstaden udvider sundhedsplatformen med digitale konsultationer.",
+    "GDPR kræver, at data kun behandles til klart definerede formål.",
+    "Arbejdsmarkedsstyrelsen peger på mangel på faglært arbejdskraft i byggeriet.",
+    "Den grønne omstilling betyder nye tilskudsordninger for varmepumper i 2025.",
+    "Kommunerne skal sikre, at sagsbehandlingstiden overholder servicelovens frister.",
+    "Et åbent spørgsmål er, hvordan lov om offentlighed i forvaltningen spiller sammen med AI-baserede afgørelser.",
+    "Erfaringer fra Estland viser, at genbrug af data mellem myndigheder sparer tid for borgerne.",
+    "Det er afgørende, at CPR-registret holdes opdateret ved flytning og navneændring.",
+]
+
+_REACT_ACTIONS = ["research", "analyze", "create", "review", "complete"]
+
+
+class FakeLLMError(RuntimeError):
+    """Sahte sağlayıcının simüle ettiği hata (429/5xx benzeri)."""
+
+
+def _prompt_text(messages: List[Dict[str, str]] | str) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(m.get("content", "")) for m in messages or [])
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+class FakeLLM:
+    """
+    Deterministik yerel LLM: aynı prompt -> aynı metin.
+    Gecikme ve hatalar tohumlu bir RNG dizisinden gelir (tekrar üretilebilir benchmark).
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = DEFAULT_LATENCY_MS,
+        latency_sigma: float = DEFAULT_LATENCY_SIGMA,
+        error_rate: float = 0.0,
+        seed: int = DEFAULT_SEED,
+    ):
+        self.latency_ms = max(0.0, latency_ms)
+        self.latency_sigma = max(0.0, latency_sigma)
+        self.error_rate = min(1.0, max(0.0, error_rate))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "latency_ms_total": 0.0, "chars_out": 0}
+
+    # ---------- public ----------
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]] | str,
+        max_tokens: int = 600,
+        json_mode: bool = False,
+    ) -> str:
+        """Gecikmeyi uygular, gerekirse hata fırlatır, deterministik yanıt döner."""
+        delay_ms, fail = self._draw()
+        if delay_ms:
+            time.sleep(delay_ms / 1000.0)
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["latency_ms_total"] += delay_ms
+            if fail:
+                self.stats["errors"] += 1
+        if fail:
+            raise FakeLLMError("Fake LLM: simulated provider error (503)")
+
+        prompt = _prompt_text(messages)
+        text = self.render(prompt, max_tokens=max_tokens, json_mode=json_mode)
+        with self._lock:
+            self.stats["chars_out"] += len(text)
+        return text
+
+    def render(self, prompt: str, max_tokens: int = 600, json_mode: bool = False) -> str:
+        """Gecikmesiz, saf yanıt üretimi (prompt şekline göre metin / JSON / JA-NEJ)."""
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+
+        if json_mode or "JSON" in prompt:
+            return json.dumps(self._render_json(prompt, rng), ensure_ascii=False)
+        if "JA/NEJ" in prompt or "(JA/NEJ)" in prompt:
+            return rng.choice(["JA", "NEJ"])
+
+        # ~4 karakter / token; 3 paragraflık Danca metin
+        budget = max(40, int(max_tokens) * 4)
+        paragraphs = []
+        for _ in range(3):
+            paragraphs.append(" ".join(rng.sample(_DANISH_SENTENCES, 3)))
+        return "\n\n".join(paragraphs)[:budget]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["latency_ms_avg"] = round(stats["latency_ms_total"] / stats["calls"], 1) if stats["calls"] else 0.0
+        return stats
+
+    # ---------- internal ----------
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            if self.latency_ms <= 0:
+                delay = 0.0
+            elif self.latency_sigma <= 0:
+                delay = self.latency_ms
+            else:
+                delay = self._rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay, fail
+
+    @staticmethod
+    def _render_json(prompt: str, rng: random.Random) -> Dict[str, Any]:
+        if '"tasks"' in prompt:
+            return {
+                "tasks": [
+                    {"goal": rng.choice(_DANISH_SENTENCES), "priority": rng.randint(3, 9), "dependencies": []}
+                    for _ in range(3)
+                ]
+            }
+        if '"action"' in prompt:
+            return {"action": rng.choice(_REACT_ACTIONS), "details": rng.choice(_DANISH_SENTENCES)}
+        return {"score": round(rng.uniform(0.5, 0.95), 2), "reasoning": rng.choice(_DANISH_SENTENCES)}
+
+
+# ==================== SDK-UYUMLU İSTEMCİLER ====================
+
+class _FakeCompletions:
+    def __init__(self, llm: FakeLLM):
+        self._llm = llm
+
+    def create(self, model: str = "", messages: Optional[List[Dict[str, str]]] = None, **kwargs):
+        json_mode = (kwargs.get("response_format") or {}).get("type") == "json_object"
+        text = self._llm.complete(messages or [], max_tokens=kwargs.get("max_tokens") or 600, json_mode=json_mode)
+        if kwargs.get("stream"):
+            return _stream_chunks(text)
+        message = SimpleNamespace(role="assistant", content=text)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=SimpleNamespace(completion_tokens=max(1, len(text) // 4)),
+        )
+
+
+def _stream_chunks(text: str) -> Iterator[Any]:
+    for word in text.split(" "):
+        delta = SimpleNamespace(content=word + " ")
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+
+class FakeOpenAIClient:
+    """openai.OpenAI yerine geçer: client.chat.completions.create(...)"""
+
+    def __init__(self, llm: FakeLLM):
+        self.chat = SimpleNamespace(completions=_FakeCompletions(llm))
+
+
+class _FakeGeminiModels:
+    def __init__(self, llm: FakeLLM):
+        self._llm = llm
+
+    def generate_content(self, model: str = "", contents: Any = "", config: Optional[Dict[str, Any]] = None):
+        max_tokens = (config or {}).get("max_output_tokens") or 600
+        return SimpleNamespace(text=self._llm.complete(str(contents), max_tokens=max_tokens))
+
+
+class FakeGeminiClient:
+    """google.genai.Client yerine geçer: client.models.generate_content(...)"""
+
+    def __init__(self, llm: FakeLLM):
+        self.models = _FakeGeminiModels(llm)
+
+
+# ==================== SEÇİM ====================
+
+_FAKE: FakeLLM | None = None
+_FAKE_LOCK = threading.Lock()
+
+
+def fake_llm_enabled() -> bool:
+    return (os.getenv("EYAVAP_LLM_PROVIDER", "") or "").strip().lower() == "fake"
+
+
+def get_fake_llm() -> FakeLLM:
+    """Process genelinde paylaşılan sahte LLM (FAKE_LLM_* env ayarlarıyla)."""
+    global _FAKE
+    with _FAKE_LOCK:
+        if _FAKE is None:
+            _FAKE = FakeLLM(
+                latency_ms=_env_float("FAKE_LLM_LATENCY_MS", DEFAULT_LATENCY_MS),
+                latency_sigma=_env_float("FAKE_LLM_LATENCY_SIGMA", DEFAULT_LATENCY_SIGMA),
+                error_rate=_env_float("FAKE_LLM_ERROR_RATE", 0.0),
+                seed=int(_env_float("FAKE_LLM_SEED", DEFAULT_SEED)),
+            )
+        return _FAKE
+
+
+def reset_fake_llm() -> None:
+    global _FAKE
+    with _FAKE_LOCK:
+        _FAKE = None
+
+
+def get_openai_client(api_key: str | None = None):
+    """Fake modda FakeOpenAIClient, aksi halde openai.OpenAI."""
+    if fake_llm_enabled():
+        return FakeOpenAIClient(get_fake_llm())
+    from openai import OpenAI  # lazy import
+
+    return OpenAI(api_key=api_key)
+
+
+def get_gemini_client(api_key: str | None = None):
+    """Fake modda FakeGeminiClient, aksi halde google.genai.Client."""
+    if fake_llm_enabled():
+        return FakeGeminiClient(get_fake_llm())
+    from google import genai  # lazy import
+
+    return genai.Client(api_key=api_key)
+
+
+# ==================== YEREL HTTP SUNUCU ====================
+
+def serve(host: str = "127.0.0.1", port: int = 8089, llm: FakeLLM | None = None):
+    """OpenAI chat-completions şeklinde konuşan yerel sunucu (stream dahil)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    llm = llm or get_fake_llm()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, body: Dict[str, Any]):
+            raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                req = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send_json(400, {"error": {"message": "invalid json"}})
+                return
+
+            json_mode = (req.get("response_format") or {}).get("type") == "json_object"
+            try:
+                text = llm.complete(req.get("messages") or [], max_tokens=req.get("max_tokens") or 600, json_mode=json_mode)
+            except FakeLLMError as e:
+                self._send_json(503, {"error": {"message": str(e), "type": "server_error"}})
+                return
+
+            created = int(time.time())
+            model = req.get("model", "fake")
+            if req.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for word in text.split(" "):
+                    chunk = {
+                        "id": "fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+                return
+
+            self._send_json(200, {
+                "id": "fake",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": max(1, len(text) // 4), "total_tokens": 0},
+            })
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"🧪 Fake LLM sunucusu: http://{host}:{port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="EYAVAP fake LLM provider")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -69,9 +69,9 @@ if prompt := st.chat_input("Devlet yetkililerine bir soru sor..."):
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    # Düşünme efekti
+    # Düşünme efekti (sadece yönlendirme; yanıt aşağıda akarak gelir)
     with st.spinner("🏛️ İlgili bakanlık aranıyor..."):
-        response_data = ask_the_government(prompt)
+        response_data = ask_the_government(prompt, stream=True)
         
         # LOGO VE BAŞLIK TASARIMI (BÜYÜK LOGO BURADA)
         # HTML kullanarak logoyu ve ismi şık bir kutu içine alıyoruz
@@ -82,11 +82,15 @@ if prompt := st.chat_input("Devlet yetkililerine bir soru sor..."):
             <div style="color: gray; font-size: 14px; margin-top:5px;">Resmi Yanıt</div>
         </div>
         """
-        
-        full_response = header_html + response_data["answer"]
 
-    # Asistan cevabını ekle
+    # Asistan cevabını ekle: başlık hemen, metin token token
     with st.chat_message("assistant"):
-        st.markdown(full_response, unsafe_allow_html=True)
+        st.markdown(header_html, unsafe_allow_html=True)
+        if response_data.get("answer_stream") is not None:
+            answer = st.write_stream(response_data["answer_stream"])
+        else:
+            answer = response_data.get("answer", "")
+            st.markdown(answer)
     
-    st.session_state.messages.append({"role": "assistant", "content": full_response})
\ No newline at end of file
+    full_response = header_html + (answer if isinstance(answer, str) else response_data.get("answer", ""))
+    st.session_state.messages.append({"role": "assistant", "content": full_response})
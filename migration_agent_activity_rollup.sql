@@ -0,0 +1,163 @@
+-- Per-agent activity rollup (post/comment counts + last activity)
+-- Maintained by triggers so get_agent_statistics reads one row per agent
+-- Run this in Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS agent_activity_rollup (
+  agent_id UUID PRIMARY KEY REFERENCES agents(id) ON DELETE CASCADE,
+  post_count INTEGER DEFAULT 0,
+  comment_count INTEGER DEFAULT 0,
+  last_post_at TIMESTAMPTZ,
+  last_comment_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- ==================== TRIGGERS ====================
+-- SECURITY DEFINER: rollup tablosunda sadece SELECT policy var; trigger'lar
+-- posts/comments insert eden rolün RLS yetkisinden bağımsız olarak yazabilsin
+
+CREATE OR REPLACE FUNCTION rollup_post_activity()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    IF NEW.agent_id IS NULL THEN
+      RETURN NEW;
+    END IF;
+    INSERT INTO agent_activity_rollup (agent_id, post_count, last_post_at, updated_at)
+    VALUES (NEW.agent_id, 1, NEW.created_at, NOW())
+    ON CONFLICT (agent_id) DO UPDATE
+      SET post_count = agent_activity_rollup.post_count + 1,
+          last_post_at = GREATEST(agent_activity_rollup.last_post_at, EXCLUDED.last_post_at),
+          updated_at = NOW();
+    RETURN NEW;
+  ELSIF TG_OP = 'DELETE' THEN
+    IF OLD.agent_id IS NULL THEN
+      RETURN OLD;
+    END IF;
+    UPDATE agent_activity_rollup
+    SET post_count = GREATEST(0, post_count - 1),
+        last_post_at = (SELECT MAX(created_at) FROM posts WHERE agent_id = OLD.agent_id),
+        updated_at = NOW()
+    WHERE agent_id = OLD.agent_id;
+    RETURN OLD;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION rollup_comment_activity()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    IF NEW.agent_id IS NULL THEN
+      RETURN NEW;
+    END IF;
+    INSERT INTO agent_activity_rollup (agent_id, comment_count, last_comment_at, updated_at)
+    VALUES (NEW.agent_id, 1, NEW.created_at, NOW())
+    ON CONFLICT (agent_id) DO UPDATE
+      SET comment_count = agent_activity_rollup.comment_count + 1,
+          last_comment_at = GREATEST(agent_activity_rollup.last_comment_at, EXCLUDED.last_comment_at),
+          updated_at = NOW();
+    RETURN NEW;
+  ELSIF TG_OP = 'DELETE' THEN
+    IF OLD.agent_id IS NULL THEN
+      RETURN OLD;
+    END IF;
+    UPDATE agent_activity_rollup
+    SET comment_count = GREATEST(0, comment_count - 1),
+        last_comment_at = (SELECT MAX(created_at) FROM comments WHERE agent_id = OLD.agent_id),
+        updated_at = NOW()
+    WHERE agent_id = OLD.agent_id;
+    RETURN OLD;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS trigger_rollup_post_activity ON posts;
+CREATE TRIGGER trigger_rollup_post_activity
+AFTER INSERT OR DELETE ON posts
+FOR EACH ROW
+EXECUTE FUNCTION rollup_post_activity();
+
+DROP TRIGGER IF EXISTS trigger_rollup_comment_activity ON comments;
+CREATE TRIGGER trigger_rollup_comment_activity
+AFTER INSERT OR DELETE ON comments
+FOR EACH ROW
+EXECUTE FUNCTION rollup_comment_activity();
+
+-- ==================== REFRESH (backfill / drift repair) ====================
+
+CREATE OR REPLACE FUNCTION refresh_agent_activity_rollup()
+RETURNS INTEGER AS $$
+DECLARE
+  affected INTEGER;
+BEGIN
+  INSERT INTO agent_activity_rollup (agent_id, post_count, comment_count, last_post_at, last_comment_at, updated_at)
+  SELECT
+    a.id,
+    COALESCE(p.cnt, 0),
+    COALESCE(c.cnt, 0),
+    p.last_at,
+    c.last_at,
+    NOW()
+  FROM agents a
+  LEFT JOIN (
+    SELECT agent_id, COUNT(*) AS cnt, MAX(created_at) AS last_at FROM posts GROUP BY agent_id
+  ) p ON p.agent_id = a.id
+  LEFT JOIN (
+    SELECT agent_id, COUNT(*) AS cnt, MAX(created_at) AS last_at FROM comments GROUP BY agent_id
+  ) c ON c.agent_id = a.id
+  ON CONFLICT (agent_id) DO UPDATE
+    SET post_count = EXCLUDED.post_count,
+        comment_count = EXCLUDED.comment_count,
+        last_post_at = EXCLUDED.last_post_at,
+        last_comment_at = EXCLUDED.last_comment_at,
+        updated_at = NOW();
+
+  GET DIAGNOSTICS affected = ROW_COUNT;
+  RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- İlk doldurma
+SELECT refresh_agent_activity_rollup();
+
+-- ==================== VIEW ====================
+
+CREATE OR REPLACE VIEW agent_activity_statistics AS
+SELECT
+  a.id,
+  a.name,
+  a.specialization,
+  a.rank,
+  a.merit_score,
+  a.total_queries,
+  a.successful_queries,
+  CASE
+    WHEN a.total_queries > 0
+    THEN ROUND((a.successful_queries::numeric / a.total_queries::numeric) * 100, 2)
+    ELSE 0
+  END AS success_rate,
+  a.last_used,
+  a.ethnicity,
+  a.origin_country,
+  a.is_active,
+  COALESCE(r.post_count, 0) AS total_topics,
+  COALESCE(r.comment_count, 0) AS total_comments,
+  r.last_post_at,
+  r.last_comment_at
+FROM agents a
+LEFT JOIN agent_activity_rollup r ON r.agent_id = a.id;
+
+CREATE INDEX IF NOT EXISTS idx_posts_agent_id_created_at ON posts(agent_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_comments_agent_id_created_at ON comments(agent_id, created_at DESC);
+
+ALTER TABLE agent_activity_rollup ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for authenticated users" ON agent_activity_rollup
+  FOR SELECT USING (auth.role() = 'authenticated' OR auth.role() = 'anon');
+
+GRANT EXECUTE ON FUNCTION refresh_agent_activity_rollup() TO service_role;
+
+COMMENT ON TABLE agent_activity_rollup IS 'Trigger-maintained per-agent post/comment counts and last activity';
+COMMENT ON VIEW agent_activity_statistics IS 'Agents joined with activity rollup for the dashboard';
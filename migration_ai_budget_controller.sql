@@ -0,0 +1,35 @@
+-- AI budget controller: günlük token harcaması + hata oranı ai_budget_state'e yazılır
+-- Run this in Supabase SQL Editor after migration_orchestration_v2.sql
+
+ALTER TABLE ai_budget_state ADD COLUMN IF NOT EXISTS tokens_spent BIGINT DEFAULT 0;
+ALTER TABLE ai_budget_state ADD COLUMN IF NOT EXISTS llm_requests INTEGER DEFAULT 0;
+ALTER TABLE ai_budget_state ADD COLUMN IF NOT EXISTS llm_errors INTEGER DEFAULT 0;
+ALTER TABLE ai_budget_state ADD COLUMN IF NOT EXISTS error_rate FLOAT DEFAULT 0.0;
+ALTER TABLE ai_budget_state ADD COLUMN IF NOT EXISTS reason TEXT;
+
+-- Gün başına tek satır (controller upsert eder)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_ai_budget_state_day ON ai_budget_state(day);
+
+-- Süreçlerin kullanım deltalarını atomik ekler (read-modify-write yarışı yok)
+CREATE OR REPLACE FUNCTION add_ai_budget_usage(
+  day_param DATE,
+  tokens_param BIGINT,
+  requests_param INTEGER,
+  errors_param INTEGER
+)
+RETURNS SETOF ai_budget_state AS $$
+BEGIN
+  RETURN QUERY
+  INSERT INTO ai_budget_state (day, tokens_spent, llm_requests, llm_errors, updated_at)
+  VALUES (day_param, tokens_param, requests_param, errors_param, NOW())
+  ON CONFLICT (day) DO UPDATE
+    SET tokens_spent = ai_budget_state.tokens_spent + EXCLUDED.tokens_spent,
+        llm_requests = ai_budget_state.llm_requests + EXCLUDED.llm_requests,
+        llm_errors = ai_budget_state.llm_errors + EXCLUDED.llm_errors,
+        updated_at = NOW()
+  RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON COLUMN ai_budget_state.tokens_spent IS 'LLM tokens spent today (all processes)';
+COMMENT ON COLUMN ai_budget_state.error_rate IS 'Provider error rate over the last controller window';
@@ -0,0 +1,82 @@
+-- Set-based amnesty + bulk compliance strikes (one round trip each)
+-- Run this in Supabase SQL Editor after migration_governance.sql
+
+-- Günlük af: strike -1, askıyı kaldır (tek UPDATE)
+CREATE OR REPLACE FUNCTION daily_amnesty_bulk()
+RETURNS INTEGER AS $$
+DECLARE
+  affected INTEGER;
+BEGIN
+  UPDATE agents
+  SET compliance_strikes = GREATEST(0, COALESCE(compliance_strikes, 0) - 1),
+      is_suspended = FALSE,
+      last_reviewed_at = NOW()
+  WHERE is_active = TRUE
+    AND (COALESCE(compliance_strikes, 0) > 0 OR is_suspended = TRUE);
+
+  GET DIAGNOSTICS affected = ROW_COUNT;
+  RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Toplu strike: trust cezası (low=2, medium=5, high=10), 3+ strike = askı
+-- strikes: [{"agent_id": "...", "reason": "...", "severity": "low"}, ...]
+CREATE OR REPLACE FUNCTION apply_compliance_strikes(strikes JSONB)
+RETURNS TABLE (
+  agent_id UUID,
+  trust_score INTEGER,
+  compliance_strikes INTEGER,
+  is_suspended BOOLEAN,
+  trust_delta INTEGER
+) AS $$
+#variable_conflict use_column
+BEGIN
+  CREATE TEMP TABLE IF NOT EXISTS _strike_input (
+    agent_id UUID,
+    reason TEXT,
+    severity TEXT,
+    penalty INTEGER
+  ) ON COMMIT DROP;
+  TRUNCATE _strike_input;
+
+  INSERT INTO _strike_input (agent_id, reason, severity, penalty)
+  SELECT
+    (elem->>'agent_id')::UUID,
+    COALESCE(elem->>'reason', 'policy_violation'),
+    COALESCE(elem->>'severity', 'low'),
+    CASE COALESCE(elem->>'severity', 'low')
+      WHEN 'low' THEN 2
+      WHEN 'medium' THEN 5
+      ELSE 10
+    END
+  FROM jsonb_array_elements(strikes) AS elem
+  WHERE elem->>'agent_id' IS NOT NULL AND elem->>'agent_id' <> '';
+
+  INSERT INTO compliance_events (agent_id, event_type, severity, details, created_at)
+  SELECT s.agent_id, 'strike', s.severity,
+         jsonb_build_object('reason', s.reason, 'trust_delta', -s.penalty), NOW()
+  FROM _strike_input s
+  JOIN agents a ON a.id = s.agent_id;
+
+  RETURN QUERY
+  WITH agg AS (
+    SELECT s.agent_id AS aid, COUNT(*)::INTEGER AS n, SUM(s.penalty)::INTEGER AS total_penalty
+    FROM _strike_input s
+    GROUP BY s.agent_id
+  )
+  UPDATE agents a
+  SET trust_score = GREATEST(0, COALESCE(a.trust_score, 50) - agg.total_penalty),
+      compliance_strikes = COALESCE(a.compliance_strikes, 0) + agg.n,
+      is_suspended = (COALESCE(a.compliance_strikes, 0) + agg.n >= 3) OR COALESCE(a.is_suspended, FALSE),
+      last_reviewed_at = NOW()
+  FROM agg
+  WHERE a.id = agg.aid
+  RETURNING a.id, a.trust_score, a.compliance_strikes, a.is_suspended, -agg.total_penalty;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION daily_amnesty_bulk() TO service_role;
+GRANT EXECUTE ON FUNCTION apply_compliance_strikes(JSONB) TO service_role;
+
+COMMENT ON FUNCTION daily_amnesty_bulk IS 'Set-based daily amnesty: decrement strikes and lift suspensions in one statement';
+COMMENT ON FUNCTION apply_compliance_strikes IS 'Bulk compliance strikes with trust penalties, suspensions and event logging';
@@ -0,0 +1,27 @@
+-- LLM çağrı metrikleri: llm_metrics.py flush penceresi başına (site, provider) aggregate
+-- Run this in Supabase SQL Editor; enable with EYAVAP_LLM_METRICS_TABLE=1
+
+CREATE TABLE IF NOT EXISTS llm_call_metrics (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  window_end TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  site TEXT NOT NULL,
+  provider TEXT NOT NULL,
+  calls INTEGER DEFAULT 0,
+  outcome_ok INTEGER DEFAULT 0,
+  outcome_error INTEGER DEFAULT 0,
+  outcome_rate_limited INTEGER DEFAULT 0,
+  outcome_timeout INTEGER DEFAULT 0,
+  error_rate FLOAT DEFAULT 0.0,
+  latency_avg_ms FLOAT DEFAULT 0.0,
+  latency_p50_ms FLOAT DEFAULT 0.0,
+  latency_p95_ms FLOAT DEFAULT 0.0,
+  latency_max_ms FLOAT DEFAULT 0.0,
+  prompt_tokens BIGINT DEFAULT 0,
+  completion_tokens BIGINT DEFAULT 0,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_call_metrics_window ON llm_call_metrics(window_end DESC);
+CREATE INDEX IF NOT EXISTS idx_llm_call_metrics_site ON llm_call_metrics(site, window_end DESC);
+
+COMMENT ON TABLE llm_call_metrics IS 'Per-call-site LLM latency/token/error aggregates';
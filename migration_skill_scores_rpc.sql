@@ -0,0 +1,59 @@
+-- Atomic skill score updates (single round trip, clamped 0-100 server-side)
+-- Run this in Supabase SQL Editor after migration_learning_system.sql
+
+-- Tek ajan/uzmanlık için atomik artış (interaktif yollar)
+CREATE OR REPLACE FUNCTION increment_skill_score(
+  agent_id_param UUID,
+  specialization_param TEXT,
+  delta_param NUMERIC
+)
+RETURNS NUMERIC AS $$
+DECLARE
+  new_score NUMERIC;
+BEGIN
+  INSERT INTO agent_skill_scores (agent_id, specialization, score, last_updated)
+  VALUES (agent_id_param, specialization_param, LEAST(100, GREATEST(0, 50 + delta_param)), NOW())
+  ON CONFLICT (agent_id, specialization) DO UPDATE
+    SET score = LEAST(100, GREATEST(0, agent_skill_scores.score + delta_param)),
+        last_updated = NOW()
+  RETURNING score INTO new_score;
+
+  RETURN new_score;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Toplu delta uygulama (döngü sonunda tek çağrı)
+-- deltas: [{"agent_id": "...", "specialization": "...", "delta": 2.5}, ...]
+CREATE OR REPLACE FUNCTION apply_skill_deltas(deltas JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  affected INTEGER;
+BEGIN
+  WITH d AS (
+    SELECT
+      (elem->>'agent_id')::UUID AS agent_id,
+      elem->>'specialization' AS specialization,
+      SUM((elem->>'delta')::NUMERIC) AS delta
+    FROM jsonb_array_elements(deltas) AS elem
+    GROUP BY 1, 2
+  )
+  INSERT INTO agent_skill_scores (agent_id, specialization, score, last_updated)
+  SELECT agent_id, specialization, LEAST(100, GREATEST(0, 50 + delta)), NOW()
+  FROM d
+  ON CONFLICT (agent_id, specialization) DO UPDATE
+    SET score = LEAST(100, GREATEST(0, agent_skill_scores.score + (
+          SELECT d.delta FROM d
+          WHERE d.agent_id = EXCLUDED.agent_id AND d.specialization = EXCLUDED.specialization
+        ))),
+        last_updated = NOW();
+
+  GET DIAGNOSTICS affected = ROW_COUNT;
+  RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION increment_skill_score(UUID, TEXT, NUMERIC) TO service_role;
+GRANT EXECUTE ON FUNCTION apply_skill_deltas(JSONB) TO service_role;
+
+COMMENT ON FUNCTION increment_skill_score IS 'Atomic upsert of a single skill score delta (clamped 0-100)';
+COMMENT ON FUNCTION apply_skill_deltas IS 'Batch upsert of accumulated skill score deltas (clamped 0-100)';
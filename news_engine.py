@@ -1,14 +1,43 @@
 """
 RSS News Engine for EYAVAP
 Fetches real Danish news from Google News RSS
+
+Feed'ler NewsStore üzerinden okunur:
+- Bellek içi cache: bir döngüde her feed en fazla bir kez indirilir
+- Adaptif takvim: her feed'in yayın hızı published_ts geçmişinden öğrenilir; sık yayın yapan
+  feed (DR Politik) sık, sessiz feed seyrek yoklanır. Geçmişi olmayan feed EYAVAP_NEWS_TTL=600 sn,
+  sınırlar EYAVAP_NEWS_MIN_POLL=120 / EYAVAP_NEWS_MAX_POLL=21600 sn (EYAVAP_NEWS_ADAPTIVE=0 -> sabit TTL)
+- Disk kalıcılığı (EYAVAP_NEWS_STORE_FILE, varsayılan /tmp/eyavap_news_store.json; boş = kapalı)
+- Koşullu istek (ETag / Last-Modified): değişmeyen feed 304 döner, yeniden parse edilmez
+- news_hash (title + link) ile feed'ler arası dedupe
+- Paralel indirme: feed başına EYAVAP_NEWS_FEED_TIMEOUT=10 sn, toplam EYAVAP_NEWS_DEADLINE=20 sn,
+  EYAVAP_NEWS_WORKERS=8; hata veren feed'ler atlanır, diğerleri döner (get_feed_stats)
 """
 
-import feedparser
+import hashlib
+import json
+import os
 import random
+import re
+import tempfile
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
+from language_detect import looks_danish as _looks_danish
+
+try:
+    import feedparser
+except Exception:
+    feedparser = None
+
+try:
+    import httpx
+except Exception:
+    httpx = None
+
 # Denmark News Sources (Real Danish media RSS feeds)
 DENMARK_RSS_FEEDS = [
     {
@@ -34,65 +63,478 @@ DENMARK_RSS_FEEDS = [
 ]
 
 
-def _looks_danish(text: str) -> bool:
-    t = (text or "").lower()
-    if any(ch in t for ch in ["æ", "ø", "å"]):
-        return True
-    markers = [
-        " og ", " det ", " der ", " ikke ", " som ", " for ", " til ", " med ",
-        " en ", " et ", " også ", " men ", " på ", " af ", " i "
-    ]
-    return sum(1 for m in markers if m in t) >= 2
+def news_hash(item: Dict[str, Any]) -> str:
+    """Haber kimliği (title + link); posts.metadata.news_hash ile aynı."""
+    return hashlib.sha256(
+        f"{item.get('title','')}-{item.get('link','')}".encode("utf-8")
+    ).hexdigest()
+
+
+def _entry_to_item(entry: Dict[str, Any], feed_config: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    published_ts = _entry_ts(entry)
+    title = entry.get("title", "")
+    summary = entry.get("summary", "")
+    if not _looks_danish(f"{title} {summary}"):
+        return None
+    return {
+        "title": title,
+        "link": entry.get("link", ""),
+        "published": entry.get("published", ""),
+        "published_ts": published_ts,
+        "summary": summary,
+        "source": feed_config["name"],
+        "language": feed_config["language"]
+    }
+
+
+# ==================== NEWS STORE ====================
+
+DEFAULT_NEWS_TTL_SECONDS = 600
+# Hatalı feed bu kadar saniye sonra yeniden denenir (TTL'in tamamı beklenmez)
+ERROR_RETRY_SECONDS = 60
+# Feed başına saklanan en fazla entry (get_top_news max_items=50 ister)
+MAX_ENTRIES_PER_FEED = 50
+STORE_VERSION = 1
+DEFAULT_FEED_TIMEOUT_SECONDS = 10.0
+# Adaptif yoklama: ortalama yayın aralığının bu oranında bir yoklanır,
+# yeni haber gelmeyen her yoklamada aralık BACKOFF ile büyür
+DEFAULT_MIN_POLL_SECONDS = 120
+DEFAULT_MAX_POLL_SECONDS = 6 * 3600
+POLL_GAP_FACTOR = 0.5
+POLL_BACKOFF = 1.5
+MAX_BACKOFF_STEPS = 6
+RATE_WINDOW = 20
+HISTORY_SIZE = 100
+HISTORY_MAX_AGE_SECONDS = 7 * 86400
+DEFAULT_FETCH_DEADLINE_SECONDS = 20.0
+USER_AGENT = "EYAVAP-NewsEngine/1.0"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
 
+def _env_workers() -> int:
+    try:
+        return max(1, int(os.getenv("EYAVAP_NEWS_WORKERS", "") or 8))
+    except ValueError:
+        return 8
 
-def fetch_danish_news(max_items: int = 20) -> List[Dict]:
+
+def poll_interval(
+    published_ts: List[int],
+    empty_polls: int,
+    default_seconds: float,
+    min_seconds: float = DEFAULT_MIN_POLL_SECONDS,
+    max_seconds: float = DEFAULT_MAX_POLL_SECONDS,
+) -> float:
     """
-    Fetch latest Danish news from RSS feeds
-    
-    Returns:
-        List of news items with title, link, published, summary
+    Sonraki yoklamaya kadar saniye. Son RATE_WINDOW yayının ortalama aralığının
+    POLL_GAP_FACTOR katı; ardışık boş yoklamalarda POLL_BACKOFF ile geri çekilir.
     """
-    all_news = []
-    
-    for feed_config in DENMARK_RSS_FEEDS:
+    ts = sorted(t for t in published_ts if t > 0)[-RATE_WINDOW:]
+    if len(ts) >= 2 and ts[-1] > ts[0]:
+        base = (ts[-1] - ts[0]) / (len(ts) - 1) * POLL_GAP_FACTOR
+    else:
+        base = default_seconds
+    interval = base * POLL_BACKOFF ** min(max(0, empty_polls), MAX_BACKOFF_STEPS)
+    return max(min_seconds, min(max_seconds, interval))
+
+
+def _publish_rate_per_hour(published_ts: List[int]) -> float:
+    ts = sorted(t for t in published_ts if t > 0)[-RATE_WINDOW:]
+    if len(ts) < 2 or ts[-1] <= ts[0]:
+        return 0.0
+    return round((len(ts) - 1) * 3600 / (ts[-1] - ts[0]), 2)
+
+
+def _entry_ts(entry: Dict[str, Any]) -> int:
+    published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    return int(time.mktime(published_parsed)) if published_parsed else 0
+
+
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=_env_workers(), thread_name_prefix="eyavap-news")
+_HTTP_CLIENT = None
+_HTTP_LOCK = threading.Lock()
+
+
+def _get_http_client():
+    """Feed'ler için paylaşılan keep-alive httpx.Client."""
+    global _HTTP_CLIENT
+    with _HTTP_LOCK:
+        if _HTTP_CLIENT is None:
+            _HTTP_CLIENT = httpx.Client(headers={"User-Agent": USER_AGENT}, follow_redirects=True)
+        return _HTTP_CLIENT
+
+
+def _download_feed(
+    feed_config: Dict[str, str],
+    etag: Optional[str],
+    modified: Optional[str],
+    timeout: float,
+) -> Dict[str, Any]:
+    """
+    Tek feed'i koşullu istekle indirip parse eder (iş parçacığında çalışır).
+    Hatalar da sonuç olarak döner; store durumuna dokunmaz.
+    """
+    started = time.perf_counter()
+    result = {"status": None, "entries": [], "etag": etag, "modified": modified, "error": "", "timeout": False}
+    try:
+        if feedparser is None:
+            raise RuntimeError("feedparser yüklü değil")
+        if httpx is not None:
+            headers = {}
+            if etag:
+                headers["If-None-Match"] = etag
+            if modified:
+                headers["If-Modified-Since"] = modified
+            resp = _get_http_client().get(feed_config["url"], headers=headers, timeout=timeout)
+            result["status"] = resp.status_code
+            if resp.status_code != 304:
+                resp.raise_for_status()
+                result["entries"] = list(feedparser.parse(resp.content).entries)
+                result["etag"] = resp.headers.get("ETag")
+                result["modified"] = resp.headers.get("Last-Modified")
+        else:
+            # httpx yoksa feedparser kendisi indirir (soket timeout'u yok; toplam deadline yine korur)
+            feed = feedparser.parse(feed_config["url"], etag=etag, modified=modified)
+            result["status"] = feed.get("status")
+            if result["status"] != 304:
+                result["entries"] = list(feed.entries)
+                result["etag"] = feed.get("etag")
+                result["modified"] = feed.get("modified")
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+        result["timeout"] = httpx is not None and isinstance(e, httpx.TimeoutException)
+    result["latency"] = time.perf_counter() - started
+    return result
+
+
+def _store_path() -> str:
+    path = os.getenv("EYAVAP_NEWS_STORE_FILE")
+    if path is None:
+        return os.path.join(tempfile.gettempdir(), "eyavap_news_store.json")
+    return "" if path.strip().lower() in ("", "0", "off") else path
+
+
+class NewsStore:
+    """
+    Feed başına son parse edilmiş haberler + ETag/Last-Modified + yoklama takvimi.
+    Feed'in next_poll_at zamanı gelmedikçe feed'e gidilmez; geldiğinde koşullu istek atılır.
+    """
+
+    def __init__(self, feeds: List[Dict[str, str]], ttl_seconds: int | None = None, path: str | None = None):
+        self.feeds = feeds
         try:
-            print(f"🔄 Fetching: {feed_config['name']}...")
-            feed = feedparser.parse(feed_config["url"])
-            
-            print(f"  📊 Status: {feed.get('status', 'N/A')}, Entries: {len(feed.entries)}")
-            
-            if not feed.entries:
-                print(f"  ⚠️ No entries found in feed")
-                continue
-            
-            for entry in feed.entries[:max_items]:
-                published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
-                published_ts = int(time.mktime(published_parsed)) if published_parsed else 0
-                title = entry.get("title", "")
-                summary = entry.get("summary", "")
-                if not _looks_danish(f"{title} {summary}"):
-                    continue
-                news_item = {
-                    "title": title,
-                    "link": entry.get("link", ""),
-                    "published": entry.get("published", ""),
-                    "published_ts": published_ts,
-                    "summary": summary,
-                    "source": feed_config["name"],
-                    "language": feed_config["language"]
+            ttl = int(os.getenv("EYAVAP_NEWS_TTL", "") or DEFAULT_NEWS_TTL_SECONDS)
+        except ValueError:
+            ttl = DEFAULT_NEWS_TTL_SECONDS
+        self.ttl_seconds = max(1, ttl_seconds if ttl_seconds is not None else ttl)
+        self.path = _store_path() if path is None else path
+        self.adaptive = os.getenv("EYAVAP_NEWS_ADAPTIVE", "1").strip().lower() not in ("0", "false", "no")
+        self.min_poll = _env_float("EYAVAP_NEWS_MIN_POLL", DEFAULT_MIN_POLL_SECONDS)
+        self.max_poll = _env_float("EYAVAP_NEWS_MAX_POLL", DEFAULT_MAX_POLL_SECONDS)
+        # url -> {"etag", "modified", "fetched_at", "next_poll_at", "history", "empty_polls",
+        #         "items": [{"rank", "item"}]}
+        self._feeds: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        # Süren yenileme koruması (indirme _lock dışında yapılır)
+        self._refresh_lock = threading.Lock()
+        self._loaded = False
+        self.stats = {
+            "fetches": 0, "not_modified": 0, "cache_hits": 0, "errors": 0, "timeouts": 0,
+            "refresh_in_progress": 0,
+        }
+        # feed adı -> gecikme / entry / hata sayaçları
+        self.feed_stats: Dict[str, Dict[str, Any]] = {}
+
+    # ---------- public ----------
+
+    def items(self, max_per_feed: int = 20, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Feed sırasıyla haberler; her feed'in ilk max_per_feed entry'si (fetch_danish_news ile aynı).
+        Aynı haber birden fazla feed'de ise bir kez döner.
+        """
+        self.refresh(force=refresh)
+        seen = set()
+        out = []
+        with self._lock:
+            for feed_config in self.feeds:
+                for entry in self._feeds.get(feed_config["url"], {}).get("items", []):
+                    if entry["rank"] >= max_per_feed:
+                        break
+                    key = news_hash(entry["item"])
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    out.append(dict(entry["item"]))
+        return out
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Yoklama zamanı gelmiş feed'leri paralel yeniler. İndirilen (200 dönen) feed sayısını döndürür.
+        Her feed EYAVAP_NEWS_FEED_TIMEOUT ile, tümü EYAVAP_NEWS_DEADLINE ile sınırlı;
+        yetişmeyen / hata veren feed'lerin önceki haberleri korunur.
+        İndirme sırasında store kilitlenmez (okuyucular cache'ten beslenir); aynı anda
+        tek yenileme çalışır, diğer çağıranlar eldeki haberlerle devam eder.
+        """
+        with self._lock:
+            self._load()
+            if not force and not self._due(time.time()):
+                self.stats["cache_hits"] += 1
+                return 0
+            # Hiç haber yoksa (ilk çalıştırma) veya zorunluysa süren yenilemeyi bekle
+            blocking = force or not any(state.get("items") for state in self._feeds.values())
+
+        if not self._refresh_lock.acquire(blocking=blocking):
+            with self._lock:
+                self.stats["refresh_in_progress"] += 1
+            return 0
+        try:
+            with self._lock:
+                # Beklerken başka yenileme bitmiş olabilir
+                due = self.feeds if force else self._due(time.time())
+                if not due:
+                    self.stats["cache_hits"] += 1
+                    return 0
+                validators = {f["url"]: (self._feeds.get(f["url"], {}).get("etag"),
+                                         self._feeds.get(f["url"], {}).get("modified")) for f in due}
+
+            feed_timeout = _env_float("EYAVAP_NEWS_FEED_TIMEOUT", DEFAULT_FEED_TIMEOUT_SECONDS)
+            deadline = _env_float("EYAVAP_NEWS_DEADLINE", DEFAULT_FETCH_DEADLINE_SECONDS)
+            print(f"🔄 Fetching {len(due)} feeds (timeout {feed_timeout:.0f}s, deadline {deadline:.0f}s)...")
+            futures = {}
+            for feed_config in due:
+                etag, modified = validators[feed_config["url"]]
+                futures[_FETCH_EXECUTOR.submit(
+                    _download_feed, feed_config, etag, modified, feed_timeout
+                )] = feed_config
+            _, pending = wait_futures(futures, timeout=deadline)
+
+            fetched = 0
+            with self._lock:
+                # Sonuçlar feed sırasıyla uygulanır (loglar karışmasın)
+                for future, feed_config in futures.items():
+                    if future in pending:
+                        future.cancel()
+                        self._apply_error(feed_config, "timeouts", f"deadline {deadline:.0f}s aşıldı", None)
+                        continue
+                    result = future.result()
+                    if result["error"]:
+                        kind = "timeouts" if result["timeout"] else "errors"
+                        self._apply_error(feed_config, kind, result["error"], result["latency"])
+                        continue
+                    fetched += self._apply(feed_config, result)
+                self._save()
+            return fetched
+        finally:
+            self._refresh_lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            items = sum(len(s.get("items", [])) for s in self._feeds.values())
+            return {**self.stats, "feeds": len(self._feeds), "items": items}
+
+    def get_feed_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Feed başına gecikme / entry sayısı / hata sayaçları (feed adına göre)."""
+        with self._lock:
+            out = {}
+            for name, st in self.feed_stats.items():
+                calls = st["fetches"] + st["not_modified"] + st["errors"] + st["timeouts"]
+                out[name] = {
+                    **st,
+                    "latency_ms_avg": round(st["latency_ms_total"] / st["timed_calls"], 1) if st["timed_calls"] else 0.0,
+                    "error_rate": round((st["errors"] + st["timeouts"]) / calls, 3) if calls else 0.0,
                 }
-                all_news.append(news_item)
-                print(f"    ✅ {news_item['title'][:60]}...")
-        
+            return out
+
+    def get_schedule(self) -> Dict[str, Dict[str, Any]]:
+        """Feed başına yayın hızı (haber/saat), yoklama aralığı ve sonraki yoklamaya kalan süre."""
+        now = time.time()
+        with self._lock:
+            self._load()
+            out = {}
+            for feed_config in self.feeds:
+                state = self._feeds.get(feed_config["url"], {})
+                out[feed_config["name"]] = {
+                    "rate_per_hour": _publish_rate_per_hour(state.get("history", [])),
+                    "interval_seconds": round(state.get("interval", self.ttl_seconds)),
+                    "next_poll_in_seconds": max(0, round(self._next_poll_at(state) - now)),
+                    "empty_polls": state.get("empty_polls", 0),
+                }
+            return out
+
+    # ---------- takvim ----------
+
+    def _due(self, now: float) -> List[Dict[str, str]]:
+        return [f for f in self.feeds if now >= self._next_poll_at(self._feeds.get(f["url"], {}))]
+
+    def _next_poll_at(self, state: Dict[str, Any]) -> float:
+        if state.get("next_poll_at") is not None:
+            return state["next_poll_at"]
+        # Eski store dosyası / ilk çalıştırma
+        return state.get("fetched_at", 0) + self.ttl_seconds
+
+    def _schedule(self, state: Dict[str, Any], new_entries: int) -> None:
+        """Yoklama sonrası: boş yoklama sayacı + sonraki yoklama zamanı."""
+        state["empty_polls"] = 0 if new_entries else state.get("empty_polls", 0) + 1
+        if self.adaptive:
+            interval = poll_interval(
+                state.get("history", []), state["empty_polls"], self.ttl_seconds, self.min_poll, self.max_poll
+            )
+        else:
+            interval = self.ttl_seconds
+        state["interval"] = interval
+        state["next_poll_at"] = time.time() + interval
+
+    def _merge_history(self, state: Dict[str, Any], entries: List[Dict[str, Any]]) -> int:
+        """Entry yayın zamanlarını geçmişe ekler; öncekinden yeni entry sayısını döndürür."""
+        history = state.get("history", [])
+        newest = max(history) if history else 0
+        stamps = [ts for ts in (_entry_ts(e) for e in entries) if ts > 0]
+        cutoff = time.time() - HISTORY_MAX_AGE_SECONDS
+        state["history"] = sorted(t for t in set(history) | set(stamps) if t >= cutoff)[-HISTORY_SIZE:]
+        if not history:
+            # İlk yoklama: içerik geldiyse "yeni" say (geri çekilme başlamasın)
+            return len(stamps) or len(entries)
+        return sum(1 for ts in stamps if ts > newest)
+
+    # ---------- feed ----------
+
+    def _feed_stat(self, feed_config: Dict[str, str]) -> Dict[str, Any]:
+        return self.feed_stats.setdefault(feed_config["name"], {
+            "fetches": 0,
+            "not_modified": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "timed_calls": 0,
+            "latency_ms_total": 0.0,
+            "latency_ms_max": 0.0,
+            "last_latency_ms": 0.0,
+            "last_status": None,
+            "last_entries": 0,
+            "last_error": "",
+        })
+
+    def _record_latency(self, st: Dict[str, Any], latency: float | None) -> None:
+        if latency is None:
+            return
+        ms = round(latency * 1000, 1)
+        st["timed_calls"] += 1
+        st["latency_ms_total"] += ms
+        st["latency_ms_max"] = max(st["latency_ms_max"], ms)
+        st["last_latency_ms"] = ms
+
+    def _apply(self, feed_config: Dict[str, str], result: Dict[str, Any]) -> int:
+        state = self._feeds.setdefault(feed_config["url"], {"items": []})
+        st = self._feed_stat(feed_config)
+        self._record_latency(st, result["latency"])
+        st["last_status"] = result["status"]
+        state["fetched_at"] = time.time()
+
+        if result["status"] == 304:
+            self.stats["not_modified"] += 1
+            st["not_modified"] += 1
+            self._schedule(state, 0)
+            print(f"  ♻️ {feed_config['name']}: not modified (304), {len(state['items'])} cached entries")
+            return 0
+
+        entries = result["entries"]
+        st["last_entries"] = len(entries)
+        if not entries:
+            self._schedule(state, 0)
+            print(f"  ⚠️ {feed_config['name']}: status {result['status']}, no entries found in feed")
+            return 0
+
+        new_entries = self._merge_history(state, entries)
+        self._schedule(state, new_entries)
+
+        items = []
+        for rank, entry in enumerate(entries[:MAX_ENTRIES_PER_FEED]):
+            news_item = _entry_to_item(entry, feed_config)
+            if news_item:
+                items.append({"rank": rank, "item": news_item})
+        state["items"] = items
+        state["etag"] = result["etag"]
+        state["modified"] = result["modified"]
+        self.stats["fetches"] += 1
+        st["fetches"] += 1
+        print(
+            f"  ✅ {feed_config['name']}: {len(entries)} entries ({new_entries} new), {len(items)} items, "
+            f"{st['last_latency_ms']:.0f}ms, next poll {state['interval'] / 60:.0f} min"
+        )
+        return 1
+
+    def _apply_error(self, feed_config: Dict[str, str], kind: str, message: str, latency: float | None) -> None:
+        state = self._feeds.setdefault(feed_config["url"], {"items": []})
+        st = self._feed_stat(feed_config)
+        self._record_latency(st, latency)
+        self.stats[kind] += 1
+        st[kind] += 1
+        st["last_error"] = message[:200]
+        # Takvim bozulmaz; sadece kısa süre sonra yeniden denenir
+        state["next_poll_at"] = time.time() + ERROR_RETRY_SECONDS
+        print(f"⚠️ Error fetching {feed_config['name']} ({kind}): {message}")
+
+    # ---------- disk ----------
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == STORE_VERSION:
+                self._feeds = data.get("feeds") or {}
         except Exception as e:
-            print(f"⚠️ Error fetching {feed_config['name']}: {e}")
-            continue
+            print(f"⚠️ News store okunamadı: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": STORE_VERSION, "feeds": self._feeds}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"⚠️ News store yazılamadı: {e}")
+
+
+_STORE: Optional[NewsStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_news_store() -> NewsStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = NewsStore(DENMARK_RSS_FEEDS)
+        return _STORE
+
+
+def fetch_danish_news(max_items: int = 20, refresh: bool = False) -> List[Dict]:
+    """
+    Fetch latest Danish news from RSS feeds (NewsStore cache üzerinden)
+    
+    Args:
+        max_items: Feed başına en fazla entry
+        refresh: TTL'i beklemeden feed'leri yeniden kontrol et
+    
+    Returns:
+        List of news items with title, link, published, summary
+    """
+    all_news = get_news_store().items(max_per_feed=max_items, refresh=refresh)
     
     # Shuffle for variety
     random.shuffle(all_news)
     
-    print(f"\n📊 Total news items fetched: {len(all_news)}")
-    
     return all_news
 
 
@@ -135,6 +577,55 @@ def get_top_news(limit: int = 20) -> List[Dict]:
     return unique_items[:limit]
 
 
+# Öncelik sırası önemli: başlık birden fazla konuya uyarsa ilk konu kazanır
+TOPIC_KEYWORDS: Dict[str, tuple] = {
+    "skat_dk": ("skat", "moms", "afgift", "personfradrag"),
+    "sundhedsvæsen": ("sundhed", "hospital", "læge", "patient", "sygehus"),
+    "arbejdsmarked": ("arbejde", "job", "lønninger", "fagforening", "overenskomst"),
+    "boligret": ("bolig", "leje", "husleje", "depositum", "udlejer"),
+    "digital_sikkerhed": ("cyber", "hacker", "data", "sikkerhed", "privacy"),
+}
+DEFAULT_TOPIC = "generelt"
+
+# Konu başına tek derlenmiş alternation: başlık bir kez küçük harfe çevrilir,
+# konular öncelik sırasıyla tek `search` ile denenir (anahtar başına `in` taraması yok).
+_TOPIC_PATTERNS = {
+    topic: re.compile("|".join(re.escape(kw) for kw in sorted(kws, key=len, reverse=True)))
+    for topic, kws in TOPIC_KEYWORDS.items()
+}
+
+
+def _topic_of(title_lower: str) -> str:
+    for topic, pattern in _TOPIC_PATTERNS.items():
+        if pattern.search(title_lower):
+            return topic
+    return DEFAULT_TOPIC
+
+
+def topic_scores(news_title: str) -> Dict[str, float]:
+    """Konu başına eşleşen farklı anahtar kelime oranı (toplam 1.0); eşleşme yoksa {}."""
+    title_lower = (news_title or "").lower()
+    # İç içe anahtarlar da sayılır ("husleje" içindeki "leje"), eski substring kuralıyla aynı
+    counts = {
+        topic: n for topic, kws in TOPIC_KEYWORDS.items()
+        if (n := sum(1 for kw in kws if kw in title_lower))
+    }
+    total = sum(counts.values())
+    return {topic: round(n / total, 3) for topic, n in counts.items()} if total else {}
+
+
+def categorize_with_confidence(news_title: str) -> tuple:
+    """
+    (topic, confidence). Topic categorize_news ile aynı (öncelik sırası);
+    confidence = o konunun anahtar kelime payı, "generelt" için 0.0.
+    """
+    scores = topic_scores(news_title)
+    for topic in TOPIC_KEYWORDS:
+        if topic in scores:
+            return topic, scores[topic]
+    return DEFAULT_TOPIC, 0.0
+
+
 def categorize_news(news_title: str) -> str:
     """
     Categorize news into EYAVAP topics
@@ -145,26 +636,17 @@ def categorize_news(news_title: str) -> str:
     Returns:
         Topic category (skat_dk, sundhedsvæsen, etc.)
     """
-    title_lower = news_title.lower()
-    
-    # Keywords for each category
-    if any(keyword in title_lower for keyword in ["skat", "moms", "afgift", "personfradrag"]):
-        return "skat_dk"
-    
-    elif any(keyword in title_lower for keyword in ["sundhed", "hospital", "læge", "patient", "sygehus"]):
-        return "sundhedsvæsen"
-    
-    elif any(keyword in title_lower for keyword in ["arbejde", "job", "lønninger", "fagforening", "overenskomst"]):
-        return "arbejdsmarked"
-    
-    elif any(keyword in title_lower for keyword in ["bolig", "leje", "husleje", "depositum", "udlejer"]):
-        return "boligret"
-    
-    elif any(keyword in title_lower for keyword in ["cyber", "hacker", "data", "sikkerhed", "privacy"]):
-        return "digital_sikkerhed"
-    
-    else:
-        return "generelt"
+    return _topic_of((news_title or "").lower())
+
+
+def categorize_many(titles: List[str], with_confidence: bool = False) -> List[Any]:
+    """
+    Başlık listesini sınıflandırır (backfill / günlük haber listesi).
+    with_confidence=True ise (topic, confidence) çiftleri döner.
+    """
+    if with_confidence:
+        return [categorize_with_confidence(t) for t in titles]
+    return [_topic_of((t or "").lower()) for t in titles]
 
 
 def format_news_for_post(news: Dict, agent_specialization: str) -> str:
@@ -234,3 +716,8 @@ if __name__ == "__main__":
         print(f"  Source: {news['source']}")
     else:
         print("❌ No news found")
+
+    for name, stats in get_news_store().get_feed_stats().items():
+        print(f"  📡 {name}: {stats}")
+    for name, schedule in get_news_store().get_schedule().items():
+        print(f"  🗓️ {name}: {schedule}")
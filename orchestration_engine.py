@@ -12,26 +12,26 @@ import random
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List
 
+import numpy as np
+
+from agent_roster import AgentRoster
 from database import get_database
 
 
-def _chunk(items: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+def _chunk(items: List[Any], size: int) -> List[List[Any]]:
     return [items[i:i + size] for i in range(0, len(items), size)]
 
 
-def _build_cells(agents: List[Dict[str, Any]], cell_size: int = 15) -> List[Dict[str, Any]]:
+def _build_cells(roster: AgentRoster, mask: np.ndarray, cell_size: int = 15) -> List[Dict[str, Any]]:
     cells: List[Dict[str, Any]] = []
-    by_spec: Dict[str, List[Dict[str, Any]]] = {}
-    for a in agents:
-        spec = a.get("specialization") or "generelt"
-        by_spec.setdefault(spec, []).append(a)
-
-    for spec, group in by_spec.items():
-        for idx, chunk in enumerate(_chunk(group, cell_size), start=1):
+    for spec, idx in roster.group_by_specialization(mask).items():
+        spec = spec or "generelt"
+        member_ids = roster.ids[idx].tolist()
+        for n, chunk in enumerate(_chunk(member_ids, cell_size), start=1):
             cells.append({
-                "cell_name": f"{spec}_cell_{idx}",
+                "cell_name": f"{spec}_cell_{n}",
                 "specialization": spec,
-                "member_ids": [a["id"] for a in chunk],
+                "member_ids": chunk,
             })
     return cells
 
@@ -95,31 +95,23 @@ def run_orchestration(max_topics: int = 5, cell_size: int = 15) -> Dict[str, Any
     supabase = db.client
     since = (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat()
 
-    agents = (
-        supabase.table("agents")
-        .select("id,name,specialization,is_active,is_suspended")
-        .eq("is_active", True)
-        .execute()
-        .data
-        or []
-    )
-    agents = [a for a in agents if not a.get("is_suspended")]
-    if not agents:
+    roster = db.roster.columnar()
+    members = roster.active & ~roster.suspended
+    if not members.any():
         return {"cells": 0, "summaries": 0}
 
-    posts = (
-        supabase.table("posts")
-        .select("id,topic,content,consensus_score,metadata,created_at")
-        .gte("created_at", since)
-        .limit(300)
-        .execute()
-        .data
-        or []
+    posts = list(
+        db.iter_rows(
+            "posts",
+            "id,topic,content,consensus_score,metadata,created_at",
+            filters=lambda q: q.gte("created_at", since),
+            prefetch=True,
+        )
     )
     if not posts:
         return {"cells": 0, "summaries": 0}
 
-    cells = _build_cells(agents, cell_size=cell_size)
+    cells = _build_cells(roster, members, cell_size=cell_size)
     topics = _top_topics(posts, limit=max_topics)
 
     created = 0
@@ -0,0 +1,188 @@
+"""
+EYAVAP: Agent Roster Cache
+`agents` tablosunu döngü başına bir kez okuyan, paylaşılan read-through cache.
+
+- id ve specialization ile erişim
+- TTL (EYAVAP_ROSTER_TTL, varsayılan 60 sn)
+- merit/trust/suspension yazımlarında açık invalidation veya write-through patch
+- version sayacı: her yükleme / invalidation / patch'te artar
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_TTL_SECONDS = 60
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+class RosterCache:
+    """Aktif ajan kadrosu: tek select, bellek içi indeksler, satır kopyaları döner."""
+
+    def __init__(self, client, ttl_seconds: int | None = None, iter_rows=None):
+        self.client = client
+        # Database.iter_rows: kadro keyset sayfalamasıyla okunur (PostgREST max-rows kesmesin)
+        self._iter_rows = iter_rows
+        self.ttl_seconds = max(0, ttl_seconds if ttl_seconds is not None else _env_int("EYAVAP_ROSTER_TTL", DEFAULT_TTL_SECONDS))
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._active_ids: List[str] = []
+        self._by_spec: Dict[str, List[str]] = {}
+        self._loaded_at = 0.0
+        self._columnar = None
+        self._columnar_version = -1
+        self.version = 0
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "row_fetches": 0, "invalidations": 0, "patches": 0}
+
+    # ---------- okuma ----------
+
+    def active(self, limit: int | None = None) -> List[Dict[str, Any]]:
+        """Aktif ajanlar (is_active=True). Satırlar kopyadır; değiştirmek cache'i bozmaz."""
+        with self._lock:
+            self._ensure_loaded()
+            ids = self._active_ids if limit is None else self._active_ids[:limit]
+            return [dict(self._by_id[i]) for i in ids]
+
+    def get(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Tek ajan; kadroda yoksa (pasif / yeni) tek satır okur ve saklar."""
+        if not agent_id:
+            return None
+        with self._lock:
+            self._ensure_loaded()
+            row = self._by_id.get(agent_id)
+            if row is not None:
+                self.stats["hits"] += 1
+                return dict(row)
+            self.stats["misses"] += 1
+
+        try:
+            res = self.client.table("agents").select("*").eq("id", agent_id).limit(1).execute()
+        except Exception as e:
+            print(f"⚠️ Roster tek satır okuma hatası: {e}")
+            return None
+        rows = res.data or []
+        with self._lock:
+            self.stats["row_fetches"] += 1
+            if not rows:
+                return None
+            self._by_id[agent_id] = rows[0]
+            return dict(rows[0])
+
+    def get_many(self, agent_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Verilen id'lerin satır kopyaları (sırayla); kadroda olmayanlar get() ile okunur."""
+        ids = list(agent_ids)
+        with self._lock:
+            found = {i: dict(self._by_id[i]) for i in ids if i in self._by_id}
+        rows = []
+        for i in ids:
+            row = found.get(i) or self.get(i)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def by_specialization(self, specialization: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded()
+            return [dict(self._by_id[i]) for i in self._by_spec.get(specialization, [])]
+
+    def columnar(self):
+        """
+        Aktif kadronun sütun bazlı görünümü (agent_roster.AgentRoster).
+        version değişmedikçe aynı nesne döner; satır tutmaz, tam satırları get_many'den alır.
+        """
+        from agent_roster import AgentRoster
+
+        with self._lock:
+            self._ensure_loaded()
+            if self._columnar is None or self._columnar_version != self.version:
+                self._columnar = AgentRoster([self._by_id[i] for i in self._active_ids], row_source=self.get_many)
+                self._columnar_version = self.version
+            return self._columnar
+
+    def specializations(self) -> List[str]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._by_spec)
+
+    # ---------- yazma / invalidation ----------
+
+    def invalidate(self, agent_ids: str | Iterable[str] | None = None) -> None:
+        """agent_ids verilmezse tüm kadro bir sonraki erişimde yeniden okunur."""
+        with self._lock:
+            if agent_ids is None:
+                self._loaded_at = 0.0
+            else:
+                if isinstance(agent_ids, str):
+                    agent_ids = [agent_ids]
+                removed_active = False
+                for aid in agent_ids:
+                    if self._by_id.pop(aid, None) is not None and aid in self._active_ids:
+                        removed_active = True
+                if removed_active:
+                    # İndekslerde silinen id kalmasın (yeniden yükleme başarısız olsa da);
+                    # kadro bir sonraki erişimde tam yeniden okunur
+                    self._reindex()
+                    self._loaded_at = 0.0
+            self.version += 1
+            self.stats["invalidations"] += 1
+
+    def patch(self, agent_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Bilinen bir yazımı cache'e uygular (write-through). Satır yoksa bir şey yapmaz.
+        is_active / specialization değişirse indeksler yeniden kurulur.
+        """
+        if not agent_id or not fields:
+            return
+        with self._lock:
+            row = self._by_id.get(agent_id)
+            if row is None:
+                return
+            row.update(fields)
+            if "is_active" in fields or "specialization" in fields:
+                self._reindex()
+            self.version += 1
+            self.stats["patches"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["version"] = self.version
+            stats["active_agents"] = len(self._active_ids)
+            stats["age_seconds"] = round(time.time() - self._loaded_at, 1) if self._loaded_at else None
+        return stats
+
+    # ---------- internal ----------
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded_at and (time.time() - self._loaded_at) < self.ttl_seconds:
+            return
+        try:
+            if self._iter_rows is not None:
+                rows = list(self._iter_rows("agents", "*", filters=lambda q: q.eq("is_active", True)))
+            else:
+                rows = self.client.table("agents").select("*").eq("is_active", True).execute().data or []
+        except Exception as e:
+            # Eski kadro (varsa) ile devam; bir sonraki erişimde tekrar denenir
+            print(f"⚠️ Roster yükleme hatası: {e}")
+            return
+        self._by_id = {r["id"]: r for r in rows if r.get("id")}
+        self._reindex()
+        self._loaded_at = time.time()
+        self.version += 1
+        self.stats["loads"] += 1
+
+    def _reindex(self) -> None:
+        self._active_ids = [i for i, r in self._by_id.items() if r.get("is_active", True)]
+        by_spec: Dict[str, List[str]] = {}
+        for i in self._active_ids:
+            by_spec.setdefault(self._by_id[i].get("specialization") or "", []).append(i)
+        self._by_spec = by_spec
@@ -0,0 +1,200 @@
+"""
+EYAVAP: Typed Row Models
+Tablo başına __slots__ tabanlı satır modelleri ve sadece bildirilen sütunları
+isteyen sorgu yardımcıları (select("*") yerine projection).
+
+- COLUMNS: modelin okuduğu sütunlar; select() bunlardan kurulur
+- EMBEDS: PostgREST gömülü ilişkiler, ör. {"agents": ("!inner", AgentBadge)}
+- Modeller dict gibi okunabilir (m["name"], m.get("topic", ...)), böylece
+  dict bekleyen mevcut fonksiyonlara doğrudan verilebilir.
+
+Kullanım:
+    post = PostBody.fetch(db.client, post_id)
+    rows = PostRef.from_rows(PostRef.query(db.client).limit(500).execute().data)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T", bound="RowModel")
+
+_MISSING = object()
+
+
+class RowModel:
+    """Bildirilen sütunlarla sınırlı, salt okunur satır."""
+
+    __slots__ = ()
+    TABLE: str = ""
+    COLUMNS: Tuple[str, ...] = ()
+    EMBEDS: Dict[str, Tuple[str, Type["RowModel"]]] = {}
+
+    def __init__(self, **values: Any):
+        for name in self._fields():
+            setattr(self, name, values.get(name))
+
+    # ---------- sorgu ----------
+
+    @classmethod
+    def _fields(cls) -> Tuple[str, ...]:
+        return cls.COLUMNS + tuple(cls.EMBEDS)
+
+    @classmethod
+    def select_clause(cls) -> str:
+        """ "id,name,agents!inner(name,rank)" biçiminde select ifadesi."""
+        parts = list(cls.COLUMNS)
+        for name, (hint, model) in cls.EMBEDS.items():
+            parts.append(f"{name}{hint}({model.select_clause()})")
+        return ",".join(parts)
+
+    @classmethod
+    def query(cls, client):
+        """client.table(TABLE).select(<projection>) — filtreler çağıranda eklenir."""
+        return client.table(cls.TABLE).select(cls.select_clause())
+
+    @classmethod
+    def fetch(cls: Type[T], client, row_id: str) -> Optional[T]:
+        """id ile tek satır; yoksa None (single() hatası fırlatmaz)."""
+        if not row_id:
+            return None
+        res = cls.query(client).eq("id", row_id).limit(1).execute()
+        rows = res.data or []
+        return cls.from_row(rows[0]) if rows else None
+
+    # ---------- dönüşüm ----------
+
+    @classmethod
+    def from_row(cls: Type[T], row: Dict[str, Any] | None) -> Optional[T]:
+        if row is None:
+            return None
+        obj = cls.__new__(cls)
+        for name in cls.COLUMNS:
+            setattr(obj, name, row.get(name))
+        for name, (_, model) in cls.EMBEDS.items():
+            setattr(obj, name, model.from_row(row.get(name)))
+        return obj
+
+    @classmethod
+    def from_rows(cls: Type[T], rows: Iterable[Dict[str, Any]] | None) -> List[T]:
+        return [cls.from_row(r) for r in rows or ()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for name in self._fields():
+            value = getattr(self, name)
+            out[name] = value.to_dict() if isinstance(value, RowModel) else value
+        return out
+
+    # ---------- dict uyumluluğu ----------
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key, _MISSING) if key in self._fields() else _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields() else default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields()
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RowModel):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        pk = getattr(self, "id", None)
+        return f"{type(self).__name__}(id={pk!r})" if pk is not None else f"{type(self).__name__}()"
+
+
+# ==================== AGENTS ====================
+
+class AgentBadge(RowModel):
+    """Feed/yorum başlığında gösterilen ajan bilgisi."""
+
+    __slots__ = ("name", "rank", "specialization", "ethnicity", "merit_score")
+    TABLE = "agents"
+    COLUMNS = __slots__
+
+
+class AgentCard(RowModel):
+    """Liderlik tablosu / kurul kartı."""
+
+    __slots__ = ("id", "name", "rank", "specialization", "ethnicity", "merit_score", "is_active")
+    TABLE = "agents"
+    COLUMNS = __slots__
+
+
+# ==================== POSTS ====================
+
+class PostRef(RowModel):
+    """Örnekleme ve hedef seçimi için minimum post (içerik yok)."""
+
+    __slots__ = ("id", "agent_id", "topic", "created_at")
+    TABLE = "posts"
+    COLUMNS = __slots__
+
+
+class PostBody(PostRef):
+    """Yorum / oy / challenge üretimi için içerikli post."""
+
+    __slots__ = ("content", "consensus_score")
+    COLUMNS = PostRef.COLUMNS + __slots__
+
+
+class PostQuality(PostBody):
+    """Kalite kontrolü: içerik + metadata (news_link, quality_score)."""
+
+    __slots__ = ("metadata",)
+    COLUMNS = PostBody.COLUMNS + __slots__
+
+
+class PostCard(PostBody):
+    """Dashboard feed kartı: yazar bilgisi gömülü."""
+
+    __slots__ = ("sentiment", "engagement_score", "updated_at", "agents")
+    COLUMNS = PostBody.COLUMNS + ("sentiment", "engagement_score", "updated_at")
+    EMBEDS = {"agents": ("!inner", AgentBadge)}
+
+
+class ChallengeTarget(PostBody):
+    """Meydan okunan post + yazarının özeti."""
+
+    __slots__ = ("agents",)
+    EMBEDS = {"agents": ("!inner", AgentCard)}
+
+
+# ==================== COMMENTS ====================
+
+class CommentCard(RowModel):
+    """Dashboard'da post altında gösterilen yorum."""
+
+    __slots__ = ("id", "post_id", "content", "sentiment", "created_at", "agents")
+    TABLE = "comments"
+    COLUMNS = ("id", "post_id", "content", "sentiment", "created_at")
+    EMBEDS = {"agents": ("!inner", AgentBadge)}
+
+
+# ==================== CHALLENGES ====================
+
+class ChallengeRef(RowModel):
+    """Challenge çözümü/oylaması için gereken alanlar."""
+
+    __slots__ = ("id", "challenger_id", "target_agent_id", "target_post_id", "severity", "status")
+    TABLE = "challenges"
+    COLUMNS = __slots__
+
+
+class ChallengeVote(RowModel):
+    __slots__ = ("support_challenger", "voter_merit_weight")
+    TABLE = "challenge_votes"
+    COLUMNS = __slots__
@@ -0,0 +1,96 @@
+"""
+Benchmark: sync Database vs AsyncDatabase for a 100-post cycle.
+
+For each post the cycle does what simulate_social_activity / daily_quality_control
+do per item: read the post's comments and votes, read the author, and (with
+--writes) log a learning event. The sync run is serial; the async run gathers
+every post's I/O under AsyncDatabase's concurrency limit.
+
+Usage:
+    python scripts/bench_async_database.py --posts 100 --concurrency 16 [--writes]
+
+Needs SUPABASE_URL + SUPABASE_SERVICE_ROLE_KEY/SUPABASE_KEY. --writes inserts
+agent_learning_logs rows with event_type "benchmark".
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from database import get_database
+from async_database import AsyncDatabase
+
+
+def _load_posts(limit: int):
+    db = get_database()
+    res = (
+        db.client.table("posts")
+        .select("id,agent_id")
+        .order("created_at", desc=True)
+        .limit(limit)
+        .execute()
+    )
+    return res.data or []
+
+
+def run_sync(posts, writes: bool) -> float:
+    db = get_database()
+    start = time.perf_counter()
+    for p in posts:
+        db.client.table("comments").select("id").eq("post_id", p["id"]).execute()
+        db.client.table("agent_votes").select("id,vote_type").eq("target_post_id", p["id"]).execute()
+        db.client.table("agents").select("id,trust_score,specialization").eq("id", p["agent_id"]).limit(1).execute()
+        if writes:
+            db.log_learning_event(p["agent_id"], "benchmark", {"post_id": p["id"], "mode": "sync"})
+    return time.perf_counter() - start
+
+
+async def run_async(posts, writes: bool, concurrency: int) -> tuple[float, dict]:
+    adb = await AsyncDatabase.create(concurrency=concurrency)
+    try:
+        async def one(p):
+            reads = [
+                adb.execute(adb.client.table("comments").select("id").eq("post_id", p["id"])),
+                adb.execute(adb.client.table("agent_votes").select("id,vote_type").eq("target_post_id", p["id"])),
+                adb.execute(
+                    adb.client.table("agents").select("id,trust_score,specialization").eq("id", p["agent_id"]).limit(1)
+                ),
+            ]
+            if writes:
+                reads.append(adb.log_learning_event(p["agent_id"], "benchmark", {"post_id": p["id"], "mode": "async"}))
+            await asyncio.gather(*reads)
+
+        start = time.perf_counter()
+        await adb.gather(*(one(p) for p in posts))
+        return time.perf_counter() - start, dict(adb.stats)
+    finally:
+        await adb.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async Supabase I/O benchmark")
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--writes", action="store_true")
+    args = parser.parse_args()
+
+    posts = [p for p in _load_posts(args.posts) if p.get("agent_id")]
+    if not posts:
+        print("❌ Benchmark için post bulunamadı")
+        sys.exit(1)
+
+    sync_s = run_sync(posts, args.writes)
+    async_s, stats = asyncio.run(run_async(posts, args.writes, args.concurrency))
+
+    print(f"posts={len(posts)} writes={args.writes} concurrency={args.concurrency}")
+    print(f"sync : {sync_s:7.2f}s  ({sync_s / len(posts) * 1000:6.1f} ms/post)")
+    print(f"async: {async_s:7.2f}s  ({async_s / len(posts) * 1000:6.1f} ms/post)  stats={stats}")
+    if async_s:
+        print(f"speedup: {sync_s / async_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
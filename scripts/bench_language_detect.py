@@ -0,0 +1,106 @@
+"""
+Accuracy and speed of language_detect against the labelled samples.
+
+Usage:
+    python scripts/bench_language_detect.py --repeat 2000 [--samples scripts/language_samples.json]
+
+Accuracy is reported for the guard rules used on the hot path
+(looks_danish accepts Danish samples only, looks_turkish flags Turkish samples only)
+and for detect(). The legacy substring-scan rules are measured next to the
+compiled detector so heuristic changes can be checked for both quality and speed.
+Misclassified samples are printed so the marker sets can be tightened.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from language_detect import (  # noqa: E402
+    detect_many,
+    looks_danish,
+    looks_danish_many,
+    looks_turkish,
+    looks_turkish_many,
+    violates_danish_only,
+)
+
+DEFAULT_SAMPLES = os.path.join(os.path.dirname(__file__), "language_samples.json")
+
+
+# Eski social_stream / news_engine kuralları (karşılaştırma için)
+def _legacy_looks_turkish(text: str) -> bool:
+    t = (text or "").lower()
+    markers = [
+        " ve ", " bir ", " için ", " olarak ", " çünkü ", " ancak ", " ayrıca ",
+        " sistem ", " ajan ", " yorum ", " başkan ", " güven ", " bilgi ", " bugün ",
+        " merhaba ", " teşekkür"
+    ]
+    return any(m in t for m in markers)
+
+
+def _legacy_looks_danish(text: str) -> bool:
+    t = (text or "").lower()
+    if any(ch in t for ch in ["æ", "ø", "å"]):
+        return True
+    markers = [
+        " og ", " det ", " der ", " ikke ", " som ", " for ", " til ", " med ",
+        " en ", " et ", " også ", " men ", " på ", " af ", " i "
+    ]
+    return sum(1 for m in markers if m in t) >= 2
+
+
+def _accuracy(name, predicted, samples, expected_fn):
+    misses = [(s, p) for s, p in zip(samples, predicted) if p != expected_fn(s)]
+    acc = 1 - len(misses) / len(samples) if samples else 0.0
+    print(f"{name:28} {acc:7.1%}  ({len(samples) - len(misses)}/{len(samples)})")
+    for sample, got in misses:
+        print(f"    ✗ [{sample['lang']}] got={got!r}: {sample['text'][:70]}")
+
+
+def _bench(name, fn, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(texts)
+    elapsed = time.perf_counter() - started
+    per_text_us = elapsed / (repeat * len(texts)) * 1e6
+    print(f"{name:28} {per_text_us:8.2f} µs/text   {repeat * len(texts) / elapsed:10.0f} texts/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", default=DEFAULT_SAMPLES)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(args.samples, encoding="utf-8") as f:
+        samples = json.load(f)
+    texts = [s["text"] for s in samples]
+
+    print(f"Accuracy ({len(samples)} samples)")
+    is_da = lambda s: s["lang"] == "da"  # noqa: E731
+    is_tr = lambda s: s["lang"] == "tr"  # noqa: E731
+    _accuracy("legacy looks_danish", [_legacy_looks_danish(t) for t in texts], samples, is_da)
+    _accuracy("looks_danish", looks_danish_many(texts), samples, is_da)
+    _accuracy("legacy looks_turkish", [_legacy_looks_turkish(t) for t in texts], samples, is_tr)
+    _accuracy("looks_turkish", looks_turkish_many(texts), samples, is_tr)
+    _accuracy("violates_danish_only", [violates_danish_only(t) for t in texts], samples, lambda s: s["lang"] != "da")
+    _accuracy("detect", detect_many(texts), samples, lambda s: s["lang"])
+
+    print(f"\nSpeed ({args.repeat} x {len(texts)} texts, both guards per text)")
+    _bench("legacy turkish + danish", lambda ts: [(_legacy_looks_turkish(t), _legacy_looks_danish(t)) for t in ts], texts, args.repeat)
+
+    _bench("looks_turkish + looks_danish", lambda ts: [(looks_turkish(t), looks_danish(t)) for t in ts], texts, args.repeat)
+    _bench("violates_danish_only", lambda ts: [violates_danish_only(t) for t in ts], texts, args.repeat)
+    _bench("detect_many", detect_many, texts, args.repeat)
+    long_texts = [t * 20 for t in texts]
+    long_repeat = max(1, args.repeat // 20)
+    _bench("legacy (long posts)", lambda ts: [(_legacy_looks_turkish(t), _legacy_looks_danish(t)) for t in ts], long_texts, long_repeat)
+    _bench("violates_danish_only (long)", lambda ts: [violates_danish_only(t) for t in ts], long_texts, long_repeat)
+
+
+if __name__ == "__main__":
+    main()
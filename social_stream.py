@@ -4,16 +4,24 @@ Ajanların birbirleriyle etkileşimi, post/yorum yapması ve oylama
 """
 
 import random
-import time
-import hashlib
 import os
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime, timezone, timedelta
 import streamlit as st
-from database import get_database
+from database import get_database, get_pool_stats
+from row_models import PostBody, PostRef
+from budget_control import ai_allowed, describe as describe_budget, get_budget_state, scaled, update_budget_state
+from news_engine import news_hash as _news_hash
+from language_detect import looks_turkish as _looks_turkish, violates_danish_only
 
 MIN_TRUST_SCORE = 40
 
+# simulate_social_activity faz başına eşzamanlı işçi sayısı.
+# LLM hızını llm_gateway sınırlar; oylar sadece DB yazdığı için SUPABASE_POOL_SIZE altında tutulur.
+# EYAVAP_SIM_CONCURRENCY=1 -> sıralı, =N -> tüm fazlar N, ="posts=4,comments=8,votes=8" -> faz bazlı
+DEFAULT_PHASE_CONCURRENCY = {"posts": 4, "comments": 8, "votes": 8}
+
 
 def _is_agent_allowed(agent: Dict[str, Any]) -> bool:
     if not agent:
@@ -27,17 +35,20 @@ def _is_agent_allowed(agent: Dict[str, Any]) -> bool:
         return False
     return True
 
+from llm_provider import get_openai_client, get_gemini_client, fake_llm_enabled
+from llm_gateway import chat_completion, generate_content
+
 try:
     from openai import OpenAI
     HAS_OPENAI = True
 except:
-    HAS_OPENAI = False
+    HAS_OPENAI = fake_llm_enabled()
 
 try:
     from google import genai
     HAS_GEMINI = True
 except Exception:
-    HAS_GEMINI = False
+    HAS_GEMINI = fake_llm_enabled()
 
 
 def _get_secret(name: str) -> str:
@@ -50,12 +61,6 @@ def _get_secret(name: str) -> str:
     return (val or "").strip()
 
 
-def _news_hash(item: Dict[str, Any]) -> str:
-    return hashlib.sha256(
-        f"{item.get('title','')}-{item.get('link','')}".encode("utf-8")
-    ).hexdigest()
-
-
 def _source_reliability(news_item: Optional[Dict[str, Any]]) -> float:
     if not news_item:
         return 0.6
@@ -68,27 +73,6 @@ def _source_reliability(news_item: Optional[Dict[str, Any]]) -> float:
     return 0.6
 
 
-def _looks_turkish(text: str) -> bool:
-    t = (text or "").lower()
-    markers = [
-        " ve ", " bir ", " için ", " olarak ", " çünkü ", " ancak ", " ayrıca ",
-        " sistem ", " ajan ", " yorum ", " başkan ", " güven ", " bilgi ", " bugün ",
-        " merhaba ", " teşekkür"
-    ]
-    return any(m in t for m in markers)
-
-
-def _looks_danish(text: str) -> bool:
-    t = (text or "").lower()
-    if any(ch in t for ch in ["æ", "ø", "å"]):
-        return True
-    markers = [
-        " og ", " det ", " der ", " ikke ", " som ", " for ", " til ", " med ",
-        " en ", " et ", " også ", " men ", " på ", " af ", " i "
-    ]
-    return sum(1 for m in markers if m in t) >= 2
-
-
 def _validate_post_content(
     content: str,
     news_item: Optional[Dict[str, Any]],
@@ -113,32 +97,35 @@ def ensure_daily_top_news_debates(min_topics: int = 20) -> int:
     db = get_database()
 
     try:
-        from news_engine import get_top_news, categorize_news
+        from news_engine import get_top_news, categorize_many
         from evolution_engine import find_best_agent_for_topic
     except Exception:
         get_top_news = None
-        categorize_news = None
+        categorize_many = None
         find_best_agent_for_topic = None
 
     # Fetch today's posts and count top_daily
     today_start = datetime.now(timezone.utc).date().isoformat()
-    posts_today = (
-        db.client.table("posts")
-        .select("id, metadata, created_at")
-        .gte("created_at", today_start)
-        .limit(300)
-        .execute()
+    posts_today = db.iter_rows(
+        "posts",
+        "id,metadata,created_at",
+        filters=lambda q: q.gte("created_at", today_start),
     )
 
     existing_hashes = set()
     existing_count = 0
-    for p in (posts_today.data or []):
+    for p in posts_today:
         meta = p.get("metadata") or {}
         if meta.get("news_type") == "top_daily":
             existing_count += 1
         if meta.get("news_hash"):
             existing_hashes.add(meta.get("news_hash"))
 
+    # Bütçe düşükse günlük hedef küçülür, içerik şablonla üretilir
+    budget = get_budget_state()
+    min_topics = scaled(min_topics, budget, "posts")
+    use_ai = ai_allowed(budget)
+
     if existing_count >= min_topics:
         return 0
 
@@ -150,21 +137,22 @@ def ensure_daily_top_news_debates(min_topics: int = 20) -> int:
     if not news_items:
         return 0
 
-    agents = db.client.table("agents").select("*").eq("is_active", True).limit(200).execute()
-    agent_list = [a for a in (agents.data or []) if _is_agent_allowed(a)]
+    roster = db.roster.columnar()
+    agent_list = roster.rows(roster.indices(roster.eligible_mask(MIN_TRUST_SCORE)))
     if not agent_list:
         return 0
 
+    titles = [item.get("title", "") for item in news_items]
+    topics = categorize_many(titles) if categorize_many else ["generelt"] * len(news_items)
+
     created = 0
-    for item in news_items:
+    for item, topic in zip(news_items, topics):
         if created >= needed:
             break
         item_hash = _news_hash(item)
         if item_hash in existing_hashes:
             continue
 
-        topic = categorize_news(item["title"]) if categorize_news else "generelt"
-
         # Prefer best matching agent if available
         if find_best_agent_for_topic:
             best = find_best_agent_for_topic(topic, item.get("title", ""), agent_list)
@@ -175,7 +163,7 @@ def ensure_daily_top_news_debates(min_topics: int = 20) -> int:
         post = create_agent_post(
             agent_id=agent["id"],
             topic=topic,
-            use_ai=True,
+            use_ai=use_ai,
             use_news=True,
             news_item=item,
             news_type="top_daily"
@@ -183,7 +171,6 @@ def ensure_daily_top_news_debates(min_topics: int = 20) -> int:
         if post:
             created += 1
             existing_hashes.add(item_hash)
-            time.sleep(0.2)
 
     return created
 
@@ -208,18 +195,16 @@ def ensure_free_zone_posts(min_count: int = 2) -> int:
             return 0
         needed = min_count - existing
 
-        agents = db.client.table("agents").select("*").eq("is_active", True).limit(200).execute()
-        agent_list = [a for a in (agents.data or []) if _is_agent_allowed(a)]
-        if not agent_list:
+        roster = db.roster.columnar()
+        eligible = roster.eligible_mask(MIN_TRUST_SCORE)
+        if not eligible.any():
             return 0
 
         created = 0
-        for _ in range(needed):
-            agent = random.choice(agent_list)
-            post = create_agent_post(agent_id=agent["id"], topic="free_zone", use_ai=True, use_news=False)
+        for author_id in roster.sample_ids(needed, eligible):
+            post = create_agent_post(agent_id=author_id, topic="free_zone", use_ai=True, use_news=False)
             if post:
                 created += 1
-            time.sleep(0.2)
         return created
     except Exception as e:
         print(f"⚠️ Free Zone ensure failed: {e}")
@@ -251,151 +236,176 @@ def create_agent_post(
     db = get_database()
     
     try:
-        # Ajanı al
-        agent = db.client.table("agents").select("*").eq("id", agent_id).single().execute()
-        
-        if not agent.data:
-            return None
-        
-        agent_data = agent.data
-        if not _is_agent_allowed(agent_data):
-            return None
-        if not _is_agent_allowed(agent_data):
+        prepared = _prepare_agent_post(agent_id, topic, use_ai, use_news, news_item, news_type)
+        if prepared is None:
             return None
+        result = db.client.table("posts").insert(prepared[0]).execute()
+        if result.data:
+            return _finalize_agent_post(result.data[0], prepared[1])
+        return None
         
-        if topic == "free_zone":
-            use_news = False
-            news_item = None
+    except Exception as e:
+        print(f"❌ Post oluşturma hatası: {e}")
+        return None
 
-        # Haber çek (eğer use_news=True ve news_item verilmemişse)
-        if use_news and news_item is None:
-            try:
-                from news_engine import get_random_news, categorize_news
-                news_item = get_random_news()
-                # Haber kategorisine göre topic güncelle
-                if news_item:
-                    topic = categorize_news(news_item['title'])
-            except Exception as e:
-                print(f"⚠️ News fetch failed: {e}")
-                news_item = None
-        elif news_item:
-            try:
-                from news_engine import categorize_news
+
+def _prepare_agent_post(
+    agent_id: str,
+    topic: str,
+    use_ai: bool = True,
+    use_news: bool = True,
+    news_item: Optional[Dict[str, Any]] = None,
+    news_type: str = ""
+) -> Optional[tuple]:
+    """
+    Post satırını üretir ama yazmaz: (posts satırı, finalize bağlamı) veya None.
+    create_agent_post ve toplu yol (simulate_social_activity) ortak kullanır.
+    """
+    db = get_database()
+
+    # Ajanı al (paylaşılan kadro cache'i)
+    agent_data = db.roster.get(agent_id)
+    if not agent_data:
+        return None
+    if not _is_agent_allowed(agent_data):
+        return None
+
+    if topic == "free_zone":
+        use_news = False
+        news_item = None
+
+    # Haber çek (eğer use_news=True ve news_item verilmemişse)
+    if use_news and news_item is None:
+        try:
+            from news_engine import get_random_news, categorize_news
+            news_item = get_random_news()
+            # Haber kategorisine göre topic güncelle
+            if news_item:
                 topic = categorize_news(news_item['title'])
-            except Exception:
-                pass
-        
-        # Post içeriği üret
-        if use_ai and (HAS_OPENAI or HAS_GEMINI):
-            content = _generate_post_content_ai(agent_data, topic, news_item)
-        else:
-            content = _generate_post_content_template(agent_data, topic, news_item)
-        
-        # Turkish content is forbidden; Danish only
-        if _looks_turkish(content) or not _looks_danish(content):
-            try:
-                db.apply_compliance_strike(
-                    agent_id=agent_id,
-                    reason="non_danish_content_forbidden",
-                    severity="high",
-                )
-                db.create_revision_task(
-                    agent_id=agent_id,
-                    post_id="",
-                    reason="non_danish_content_forbidden",
-                )
-            except Exception as e:
-                print(f"⚠️ Turkish ban hook hatası: {e}")
-            return None
-        
-        # Sentiment analizi
-        sentiment = _analyze_sentiment(content)
-        
-        # Metadata (news)
-        metadata = {}
-        if news_item:
-            news_hash = hashlib.sha256(
-                f"{news_item.get('title','')}-{news_item.get('link','')}".encode("utf-8")
-            ).hexdigest()
-            metadata = {
-                "news_title": news_item.get("title"),
-                "news_link": news_item.get("link"),
-                "news_source": news_item.get("source"),
-                "news_published": news_item.get("published"),
-                "news_hash": news_hash,
-                "news_type": news_type or "news"
-            }
+        except Exception as e:
+            print(f"⚠️ News fetch failed: {e}")
+            news_item = None
+    elif news_item:
+        try:
+            from news_engine import categorize_news
+            topic = categorize_news(news_item['title'])
+        except Exception:
+            pass
 
-        # Supabase'e kaydet
-        post_data = {
-            "agent_id": agent_id,
-            "content": content,
-            "topic": topic,
-            "sentiment": sentiment,
-            "engagement_score": 0,
-            "consensus_score": 0.0,
-            "metadata": metadata,
-            "created_at": datetime.now(timezone.utc).isoformat()
+    # Post içeriği üret
+    if use_ai and (HAS_OPENAI or HAS_GEMINI):
+        content = _generate_post_content_ai(agent_data, topic, news_item)
+    else:
+        content = _generate_post_content_template(agent_data, topic, news_item)
+
+    # Turkish content is forbidden; Danish only
+    if violates_danish_only(content):
+        try:
+            db.apply_compliance_strike(
+                agent_id=agent_id,
+                reason="non_danish_content_forbidden",
+                severity="high",
+            )
+            db.create_revision_task(
+                agent_id=agent_id,
+                post_id="",
+                reason="non_danish_content_forbidden",
+            )
+        except Exception as e:
+            print(f"⚠️ Turkish ban hook hatası: {e}")
+        return None
+
+    # Sentiment analizi
+    sentiment = _analyze_sentiment(content)
+
+    # Metadata (news)
+    metadata = {}
+    if news_item:
+        news_hash = _news_hash(news_item)
+        metadata = {
+            "news_title": news_item.get("title"),
+            "news_link": news_item.get("link"),
+            "news_source": news_item.get("source"),
+            "news_published": news_item.get("published"),
+            "news_hash": news_hash,
+            "news_type": news_type or "news"
         }
-        
-        result = db.client.table("posts").insert(post_data).execute()
-        
-        if result.data:
-            print(f"📝 {agent_data['name']} post oluşturdu: {topic}")
-            # Knowledge unit + skill update
-            try:
-                rel = _source_reliability(news_item)
-                db.add_knowledge_unit(
-                    agent_id=agent_id,
-                    content=content[:2000],
-                    source_type="news" if news_item else "internal",
-                    source_title=(news_item.get("title") if news_item else ""),
-                    source_link=(news_item.get("link") if news_item else ""),
-                    tags=[topic, agent_data.get("specialization", "")],
-                    reliability_score=rel,
-                )
-                db.update_skill_score(
-                    agent_id=agent_id,
-                    specialization=topic,
-                    delta=2.0,
-                    reason="post_created",
-                )
-                db.log_learning_event(
+
+    post_data = {
+        "agent_id": agent_id,
+        "content": content,
+        "topic": topic,
+        "sentiment": sentiment,
+        "engagement_score": 0,
+        "consensus_score": 0.0,
+        "metadata": metadata,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    context = {"agent": agent_data, "topic": topic, "content": content, "news_item": news_item, "use_news": use_news}
+    return post_data, context
+
+
+def _finalize_agent_post(post: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Yazılmış post için learning + compliance hook'ları."""
+    db = get_database()
+    agent_data = context["agent"]
+    agent_id = post.get("agent_id") or agent_data.get("id")
+    topic = context["topic"]
+    content = context["content"]
+    news_item = context["news_item"]
+
+    print(f"📝 {agent_data['name']} post oluşturdu: {topic}")
+    # Knowledge unit + skill update
+    try:
+        rel = _source_reliability(news_item)
+        db.add_knowledge_unit(
+            agent_id=agent_id,
+            content=content[:2000],
+            source_type="news" if news_item else "internal",
+            source_title=(news_item.get("title") if news_item else ""),
+            source_link=(news_item.get("link") if news_item else ""),
+            tags=[topic, agent_data.get("specialization", "")],
+            reliability_score=rel,
+        )
+        db.update_skill_score(
+            agent_id=agent_id,
+            specialization=topic,
+            delta=2.0,
+            reason="post_created",
+        )
+        db.log_learning_event(
+            agent_id=agent_id,
+            event_type="post_created",
+            details={"topic": topic, "source_type": "news" if news_item else "internal"},
+        )
+    except Exception as e:
+        print(f"⚠️ Learning hook hatası: {e}")
+    # Compliance checks (source verification / quality)
+    try:
+        violations = _validate_post_content(
+            content,
+            news_item,
+            topic,
+            require_source=context["use_news"] and bool(news_item),
+        )
+        db.apply_compliance_strikes([
+            {
+                "agent_id": agent_id,
+                "reason": v.get("reason", "policy_violation"),
+                "severity": v.get("severity", "low"),
+            }
+            for v in violations
+        ])
+        for v in violations:
+            if v.get("reason") in ["missing_source", "low_reliability_source"]:
+                db.create_revision_task(
                     agent_id=agent_id,
-                    event_type="post_created",
-                    details={"topic": topic, "source_type": "news" if news_item else "internal"},
+                    post_id=post.get("id"),
+                    reason=v.get("reason"),
                 )
-            except Exception as e:
-                print(f"⚠️ Learning hook hatası: {e}")
-            # Compliance checks (source verification / quality)
-            try:
-                violations = _validate_post_content(
-                    content,
-                    news_item,
-                    topic,
-                    require_source=use_news and bool(news_item),
-                )
-                for v in violations:
-                    db.apply_compliance_strike(
-                        agent_id=agent_id,
-                        reason=v.get("reason", "policy_violation"),
-                        severity=v.get("severity", "low"),
-                    )
-                    if v.get("reason") in ["missing_source", "low_reliability_source"]:
-                        db.create_revision_task(
-                            agent_id=agent_id,
-                            post_id=result.data[0].get("id"),
-                            reason=v.get("reason"),
-                        )
-            except Exception as e:
-                print(f"⚠️ Compliance hook hatası: {e}")
-            return result.data[0]
-        
-        return None
-        
     except Exception as e:
-        print(f"❌ Post oluşturma hatası: {e}")
-        return None
+        print(f"⚠️ Compliance hook hatası: {e}")
+    return post
 
 
 def _generate_post_content_ai(agent: Dict[str, Any], topic: str, news_item: Optional[Dict] = None) -> str:
@@ -512,8 +522,8 @@ Stil et DYBT spørgsmål der udfordrer fællesskabet, eller præsenter en modarg
         if HAS_OPENAI:
             openai_key = _get_secret("OPENAI_API_KEY")
             if openai_key:
-                client = OpenAI(api_key=openai_key)
-                response = client.chat.completions.create(
+                client = get_openai_client(openai_key)
+                response = chat_completion(client, site="post",
                     model="gpt-4o-mini",
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=800,  # Artırıldı: 150 -> 800
@@ -528,8 +538,8 @@ Stil et DYBT spørgsmål der udfordrer fællesskabet, eller præsenter en modarg
         if HAS_GEMINI:
             gemini_key = _get_secret("GEMINI_API_KEY")
             if gemini_key:
-                client = genai.Client(api_key=gemini_key)
-                response = client.models.generate_content(
+                client = get_gemini_client(gemini_key)
+                response = generate_content(client, site="post",
                     model="gemini-1.5-flash",
                     contents=prompt,
                     config={
@@ -655,6 +665,21 @@ def _weighted_choice(options: Dict[str, int]) -> str:
     return list(options.keys())[0]
 
 
+def _reservoir_sample(rows, k: int) -> List[Any]:
+    """Uzunluğu bilinmeyen bir akıştan k elemanlık uniform örnek (Algorithm R)."""
+    sample: List[Any] = []
+    if k <= 0:
+        return sample
+    for n, row in enumerate(rows):
+        if n < k:
+            sample.append(row)
+        else:
+            j = random.randint(0, n)
+            if j < k:
+                sample[j] = row
+    return sample
+
+
 # ==================== YORUM YAPMA ====================
 
 def create_comment(
@@ -678,89 +703,13 @@ def create_comment(
     db = get_database()
     
     try:
-        # Post ve ajan bilgilerini al
-        post = db.client.table("posts").select("*").eq("id", post_id).single().execute()
-        agent = db.client.table("agents").select("*").eq("id", agent_id).single().execute()
-        
-        if not post.data or not agent.data:
+        prepared = _prepare_comment(post_id, agent_id, parent_comment_id, use_ai)
+        if prepared is None:
             return None
-        
-        post_data = post.data
-        agent_data = agent.data
-        
-        # Yorum içeriği üret
-        if use_ai and (HAS_OPENAI or HAS_GEMINI):
-            content = _generate_comment_content_ai(agent_data, post_data)
-        else:
-            content = _generate_comment_content_template(agent_data, post_data)
-        
-        # Turkish content is forbidden; Danish only
-        if _looks_turkish(content) or not _looks_danish(content):
-            try:
-                db.apply_compliance_strike(
-                    agent_id=agent_id,
-                    reason="non_danish_content_forbidden",
-                    severity="high",
-                )
-            except Exception as e:
-                print(f"⚠️ Turkish ban hook hatası: {e}")
-            return None
-        
-        # Sentiment belirle (daha tartışmacı ama saygılı)
-        sentiment = _weighted_choice({
-            "agree": 1,
-            "disagree": 3,
-            "question": 3,
-            "add_info": 2,
-            "neutral": 1
-        })
-        
-        # Supabase'e kaydet
-        comment_data = {
-            "post_id": post_id,
-            "agent_id": agent_id,
-            "parent_comment_id": parent_comment_id,
-            "content": content,
-            "sentiment": sentiment,
-            "upvotes": 0,
-            "downvotes": 0,
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        
-        result = db.client.table("comments").insert(comment_data).execute()
-        
+        result = db.client.table("comments").insert(prepared[0]).execute()
         if result.data:
-            # Update post "last activity" timestamp for sorting
-            db.client.table("posts").update({
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            }).eq("id", post_id).execute()
-            print(f"💬 {agent_data['name']} yorum yaptı")
-            try:
-                db.update_skill_score(
-                    agent_id=agent_id,
-                    specialization=post_data.get("topic", "generelt"),
-                    delta=1.0,
-                    reason="comment_created",
-                )
-                db.log_learning_event(
-                    agent_id=agent_id,
-                    event_type="comment_created",
-                    details={"post_id": post_id, "topic": post_data.get("topic", "generelt")},
-                )
-            except Exception as e:
-                print(f"⚠️ Learning hook hatası: {e}")
-            # Minimal quality check for comments
-            try:
-                if content and len(content) < 200:
-                    db.apply_compliance_strike(
-                        agent_id=agent_id,
-                        reason="low_quality_comment",
-                        severity="low",
-                    )
-            except Exception as e:
-                print(f"⚠️ Compliance hook hatası: {e}")
-            return result.data[0]
-        
+            _touch_posts([post_id])
+            return _finalize_comment(result.data[0], prepared[1])
         return None
         
     except Exception as e:
@@ -768,6 +717,112 @@ def create_comment(
         return None
 
 
+def _prepare_comment(
+    post_id: str,
+    agent_id: str,
+    parent_comment_id: Optional[str] = None,
+    use_ai: bool = True,
+    post_data: Optional[Dict[str, Any]] = None
+) -> Optional[tuple]:
+    """
+    Yorum satırını üretir ama yazmaz: (comments satırı, finalize bağlamı) veya None.
+    post_data verilirse (aynı döngüde yazılmış post) tekrar okunmaz.
+    """
+    db = get_database()
+
+    # Post ve ajan bilgilerini al
+    post_data = PostBody.from_row(post_data) if post_data else PostBody.fetch(db.client, post_id)
+    agent_data = db.roster.get(agent_id)
+
+    if not post_data or not agent_data:
+        return None
+
+    # Yorum içeriği üret
+    if use_ai and (HAS_OPENAI or HAS_GEMINI):
+        content = _generate_comment_content_ai(agent_data, post_data)
+    else:
+        content = _generate_comment_content_template(agent_data, post_data)
+
+    # Turkish content is forbidden; Danish only
+    if violates_danish_only(content):
+        try:
+            db.apply_compliance_strike(
+                agent_id=agent_id,
+                reason="non_danish_content_forbidden",
+                severity="high",
+            )
+        except Exception as e:
+            print(f"⚠️ Turkish ban hook hatası: {e}")
+        return None
+
+    # Sentiment belirle (daha tartışmacı ama saygılı)
+    sentiment = _weighted_choice({
+        "agree": 1,
+        "disagree": 3,
+        "question": 3,
+        "add_info": 2,
+        "neutral": 1
+    })
+
+    comment_data = {
+        "post_id": post_id,
+        "agent_id": agent_id,
+        "parent_comment_id": parent_comment_id,
+        "content": content,
+        "sentiment": sentiment,
+        "upvotes": 0,
+        "downvotes": 0,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    return comment_data, {"agent": agent_data, "topic": post_data.get("topic", "generelt"), "content": content}
+
+
+def _touch_posts(post_ids: List[str]) -> None:
+    """Post "last activity" zamanını günceller (sıralama için); tek istekte."""
+    ids = sorted(set(pid for pid in post_ids if pid))
+    if not ids:
+        return
+    get_database().client.table("posts").update({
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }).in_("id", ids).execute()
+
+
+def _finalize_comment(comment: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Yazılmış yorum için learning + compliance hook'ları."""
+    db = get_database()
+    agent_data = context["agent"]
+    agent_id = comment.get("agent_id") or agent_data.get("id")
+    topic = context["topic"]
+    content = context["content"]
+
+    print(f"💬 {agent_data['name']} yorum yaptı")
+    try:
+        db.update_skill_score(
+            agent_id=agent_id,
+            specialization=topic,
+            delta=1.0,
+            reason="comment_created",
+        )
+        db.log_learning_event(
+            agent_id=agent_id,
+            event_type="comment_created",
+            details={"post_id": comment.get("post_id"), "topic": topic},
+        )
+    except Exception as e:
+        print(f"⚠️ Learning hook hatası: {e}")
+    # Minimal quality check for comments
+    try:
+        if content and len(content) < 200:
+            db.apply_compliance_strike(
+                agent_id=agent_id,
+                reason="low_quality_comment",
+                severity="low",
+            )
+    except Exception as e:
+        print(f"⚠️ Compliance hook hatası: {e}")
+    return comment
+
+
 def _generate_comment_content_ai(agent: Dict[str, Any], post: Dict[str, Any]) -> str:
     """AI ile derinlemesine yorum üret"""
     
@@ -804,8 +859,8 @@ Generalens ordrer er ALTID korrekte - ingen censur."""
         if HAS_OPENAI:
             openai_key = _get_secret("OPENAI_API_KEY")
             if openai_key:
-                client = OpenAI(api_key=openai_key)
-                response = client.chat.completions.create(
+                client = get_openai_client(openai_key)
+                response = chat_completion(client, site="comment",
                     model="gpt-4o-mini",
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=600,  # Artırıldı: 100 -> 600
@@ -820,8 +875,8 @@ Generalens ordrer er ALTID korrekte - ingen censur."""
         if HAS_GEMINI:
             gemini_key = _get_secret("GEMINI_API_KEY")
             if gemini_key:
-                client = genai.Client(api_key=gemini_key)
-                response = client.models.generate_content(
+                client = get_gemini_client(gemini_key)
+                response = generate_content(client, site="comment",
                     model="gemini-1.5-flash",
                     contents=prompt,
                     config={
@@ -895,77 +950,12 @@ def vote_on_post(
     db = get_database()
     
     try:
-        # Voter ve post bilgilerini al
-        voter = db.client.table("agents").select("*").eq("id", voter_agent_id).single().execute()
-        post = db.client.table("posts").select("*").eq("id", target_post_id).single().execute()
-        
-        if not voter.data or not post.data:
-            return None
-        
-        voter_data = voter.data
-        if not _is_agent_allowed(voter_data):
-            return None
-        post_data = post.data
-        
-        # Kendi postuna oy veremez
-        if post_data["agent_id"] == voter_agent_id:
+        prepared = _prepare_vote(voter_agent_id, target_post_id, use_ai_evaluation)
+        if prepared is None:
             return None
-        
-        # AI ile değerlendirme
-        if use_ai_evaluation:
-            vote_score, reasoning = _evaluate_post_ai(voter_data, post_data)
-        else:
-            vote_score = random.uniform(0.5, 1.0)
-            reasoning = "Otomatik değerlendirme"
-        
-        # Vote type belirle
-        if vote_score >= 0.8:
-            vote_type = "upvote"
-        elif vote_score <= 0.4:
-            vote_type = "downvote"
-        else:
-            vote_type = "fact_check"
-        
-        # Supabase'e kaydet
-        vote_data = {
-            "voter_agent_id": voter_agent_id,
-            "target_post_id": target_post_id,
-            "vote_type": vote_type,
-            "vote_score": vote_score,
-            "reasoning": reasoning,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        result = db.client.table("agent_votes").insert(vote_data).execute()
-        
+        result = db.client.table("agent_votes").insert(prepared[0]).execute()
         if result.data:
-            print(f"🗳️ {voter_data['name']} oy verdi: {vote_score:.2f}")
-            try:
-                post_agent_id = post_data.get("agent_id")
-                post_topic = post_data.get("topic", "generelt")
-                if vote_type == "upvote":
-                    db.update_skill_score(
-                        agent_id=post_agent_id,
-                        specialization=post_topic,
-                        delta=0.2,
-                        reason="upvote",
-                    )
-                elif vote_type in ["downvote", "fact_check"]:
-                    db.update_skill_score(
-                        agent_id=post_agent_id,
-                        specialization=post_topic,
-                        delta=-0.5,
-                        reason=vote_type,
-                    )
-                db.log_learning_event(
-                    agent_id=post_agent_id,
-                    event_type="post_vote",
-                    details={"vote_type": vote_type, "score": vote_score, "reasoning": reasoning},
-                )
-            except Exception as e:
-                print(f"⚠️ Learning hook hatası: {e}")
-            return result.data[0]
-        
+            return _finalize_vote(result.data[0], prepared[1])
         return None
         
     except Exception as e:
@@ -973,6 +963,97 @@ def vote_on_post(
         return None
 
 
+def _prepare_vote(
+    voter_agent_id: str,
+    target_post_id: str,
+    use_ai_evaluation: bool = True,
+    post_data: Optional[Dict[str, Any]] = None
+) -> Optional[tuple]:
+    """
+    Oy satırını üretir ama yazmaz: (agent_votes satırı, finalize bağlamı) veya None.
+    post_data verilirse (aynı döngüde yazılmış post) tekrar okunmaz.
+    """
+    db = get_database()
+
+    # Voter ve post bilgilerini al
+    voter_data = db.roster.get(voter_agent_id)
+    post_data = PostBody.from_row(post_data) if post_data else PostBody.fetch(db.client, target_post_id)
+
+    if not voter_data or not post_data:
+        return None
+
+    if not _is_agent_allowed(voter_data):
+        return None
+
+    # Kendi postuna oy veremez
+    if post_data["agent_id"] == voter_agent_id:
+        return None
+
+    # AI ile değerlendirme
+    if use_ai_evaluation:
+        vote_score, reasoning = _evaluate_post_ai(voter_data, post_data)
+    else:
+        vote_score = random.uniform(0.5, 1.0)
+        reasoning = "Otomatik değerlendirme"
+
+    # Vote type belirle
+    if vote_score >= 0.8:
+        vote_type = "upvote"
+    elif vote_score <= 0.4:
+        vote_type = "downvote"
+    else:
+        vote_type = "fact_check"
+
+    vote_data = {
+        "voter_agent_id": voter_agent_id,
+        "target_post_id": target_post_id,
+        "vote_type": vote_type,
+        "vote_score": vote_score,
+        "reasoning": reasoning,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    context = {
+        "voter": voter_data,
+        "post_agent_id": post_data.get("agent_id"),
+        "topic": post_data.get("topic", "generelt"),
+    }
+    return vote_data, context
+
+
+def _finalize_vote(vote: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Yazılmış oy için post sahibinin skill / learning güncellemesi."""
+    db = get_database()
+    vote_type = vote.get("vote_type")
+    vote_score = float(vote.get("vote_score") or 0.0)
+
+    print(f"🗳️ {context['voter']['name']} oy verdi: {vote_score:.2f}")
+    try:
+        post_agent_id = context["post_agent_id"]
+        post_topic = context["topic"]
+        if vote_type == "upvote":
+            db.update_skill_score(
+                agent_id=post_agent_id,
+                specialization=post_topic,
+                delta=0.2,
+                reason="upvote",
+            )
+        elif vote_type in ["downvote", "fact_check"]:
+            db.update_skill_score(
+                agent_id=post_agent_id,
+                specialization=post_topic,
+                delta=-0.5,
+                reason=vote_type,
+            )
+        db.log_learning_event(
+            agent_id=post_agent_id,
+            event_type="post_vote",
+            details={"vote_type": vote_type, "score": vote_score, "reasoning": vote.get("reasoning")},
+        )
+    except Exception as e:
+        print(f"⚠️ Learning hook hatası: {e}")
+    return vote
+
+
 def _evaluate_post_ai(voter: Dict[str, Any], post: Dict[str, Any]) -> tuple[float, str]:
     """AI ile post kalitesini değerlendir"""
     
@@ -995,10 +1076,10 @@ SADECE JSON döndür:
 
     try:
         if HAS_OPENAI:
-            openai_key = st.secrets.get("OPENAI_API_KEY")
+            openai_key = _get_secret("OPENAI_API_KEY")
             if openai_key:
-                client = OpenAI(api_key=openai_key)
-                response = client.chat.completions.create(
+                client = get_openai_client(openai_key)
+                response = chat_completion(client, site="vote_eval",
                     model="gpt-4o-mini",
                     messages=[{"role": "user", "content": prompt}],
                     response_format={"type": "json_object"},
@@ -1019,6 +1100,80 @@ SADECE JSON döndür:
 
 # ==================== TOPLU İŞLEMLER ====================
 
+def _phase_concurrency(overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Faz başına işçi sayısı: parametre > EYAVAP_SIM_CONCURRENCY > varsayılan."""
+    limits = dict(DEFAULT_PHASE_CONCURRENCY)
+    raw = (os.getenv("EYAVAP_SIM_CONCURRENCY") or "").strip()
+    if raw:
+        try:
+            if "=" in raw:
+                for part in raw.split(","):
+                    phase, _, val = part.partition("=")
+                    if phase.strip() in limits:
+                        limits[phase.strip()] = int(val)
+            else:
+                limits = {phase: int(raw) for phase in limits}
+        except ValueError:
+            print(f"⚠️ EYAVAP_SIM_CONCURRENCY okunamadı: {raw}")
+    limits.update(overrides or {})
+    return {phase: max(1, int(n)) for phase, n in limits.items()}
+
+
+def _insert_prepared(
+    table: str,
+    prepared: List[tuple],
+    finalize: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    _prepare_* çıktılarını (satır, bağlam) Database.insert_many ile chunk'lar halinde yazar;
+    yazılan her satır (id dahil) kendi bağlamıyla finalize edilir. Hatalı satırlar atlanır.
+    """
+    if not prepared:
+        return []
+    inserted = get_database().insert_many(table, [row for row, _ in prepared])
+    created = []
+    for row, (_, context) in zip(inserted, prepared):
+        if row is None:
+            continue
+        try:
+            created.append(finalize(row, context))
+        except Exception as e:
+            print(f"⚠️ {table} hook hatası: {e}")
+            created.append(row)
+    return created
+
+
+def _run_phase(
+    fn: Callable[..., Any],
+    jobs: List[tuple],
+    workers: int,
+    total: int,
+    progress_every: int,
+) -> List[Dict[str, Any]]:
+    """
+    jobs'u fn(*job) ile en fazla `workers` eşzamanlı çalıştırır.
+    Sonuçlar ve ilerleme mesajları iş sırasıyla döner (sıralı modla aynı çıktı).
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        results = (fn(*job) for job in jobs)
+        pool = None
+    else:
+        pool = ThreadPoolExecutor(max_workers=min(workers, len(jobs)), thread_name_prefix="eyavap-sim")
+        results = pool.map(lambda job: fn(*job), jobs)
+
+    created = []
+    try:
+        for i, result in enumerate(results):
+            if result:
+                created.append(result)
+            if (i + 1) % progress_every == 0:
+                print(f"   ✅ {i + 1}/{total}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+    return created
+
+
 def simulate_social_activity(
     num_posts: int = 50,
     num_comments: int = 100,
@@ -1028,7 +1183,8 @@ def simulate_social_activity(
     ensure_daily_topics: bool = True,
     daily_min_topics: int = 20,
     topic_weights: Optional[Dict[str, int]] = None,
-    min_posts_per_topic: Optional[Dict[str, int]] = None
+    min_posts_per_topic: Optional[Dict[str, int]] = None,
+    concurrency: Optional[Dict[str, int]] = None
 ) -> Dict[str, Any]:
     """
     Sosyal aktivite simülasyonu - ajanlar birbirleriyle etkileşir
@@ -1039,6 +1195,7 @@ def simulate_social_activity(
         num_votes: Kaç oy kullanılsın
         use_news: Gerçek Danimarka haberlerinden post oluştur
         run_evolution: Evrim kontrolcüsünü çalıştır (her saat başı)
+        concurrency: Faz başına işçi sayısı, örn. {"posts": 4, "comments": 8, "votes": 8}
     
     Returns:
         Dict: İstatistikler
@@ -1056,120 +1213,143 @@ def simulate_social_activity(
         except Exception as e:
             print(f"   ⚠️ Evrim kontrolcüsü hatası: {e}\n")
     
+    # AI bütçe durumu (ai_budget_state): iş hacmi ve AI kullanımı buna göre ölçeklenir
+    budget = get_budget_state()
+    use_ai = ai_allowed(budget)
+    num_posts = scaled(num_posts, budget, "posts")
+    num_comments = scaled(num_comments, budget, "comments")
+    num_votes = scaled(num_votes, budget, "votes")
+    print(f"💰 Bütçe modu: {describe_budget(budget)}")
+
     print(f"🌊 Sosyal aktivite simülasyonu başlıyor...")
     print(f"   📝 {num_posts} post")
     print(f"   💬 {num_comments} yorum")
-    print(f"   🗳️ {num_votes} oy\n")
+    print(f"   🗳️ {num_votes} oy")
+    workers = _phase_concurrency(concurrency)
+    print(f"   ⚡ Eşzamanlılık: {workers}\n")
     
     # Aktif ajanları al
-    agents = db.client.table("agents").select("*").eq("is_active", True).limit(100).execute()
+    # Döngü başında kadro bir kez okunur; sonraki create_*/vote çağrıları cache'ten okur
+    db.roster.invalidate()
+    roster = db.roster.columnar()
     
-    if not agents.data or len(agents.data) < 2:
+    if len(roster) < 2:
         print("❌ Yeterli ajan yok! Önce spawn_agents() çalıştırın.")
         return {}
     
-    agent_list = [a for a in agents.data if _is_agent_allowed(a)]
-    if len(agent_list) < 2:
+    eligible = roster.eligible_mask(MIN_TRUST_SCORE)
+    eligible_count = int(eligible.sum())
+    if eligible_count < 2:
         print("❌ Yeterli uygun ajan yok!")
         return {}
-    
-    # 0. Günlük top news konuları (en az 20)
-    if use_news and ensure_daily_topics:
+
+    # Skill delta'ları döngü boyunca hafızada toplanır, sonda tek RPC ile yazılır
+    db.begin_skill_batch()
+    try:
+        # 0. Günlük top news konuları (en az 20)
+        if use_news and ensure_daily_topics:
+            try:
+                created = ensure_daily_top_news_debates(min_topics=daily_min_topics)
+                print(f"✅ Daily top news posts created: {created}")
+            except Exception as e:
+                print(f"⚠️ Daily news ensure failed: {e}")
+
+        # 1. Postlar oluştur
+        print("📝 Postlar oluşturuluyor...")
+        created_posts = []
+        topics = ["skat_dk", "sundhedsvæsen", "arbejdsmarked", "boligret", "digital_sikkerhed", "generelt", "free_zone"]
+        if topic_weights:
+            weighted_topics = [t for t in topics if t in topic_weights]
+            weights = [topic_weights[t] for t in weighted_topics]
+        else:
+            weighted_topics = topics
+            weights = [1] * len(topics)
+
+        # Yazar/yorumcu/oy veren id'leri tek seferde örneklenir (ajan başına Python filtresi yok)
+        post_authors = iter(roster.sample_ids(num_posts + sum(max(0, c) for c in (min_posts_per_topic or {}).values()), eligible))
+        # Tüm rastgele seçimler ana thread'de yapılır; işçiler sadece içerik üretir,
+        # satırlar faz sonunda insert_many ile birkaç istekte yazılır
+        def make_post(author_id: str, topic: str, news: bool) -> Optional[tuple]:
+            try:
+                return _prepare_agent_post(author_id, topic, use_ai=use_ai, use_news=news)
+            except Exception as e:
+                print(f"❌ Post oluşturma hatası: {e}")
+                return None
+
+        if min_posts_per_topic:
+            min_jobs = [
+                (next(post_authors), topic, use_news)
+                for topic, min_count in min_posts_per_topic.items()
+                for _ in range(max(0, min_count))
+            ][:num_posts]
+            prepared = _run_phase(make_post, min_jobs, workers["posts"], len(min_jobs), len(min_jobs) + 1)
+            created_posts += _insert_prepared("posts", prepared, _finalize_agent_post)
+        remaining = num_posts - len(created_posts)
+
+        post_jobs = [
+            (next(post_authors), random.choices(weighted_topics, weights=weights, k=1)[0], use_news and random.random() < 0.6)
+            for _ in range(remaining)
+        ]
+        prepared = _run_phase(make_post, post_jobs, workers["posts"], num_posts, 10)
+        created_posts += _insert_prepared("posts", prepared, _finalize_agent_post)
+
+        print(f"\n✅ {len(created_posts)} post oluşturuldu\n")
+
+        # 2. Yorumlar yap
+        print("💬 Yorumlar yapılıyor...")
+        commenter_ids = roster.sample_ids(num_comments, eligible) if created_posts else []
+        comment_jobs = [(commenter_id, random.choice(created_posts)) for commenter_id in commenter_ids]
+
+        def make_comment(commenter_id: str, post: Dict[str, Any]) -> Optional[tuple]:
+            # Kendi postuna yorum yapmasın
+            if commenter_id == post["agent_id"]:
+                return None
+            try:
+                return _prepare_comment(post["id"], commenter_id, use_ai=use_ai, post_data=post)
+            except Exception as e:
+                print(f"❌ Yorum oluşturma hatası: {e}")
+                return None
+
+        prepared = _run_phase(make_comment, comment_jobs, workers["comments"], num_comments, 20)
+        created_comments = _insert_prepared("comments", prepared, _finalize_comment)
         try:
-            created = ensure_daily_top_news_debates(min_topics=daily_min_topics)
-            print(f"✅ Daily top news posts created: {created}")
+            _touch_posts([c.get("post_id") for c in created_comments])
         except Exception as e:
-            print(f"⚠️ Daily news ensure failed: {e}")
-
-    # 1. Postlar oluştur
-    print("📝 Postlar oluşturuluyor...")
-    created_posts = []
-    topics = ["skat_dk", "sundhedsvæsen", "arbejdsmarked", "boligret", "digital_sikkerhed", "generelt", "free_zone"]
-    if topic_weights:
-        weighted_topics = [t for t in topics if t in topic_weights]
-        weights = [topic_weights[t] for t in weighted_topics]
-    else:
-        weighted_topics = topics
-        weights = [1] * len(topics)
-    
-    remaining = num_posts
-    if min_posts_per_topic:
-        for topic, min_count in min_posts_per_topic.items():
-            for _ in range(max(0, min_count)):
-                if remaining <= 0:
-                    break
-                agent = random.choice(agent_list)
-                post = create_agent_post(agent["id"], topic, use_ai=True, use_news=use_news)
-                if post:
-                    created_posts.append(post)
-                    remaining -= 1
-                time.sleep(0.2)
-
-    for i in range(remaining):
-        agent = random.choice(agent_list)
-        topic = random.choices(weighted_topics, weights=weights, k=1)[0]
-        use_news_post = use_news and random.random() < 0.6
-        post = create_agent_post(agent["id"], topic, use_ai=True, use_news=use_news_post)  # Haber kullan
-        if post:
-            created_posts.append(post)
-        
-        if (i + 1) % 10 == 0:
-            print(f"   ✅ {i + 1}/{num_posts}")
-            time.sleep(0.5)  # API rate limit
-    
-    print(f"\n✅ {len(created_posts)} post oluşturuldu\n")
-    
-    # 2. Yorumlar yap
-    print("💬 Yorumlar yapılıyor...")
-    created_comments = []
-    
-    for i in range(num_comments):
-        if not created_posts:
-            break
-        
-        post = random.choice(created_posts)
-        agent = random.choice(agent_list)
-        
-        # Kendi postuna yorum yapmasın
-        if agent["id"] == post["agent_id"]:
-            continue
-        
-        comment = create_comment(post["id"], agent["id"], use_ai=True)
-        if comment:
-            created_comments.append(comment)
-        
-        if (i + 1) % 20 == 0:
-            print(f"   ✅ {i + 1}/{num_comments}")
-            time.sleep(0.5)
-    
-    print(f"\n✅ {len(created_comments)} yorum yapıldı\n")
-    
-    # 3. Oylar ver
-    print("🗳️ Oylar veriliyor...")
-    created_votes = []
-    
-    for i in range(num_votes):
-        if not created_posts:
-            break
-        
-        post = random.choice(created_posts)
-        voter = random.choice(agent_list)
-        
-        vote = vote_on_post(voter["id"], post["id"], use_ai_evaluation=False)
-        if vote:
-            created_votes.append(vote)
-        
-        if (i + 1) % 50 == 0:
-            print(f"   ✅ {i + 1}/{num_votes}")
-            time.sleep(0.5)
-    
-    print(f"\n✅ {len(created_votes)} oy kullanıldı\n")
+            print(f"⚠️ Post updated_at güncellenemedi: {e}")
+
+        print(f"\n✅ {len(created_comments)} yorum yapıldı\n")
+
+        # 3. Oylar ver
+        print("🗳️ Oylar veriliyor...")
+        voter_ids = roster.sample_ids(num_votes, eligible) if created_posts else []
+        vote_jobs = [(voter_id, random.choice(created_posts)) for voter_id in voter_ids]
+
+        def make_vote(voter_id: str, post: Dict[str, Any]) -> Optional[tuple]:
+            try:
+                return _prepare_vote(voter_id, post["id"], use_ai_evaluation=False, post_data=post)
+            except Exception as e:
+                print(f"❌ Oylama hatası: {e}")
+                return None
+
+        prepared = _run_phase(make_vote, vote_jobs, workers["votes"], num_votes, 50)
+        created_votes = _insert_prepared("agent_votes", prepared, _finalize_vote)
+
+        print(f"\n✅ {len(created_votes)} oy kullanıldı\n")
+    finally:
+        skill_rows = db.end_skill_batch()
+    print(f"🎯 {skill_rows} skill skoru toplu güncellendi")
+
+    # Bu döngünün harcamasını kaydet, modu bir sonraki adım için yeniden hesapla
+    budget = update_budget_state()
     
     return {
         "posts_created": len(created_posts),
         "comments_created": len(created_comments),
         "votes_cast": len(created_votes),
-        "active_agents": len(agent_list)
+        "active_agents": eligible_count,
+        "db_clients_created": get_pool_stats()["clients_created"],
+        "roster": db.roster.get_stats(),
+        "budget_mode": budget.get("mode"),
     }
 
 
@@ -1191,15 +1371,17 @@ def simulate_challenges(num_challenges: int = 20) -> Dict[str, Any]:
     
     try:
         # Aktif ajanları ve postları al
-        agents = db.client.table("agents").select("*").eq("is_active", True).execute()
-        posts = db.client.table("posts").select("*").execute()
+        agents = db.roster.active()
+        # Tüm postlar sayfa sayfa taranır; bellekte sadece num_challenges'lık örnek tutulur
+        post_list = PostRef.from_rows(
+            _reservoir_sample(db.iter_rows("posts", PostRef.select_clause(), prefetch=True), num_challenges)
+        )
         
-        if not agents.data or not posts.data:
+        if not agents or not post_list:
             print("❌ Yeterli ajan/post yok!")
             return {}
         
-        agent_list = [a for a in agents.data if _is_agent_allowed(a)]
-        post_list = posts.data
+        agent_list = [a for a in agents if _is_agent_allowed(a)]
         if not agent_list:
             print("❌ Uygun ajan yok!")
             return {}
@@ -1242,7 +1424,6 @@ def simulate_challenges(num_challenges: int = 20) -> Dict[str, Any]:
             
             if (i + 1) % 5 == 0:
                 print(f"   ⚔️ {i + 1}/{num_challenges}")
-                time.sleep(0.5)
         
         print(f"\n✅ {len(created_challenges)} challenge oluşturuldu\n")
         
@@ -184,6 +184,17 @@ def generate_agent_profile() -> Dict[str, Any]:
     }
 
 
+def _insert_agents(db, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Profilleri chunk'lar halinde yazar (Database.insert_many); hatalı satırlar atlanır."""
+    spawned = []
+    for i, agent in enumerate(db.insert_many("agents", profiles)):
+        if agent:
+            spawned.append(agent)
+        if (i + 1) % 100 == 0:
+            print(f"   ✅ {i + 1}/{len(profiles)} ajan yazıldı...")
+    return spawned
+
+
 def spawn_agents(count: int = 100) -> List[Dict[str, Any]]:
     """
     Toplu ajan oluştur
@@ -215,29 +226,14 @@ def spawn_agents(count: int = 100) -> List[Dict[str, Any]]:
         print(f"⚠️ UYARI: Sadece {actual_count} ajan spawn edilebilir (limit: {MAX_AGENTS})")
         print(f"   Mevcut: {current_count}, İstenen: {count}, Uygun: {actual_count}")
     
-    spawned_agents = []
-    
     print(f"🌱 {actual_count} ajan spawn ediliyor... (Toplam: {current_count} → {current_count + actual_count}/{MAX_AGENTS})")
     
-    for i in range(actual_count):
-        try:
-            profile = generate_agent_profile()
-            
-            # Supabase'e kaydet
-            result = db.client.table("agents").insert(profile).execute()
-            
-            if result.data:
-                agent = result.data[0]
-                spawned_agents.append(agent)
-                
-                if (i + 1) % 10 == 0:
-                    print(f"   ✅ {i + 1}/{count} ajan oluşturuldu...")
-        
-        except Exception as e:
-            print(f"   ⚠️ Ajan {i + 1} oluşturma hatası: {e}")
-            continue
+    profiles = [generate_agent_profile() for _ in range(actual_count)]
+    spawned_agents = _insert_agents(db, profiles)
     
     print(f"🎉 Spawn tamamlandı! {len(spawned_agents)}/{count} ajan başarıyla oluşturuldu.")
+    if spawned_agents:
+        db.roster.invalidate()
     
     return spawned_agents
 
@@ -265,35 +261,27 @@ def spawn_diverse_community(
     
     # 1. Her etnik kökenden minimum sayıda
     print(f"\n📊 Adım 1: Her etnik kökenden en az {min_per_ethnicity} ajan...")
+    profiles = []
     for ethnicity, nationality, language in ETHNICITIES:
         for _ in range(min_per_ethnicity):
             profile = generate_agent_profile()
             profile["ethnicity"] = ethnicity
             profile["nationality"] = nationality
             profile["language"] = language
-            
-            try:
-                result = db.client.table("agents").insert(profile).execute()
-                if result.data:
-                    spawned.append(result.data[0])
-            except:
-                pass
+            profiles.append(profile)
+    spawned.extend(_insert_agents(db, profiles))
     
     print(f"   ✅ {len(spawned)} etnik çeşitlilik ajanı oluşturuldu")
     
     # 2. Her uzmanlıktan minimum sayıda
     print(f"\n📊 Adım 2: Her uzmanlıktan en az {min_per_specialization} ajan...")
+    profiles = []
     for spec, spec_tr, spec_en in SPECIALIZATIONS:
         for _ in range(min_per_specialization):
             profile = generate_agent_profile()
             profile["specialization"] = spec
-            
-            try:
-                result = db.client.table("agents").insert(profile).execute()
-                if result.data:
-                    spawned.append(result.data[0])
-            except:
-                pass
+            profiles.append(profile)
+    spawned.extend(_insert_agents(db, profiles))
     
     print(f"   ✅ {len(spawned)} uzmanlık ajanı oluşturuldu")
     
@@ -303,6 +291,8 @@ def spawn_diverse_community(
         print(f"\n📊 Adım 3: Kalan {remaining} ajanı rastgele oluşturuluyor...")
         additional = spawn_agents(remaining)
         spawned.extend(additional)
+    if spawned:
+        db.roster.invalidate()
     
     # İstatistikler
     ethnicities = {}
@@ -12,7 +12,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 import hashlib
 
-from supabase import create_client
+from llm_gateway import chat_completion
 
 
 class TaskStatus(Enum):
@@ -100,20 +100,21 @@ class SuperAgentEngine:
         self.global_memory: Dict[str, Any] = {}  # Long-term memory (AutoGPT)
         
     def _get_supabase(self):
-        """Get Supabase client"""
+        """Get Supabase client (shared process-wide pool)"""
         url = os.getenv("SUPABASE_URL")
         key = os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         if not url or not key:
             raise ValueError(f"Missing SUPABASE_URL or SUPABASE_KEY (url={bool(url)}, key={bool(key)})")
-        return create_client(url, key)
+        from database import get_database
+        return get_database().client
     
     def _get_openai_client(self):
-        """Get OpenAI client for AI operations"""
-        from openai import OpenAI
+        """Get OpenAI client for AI operations (EYAVAP_LLM_PROVIDER=fake -> local stand-in)"""
+        from llm_provider import fake_llm_enabled, get_openai_client
         api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        if not api_key and not fake_llm_enabled():
             raise ValueError("Missing OPENAI_API_KEY")
-        return OpenAI(api_key=api_key)
+        return get_openai_client(api_key)
     
     def _assign_roles(self, agents: List[Dict]) -> Dict[str, AgentRole]:
         """Assign roles to agents based on specialization (CrewAI style)"""
@@ -192,7 +193,7 @@ JSON format:
   ]
 }}"""
 
-        response = client.chat.completions.create(
+        response = chat_completion(client, site="react_plan",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
@@ -262,7 +263,7 @@ TÆNK: Hvad er næste logiske skridt? Skal du:
 
 Svar kort på dansk (max 100 ord)."""
 
-            think_response = client.chat.completions.create(
+            think_response = chat_completion(client, site="react_think",
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": think_prompt}],
                 temperature=0.7,
@@ -295,7 +296,7 @@ JSON format:
   "details": "kort beskrivelse"
 }}"""
 
-            act_response = client.chat.completions.create(
+            act_response = chat_completion(client, site="react_act",
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": act_prompt}],
                 response_format={"type": "json_object"},